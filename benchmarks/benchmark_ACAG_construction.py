@@ -0,0 +1,89 @@
+import time
+from src.generate_cso_attacker.system_DFA_basic import ClosedLoopSystem
+from src.generate_cso_attacker.generate_ACAG_helper import GenerateACAGFunctionTools
+from src.generate_cso_attacker.generate_ACAG_generator import ACAGSystemCreater
+from src.generate_cso_attacker.transition_index import TransitionIndex
+from .synthetic_models import ring_assumption
+
+"""
+ACAG 构建耗时随物理系统规模的变化
+运行方式（项目根目录）: python -m benchmarks.benchmark_ACAG_construction
+"""
+
+SIZES = [50, 100, 200, 400, 800]
+
+
+def benchmark_ACAG_construction(n_states, seed=0):
+    assumption = ring_assumption(n_states, seed)
+    event_unobservable_supervisor = ClosedLoopSystem.generate_unobservable_events(
+        assumption.event_system, assumption.event_supervisor_observable)
+    event_unobservable_attacker = ClosedLoopSystem.generate_unobservable_events(
+        assumption.event_system, assumption.event_attacker_observable)
+    transition_closed_loop_system = ClosedLoopSystem.generate_transition_closed_loop_system(
+        assumption.state_oringin_system,
+        assumption.state_initial_origin_ststem,
+        assumption.state_initial_supervisor,
+        assumption.event_system,
+        assumption.transition_origin_system,
+        assumption.transition_supervisor)
+    state_initial_closed_loop_system = [(z, x) for z in assumption.state_initial_supervisor
+                                        for x in assumption.state_initial_origin_ststem]
+    estimation_result_supervisor = GenerateACAGFunctionTools.generate_unobserver_reach_supervisor(
+        transition_closed_loop_system,
+        assumption.event_supervisor_observable,
+        event_unobservable_supervisor)
+    estimation_result_attacker = GenerateACAGFunctionTools.generate_unobserver_reach_attacker(
+        assumption.state_initial_origin_ststem,
+        assumption.transition_origin_system,
+        assumption.event_attacker_observable,
+        assumption.state_supervisor,
+        assumption.transition_supervisor,
+        event_unobservable_attacker)
+
+    # 1. 邻接索引构建（每个 SystemAssumptions 只需一次）
+    start = time.perf_counter()
+    index_origin_system = TransitionIndex(assumption.transition_origin_system)
+    index_time = time.perf_counter() - start
+
+    # 2. ACAG 构建
+    start = time.perf_counter()
+    all_ACAG_transition, _ = ACAGSystemCreater.generate_ACAG_transition(
+        event_unobservable_attacker,
+        assumption.event_vulnerable,
+        assumption.event_alterable,
+        event_unobservable_supervisor,
+        transition_closed_loop_system,
+        assumption.transition_origin_system,
+        assumption.transition_supervisor,
+        assumption.state_initial_origin_ststem,
+        state_initial_closed_loop_system,
+        assumption.state_initial_supervisor,
+        estimation_result_supervisor,
+        estimation_result_attacker,
+        assumption.state_system_secret,
+        index_origin_system=index_origin_system,
+    )
+    ACAG_time = time.perf_counter() - start
+
+    return {
+        "n_states": n_states,
+        "n_transitions": len(assumption.transition_origin_system),
+        "n_ACAG_transitions": len(all_ACAG_transition),
+        "index_time": index_time,
+        "ACAG_time": ACAG_time,
+    }
+
+
+def main():
+    header = f"{'|X|':>6} {'|delta|':>8} {'|ACAG|':>8} {'index(ms)':>10} {'ACAG(ms)':>10} {'us/edge':>8}"
+    print(header)
+    print("-" * len(header))
+    for n_states in SIZES:
+        r = benchmark_ACAG_construction(n_states)
+        per_edge = r["ACAG_time"] * 1e6 / max(r["n_ACAG_transitions"], 1)
+        print(f"{r['n_states']:>6} {r['n_transitions']:>8} {r['n_ACAG_transitions']:>8} "
+              f"{r['index_time'] * 1e3:>10.2f} {r['ACAG_time'] * 1e3:>10.2f} {per_edge:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
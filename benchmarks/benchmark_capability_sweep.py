@@ -0,0 +1,117 @@
+import time
+from collections import deque
+from itertools import combinations
+from src.generate_cso_attacker.system_DFA_basic import ClosedLoopSystem
+from src.generate_cso_attacker.generate_ACAG_helper import GenerateACAGFunctionTools
+from src.generate_cso_attacker.generate_AO_ACAG_generator import AOACAGSystemCreater
+from src.generate_cso_attacker.generate_pruned_AO_ACAG_generator import PrunedAOACAGSystemCreater
+from src.generate_cso_attacker.capability_sweep import CapabilitySweep
+from .synthetic_models import product_assumption
+
+"""
+攻击能力扫描：每个能力集重跑整条流水线（闭环、观测器、按需构建 AO-ACAG 后剪枝）与 CapabilitySweep 的耗时对比
+运行方式（项目根目录）: python -m benchmarks.benchmark_capability_sweep
+"""
+
+SIZES = [(30, 2), (60, 2), (120, 4)]
+EVENT_VULNERABLE = {"o1", "o2", "o3"}
+EVENT_ALTERABLE = {"o1", "o2", "o3", "empty"}
+
+
+def brute_force_admits(assumption, event_vulnerable, event_alterable):
+    event_unobservable_supervisor = ClosedLoopSystem.generate_unobservable_events(
+        assumption.event_system, assumption.event_supervisor_observable)
+    event_unobservable_attacker = ClosedLoopSystem.generate_unobservable_events(
+        assumption.event_system, assumption.event_attacker_observable)
+    closed_loop = ClosedLoopSystem.build_closed_loop_automaton(
+        assumption.state_initial_origin_ststem,
+        assumption.state_initial_supervisor,
+        assumption.event_system,
+        assumption.transition_origin_system,
+        assumption.transition_supervisor)
+    estimation_result_supervisor = GenerateACAGFunctionTools.generate_unobserver_reach_supervisor(
+        closed_loop.transitions,
+        assumption.event_supervisor_observable,
+        event_unobservable_supervisor)
+    estimation_result_attacker = GenerateACAGFunctionTools.generate_unobserver_reach_attacker(
+        assumption.state_initial_origin_ststem,
+        assumption.transition_origin_system,
+        assumption.event_attacker_observable,
+        assumption.state_supervisor,
+        assumption.transition_supervisor,
+        event_unobservable_attacker)
+    pruned, q0_tags, lable_ACAG_map = AOACAGSystemCreater.generate_lazy_AO_ACAG_transition(
+        event_unobservable_attacker,
+        event_vulnerable,
+        event_alterable,
+        event_unobservable_supervisor,
+        closed_loop.transitions,
+        assumption.transition_origin_system,
+        assumption.transition_supervisor,
+        assumption.state_initial_origin_ststem,
+        list(closed_loop.initial_states),
+        assumption.state_initial_supervisor,
+        estimation_result_supervisor,
+        estimation_result_attacker,
+        assumption.state_system_secret)
+    pruned, _ = PrunedAOACAGSystemCreater.generate_pruned_AO_ACAG_transition(pruned, q0_tags)
+
+    secret_states = assumption.state_system_secret
+    victory_tags = {tag for ye, tag in lable_ACAG_map.items() if ye[1] and ye[1].issubset(secret_states)}
+    adjacency = {}
+    for ((qe_tags, _), _), next_qe_tags in pruned.items():
+        adjacency.setdefault(qe_tags, []).append(next_qe_tags)
+    visited, queue = {q0_tags}, deque([q0_tags])
+    while queue:
+        qe_tags = queue.popleft()
+        if any(tag in victory_tags for tag in qe_tags):
+            return True
+        for next_qe_tags in adjacency.get(qe_tags, ()):
+            if next_qe_tags not in visited:
+                visited.add(next_qe_tags)
+                queue.append(next_qe_tags)
+    return False
+
+
+def brute_force_sweep(assumption):
+    admitting = 0
+    vulnerable, alterable = sorted(EVENT_VULNERABLE), sorted(EVENT_ALTERABLE)
+    for n_v in range(len(vulnerable) + 1):
+        for v in combinations(vulnerable, n_v):
+            for n_a in range(len(alterable) + 1):
+                for a in combinations(alterable, n_a):
+                    admitting += brute_force_admits(assumption, set(v), set(a))
+    return admitting
+
+
+def main():
+    header = (f"{'|X|':>5} {'|Z|':>4} {'sets':>5} {'brute(ms)':>10} {'exhaustive(ms)':>15} {'monotone(ms)':>13} "
+              f"{'evaluated':>10} {'minimal':>8} {'wrong':>6}")
+    print(header)
+    print("-" * len(header))
+    for n_states, n_supervisor_states in SIZES:
+        assumption = product_assumption(n_states, n_supervisor_states)
+
+        start = time.perf_counter()
+        brute_admitting = brute_force_sweep(assumption)
+        brute_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        exhaustive = CapabilitySweep(assumption).sweep(EVENT_VULNERABLE, EVENT_ALTERABLE, monotone=False)
+        exhaustive_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        monotone = CapabilitySweep(assumption).sweep(EVENT_VULNERABLE, EVENT_ALTERABLE, monotone=True)
+        monotone_time = time.perf_counter() - start
+
+        assert exhaustive['admitting'] == brute_admitting
+        # 单调性剪枝是启发式的，统计与精确结果不一致的能力集数
+        wrong = sum(a['admits_attack'] != b['admits_attack']
+                    for a, b in zip(exhaustive['results'], monotone['results']))
+        print(f"{n_states:>5} {n_supervisor_states:>4} {monotone['capability_sets']:>5} "
+              f"{brute_time * 1e3:>10.1f} {exhaustive_time * 1e3:>15.1f} {monotone_time * 1e3:>13.1f} "
+              f"{monotone['evaluated']:>10} {len(monotone['minimal_sets']):>8} {wrong:>6}")
+
+
+if __name__ == "__main__":
+    main()
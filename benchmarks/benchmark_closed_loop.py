@@ -0,0 +1,43 @@
+import time
+from src.generate_cso_attacker.system_DFA_basic import ClosedLoopSystem
+from .synthetic_models import product_assumption
+
+"""
+闭环系统构建耗时：Python BFS 与 numpy 向量化后端对比
+运行方式（项目根目录）: python -m benchmarks.benchmark_closed_loop
+"""
+
+SIZES = [(1000, 10), (10000, 10), (10000, 100), (100000, 10)]
+
+
+def benchmark_closed_loop(n_states, n_supervisor_states, seed=0):
+    assumption = product_assumption(n_states, n_supervisor_states, seed)
+    result = {"n_states": n_states, "n_supervisor_states": n_supervisor_states}
+    for backend in ("python", "numpy"):
+        start = time.perf_counter()
+        transitions = ClosedLoopSystem.generate_transition_closed_loop_system(
+            assumption.state_oringin_system,
+            assumption.state_initial_origin_ststem,
+            assumption.state_initial_supervisor,
+            assumption.event_system,
+            assumption.transition_origin_system,
+            assumption.transition_supervisor,
+            backend=backend)
+        result[backend] = time.perf_counter() - start
+        result[f"{backend}_transitions"] = transitions
+    result["same"] = result.pop("python_transitions") == result.pop("numpy_transitions")
+    return result
+
+
+def main():
+    header = f"{'|X|':>7} {'|Z|':>5} {'python(ms)':>11} {'numpy(ms)':>10} {'speedup':>8} {'same':>5}"
+    print(header)
+    print("-" * len(header))
+    for n_states, n_supervisor_states in SIZES:
+        r = benchmark_closed_loop(n_states, n_supervisor_states)
+        print(f"{r['n_states']:>7} {r['n_supervisor_states']:>5} {r['python'] * 1000:>11.1f} "
+              f"{r['numpy'] * 1000:>10.1f} {r['python'] / r['numpy']:>8.2f} {str(r['same']):>5}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import time
+import tracemalloc
+from src.generate_cso_attacker.system_DFA_basic import ClosedLoopSystem
+from src.generate_cso_attacker.generate_ACAG_helper import GenerateACAGFunctionTools
+from src.generate_cso_attacker.generate_ACAG_generator import ACAGSystemCreater
+from src.generate_cso_attacker.generate_AO_ACAG_generator import AOACAGSystemCreater
+from .synthetic_models import ring_assumption
+
+"""
+AO-ACAG 构建：先生成完整 ACAG 再聚类、按需展开直接聚类 的耗时与峰值内存对比
+运行方式（项目根目录）: python -m benchmarks.benchmark_lazy_AO_ACAG
+"""
+
+SIZES = [50, 100, 200, 400]
+
+
+def prepare(n_states, seed=0):
+    assumption = ring_assumption(n_states, seed)
+    event_unobservable_supervisor = ClosedLoopSystem.generate_unobservable_events(
+        assumption.event_system, assumption.event_supervisor_observable)
+    event_unobservable_attacker = ClosedLoopSystem.generate_unobservable_events(
+        assumption.event_system, assumption.event_attacker_observable)
+    closed_loop = ClosedLoopSystem.build_closed_loop_automaton(
+        assumption.state_initial_origin_ststem,
+        assumption.state_initial_supervisor,
+        assumption.event_system,
+        assumption.transition_origin_system,
+        assumption.transition_supervisor)
+    estimation_result_supervisor = GenerateACAGFunctionTools.generate_unobserver_reach_supervisor(
+        closed_loop.transitions,
+        assumption.event_supervisor_observable,
+        event_unobservable_supervisor)
+    estimation_result_attacker = GenerateACAGFunctionTools.generate_unobserver_reach_attacker(
+        assumption.state_initial_origin_ststem,
+        assumption.transition_origin_system,
+        assumption.event_attacker_observable,
+        assumption.state_supervisor,
+        assumption.transition_supervisor,
+        event_unobservable_attacker)
+    return (
+        event_unobservable_attacker,
+        assumption.event_vulnerable,
+        assumption.event_alterable,
+        event_unobservable_supervisor,
+        closed_loop.transitions,
+        assumption.transition_origin_system,
+        assumption.transition_supervisor,
+        assumption.state_initial_origin_ststem,
+        list(closed_loop.initial_states),
+        assumption.state_initial_supervisor,
+        estimation_result_supervisor,
+        estimation_result_attacker,
+        assumption.state_system_secret,
+    )
+
+
+def eager_AO_ACAG(args):
+    all_ACAG_transition, initial_env_state = ACAGSystemCreater.generate_ACAG_transition(*args)
+    lable_ACAG_map = {}
+    for (curr, _), nxt in all_ACAG_transition.items():
+        for ye in (curr, nxt):
+            if len(ye) == 4 and ye not in lable_ACAG_map:
+                lable_ACAG_map[ye] = f"ye{len(lable_ACAG_map)}"
+    ao_transitions, _ = AOACAGSystemCreater.generate_AO_ACAG_transition(
+        all_ACAG_transition, initial_env_state, lable_ACAG_map, args[0])
+    return ao_transitions, len(all_ACAG_transition)
+
+
+def lazy_AO_ACAG(args):
+    ao_transitions, _, lable_ACAG_map = AOACAGSystemCreater.generate_lazy_AO_ACAG_transition(*args)
+    return ao_transitions, len(lable_ACAG_map)
+
+
+def measure(func, args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    header = (f"{'|X|':>5} {'|ACAG|':>8} {'|Ye| lazy':>9} {'|AO|':>6} "
+              f"{'eager(ms)':>10} {'lazy(ms)':>9} "
+              f"{'eager(KB)':>10} {'lazy(KB)':>9}")
+    print(header)
+    print("-" * len(header))
+    for n_states in SIZES:
+        args = prepare(n_states)
+        (eager_ao, n_ACAG), eager_time, eager_peak = measure(eager_AO_ACAG, args)
+        (lazy_ao, n_ye), lazy_time, lazy_peak = measure(lazy_AO_ACAG, args)
+        assert len(eager_ao) == len(lazy_ao)
+        print(f"{n_states:>5} {n_ACAG:>8} {n_ye:>9} {len(lazy_ao):>6} "
+              f"{eager_time * 1e3:>10.1f} {lazy_time * 1e3:>9.1f} "
+              f"{eager_peak / 1024:>10.0f} {lazy_peak / 1024:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import argparse
+import json
+import logging
+import platform
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from src.generate_cso_attacker.generate_CSO_attacker_entry import CSO_Attacker_Generator
+from src.generate_cso_attacker.model_generator import generate_model
+from src.generate_cso_attacker.stage_cache import StageCache, fingerprint
+from src.generate_cso_attacker.stage_profiler import StageProfiler
+
+"""
+整条流水线随模型规模的变化：对 model_generator 的各类结构按规模递增运行 generate_cso_attacker（headless、不缓存），
+记录每个阶段的墙钟 / CPU 时间、峰值内存与图规模，写成 JSON 以便在不同提交之间比较。
+每个规模点在单独的子进程中运行，峰值 RSS 互不累积；某一规模超过 budget 秒后不再继续增大该结构。
+运行方式（项目根目录）:
+    python -m benchmarks.benchmark_pipeline --out bench.json
+    python -m benchmarks.benchmark_pipeline --out new.json --compare bench.json
+"""
+
+REPORT_VERSION = 1
+
+# (结构, 规模, 监督器状态数)，ACAG 随状态估计的组合数增长很快，规模需保持在较小范围
+SWEEPS = {
+    "chain": [(10, 1), (20, 1), (30, 1), (40, 1), (20, 3), (40, 3)],
+    "grid": [(3, 1), ((3, 4), 1), (4, 1), ((3, 4), 2)],
+    "random": [(8, 1), (10, 1), (12, 1), (15, 1), (20, 2)],
+    "product": [([3, 3], 1), ([3, 4], 1), ([2, 2, 3], 1), ([3, 3, 3], 1), ([3, 3, 3], 2)],
+}
+
+
+def git_commit():
+    """
+    当前提交号，不在 git 仓库中时为 None
+    """
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_point(family, size, n_supervisor_states, seed, trace_memory):
+    """
+    子进程中执行：生成模型并运行整条流水线，返回该规模点的记录
+    """
+    assumption = generate_model(family, size, n_supervisor_states, seed=seed)
+    profiler = StageProfiler(trace_memory=trace_memory)
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as log_dir:
+        results = CSO_Attacker_Generator.generate_cso_attacker(
+            assumption, cache=StageCache(enabled=False), draw=False, log_dir=log_dir,
+            log_level=logging.WARNING, log_background=False, profiler=profiler)
+    return {
+        "family": family,
+        "size": size,
+        "n_supervisor_states": n_supervisor_states,
+        "seed": seed,
+        "model": fingerprint("model", assumption.to_dict()),
+        "plant_states": len(assumption.state_oringin_system),
+        "plant_transitions": len(assumption.transition_origin_system),
+        "closed_loop_states": len(results["closed_loop"]),
+        "ACAG_transitions": len(results["ACAG"]),
+        "AO_ACAG_transitions": len(results["AO_ACAG"]),
+        "pruned_AO_ACAG_transitions": len(results["pruned_AO_ACAG"]),
+        "SCC": len(results["SCC"]),
+        "seconds": round(time.perf_counter() - start, 6),
+        "stages": profiler.records,
+    }
+
+
+def run_sweeps(families=None, seed=0, budget=30.0, trace_memory=False):
+    families = families or list(SWEEPS)
+    runs = []
+    # max_tasks_per_child=1：每个规模点一个新进程
+    with ProcessPoolExecutor(max_workers=1, max_tasks_per_child=1) as executor:
+        for family in families:
+            for size, n_supervisor_states in SWEEPS[family]:
+                run = executor.submit(run_point, family, size, n_supervisor_states, seed,
+                                      trace_memory).result()
+                runs.append(run)
+                print(f"{family:<8} {str(size):<12} |Z|={n_supervisor_states:<3} "
+                      f"closed-loop {run['closed_loop_states']:>6}  ACAG {run['ACAG_transitions']:>8}  "
+                      f"AO-ACAG {run['AO_ACAG_transitions']:>7}  {run['seconds']:>8.2f}s")
+                if run["seconds"] > budget:
+                    print(f"{family}: 超过 {budget}s，跳过更大的规模")
+                    break
+    return {
+        "version": REPORT_VERSION,
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "trace_memory": trace_memory,
+        "runs": runs,
+    }
+
+
+def _run_key(run):
+    return run["family"], json.dumps(run["size"]), run["n_supervisor_states"], run["seed"]
+
+
+def compare(report, baseline):
+    """
+    按 (结构, 规模, 监督器状态数, 种子) 对齐两份报告，逐阶段打印耗时比值（新 / 旧）；
+    模型指纹不同（生成器本身变了）的规模点单独标出
+    """
+    old_runs = {_run_key(run): run for run in baseline["runs"]}
+    print(f"对比基线 {baseline.get('commit')} -> {report.get('commit')}")
+    for run in report["runs"]:
+        old = old_runs.get(_run_key(run))
+        if old is None:
+            continue
+        label = f"{run['family']} {run['size']} |Z|={run['n_supervisor_states']}"
+        if old["model"] != run["model"]:
+            print(f"{label}: 模型不同，不可比较")
+            continue
+        old_stages = {record["stage"]: record for record in old["stages"]}
+        print(f"{label}: total {old['seconds']:.3f}s -> {run['seconds']:.3f}s "
+              f"(x{run['seconds'] / max(old['seconds'], 1e-9):.2f})")
+        for record in run["stages"]:
+            before = old_stages.get(record["stage"])
+            if before is None:
+                continue
+            print(f"    {record['stage']:<24} {before['wall_seconds'] * 1e3:>10.1f} -> "
+                  f"{record['wall_seconds'] * 1e3:>10.1f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CSO 攻击者流水线规模基准")
+    parser.add_argument("--out", default="bench-pipeline.json", help="结果 JSON 路径")
+    parser.add_argument("--families", nargs="*", choices=sorted(SWEEPS), default=None, help="只运行这些结构")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--budget", type=float, default=30.0, help="单个规模点超过该秒数后停止增大规模")
+    parser.add_argument("--trace-memory", action="store_true", help="记录每个阶段的 tracemalloc 峰值（较慢）")
+    parser.add_argument("--compare", default=None, help="与之前的结果 JSON 对比")
+    args = parser.parse_args(argv)
+
+    report = run_sweeps(args.families, args.seed, args.budget, args.trace_memory)
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(report, json.load(f))
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+from src.generate_cso_attacker.model_generator import ring_assumption, product_assumption
+
+"""
+基准测试用的合成系统模型：ring_assumption / product_assumption 已移至 model_generator，此处保留原导入路径
+"""
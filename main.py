@@ -1,17 +1,26 @@
+import argparse
 import sys
 import os
 from src.generate_cso_attacker.generate_CSO_attacker_entry import CSO_Attacker_Generator
+from src.generate_cso_attacker.stage_cache import StageCache
 from utils.tools import Tools   
 
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))    
-def run_cso_attacker_generation():
+def run_cso_attacker_generation(argv=None):
+    parser = argparse.ArgumentParser(description="CSO 攻击者生成")
+    # 缓存条目是 pickle，只对自己可写的目录启用
+    parser.add_argument("--cache", nargs="?", const=".cache/cso-attacker", default=None, metavar="DIR",
+                        help="启用阶段结果磁盘缓存（默认目录 .cache/cso-attacker）")
+    args = parser.parse_args(argv)
+    cache = StageCache(args.cache) if args.cache else None
+
     # 在运行生成器之前清空cso-attacker目录
     cso_attacker_dir = "resources/cso-attacker"
     print(f"正在清空 {cso_attacker_dir} 目录...")
     Tools.clear_directory(cso_attacker_dir)
     print("目录已清空，开始运行CSO攻击者生成器...")
-    CSO_Attacker_Generator.generate_cso_attacker()
+    CSO_Attacker_Generator.generate_cso_attacker(cache=cache)
 
 if __name__ == "__main__":
-    run_cso_attacker_generation()
\ No newline at end of file
+    run_cso_attacker_generation()
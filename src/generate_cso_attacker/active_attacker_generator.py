@@ -1,84 +1,73 @@
 import graphviz
-import networkx as nx
+from .scc_analysis import SCCAnalysis
+from .attacker_strategy import ActiveAttacker
 
 class AttackerGenerator:
 
+    # 颜色配置: Alpha (洋红), Beta (橙), Sink (灰), Complex (绿)
+    SCC_COLORS = {'alpha': "#DC26DC", 'beta': '#D97706', 'sink': "#6B0513", 'complex': '#16A34A'}
+
+    # pruned AO-ACAG 的 SCC 识别与分类，不涉及绘图
+    @staticmethod
+    def classify_pruned_AO_ACAG_SCC(pruned_transitions):
+        """
+        :return: (scc_log, node_scc_type, edge_scc_type)
+                 scc_log: {"SCC_i": {"type", "node_count", "exit_node_types"}}
+                 node_scc_type / edge_scc_type: 节点 / SCC 内部边 -> 所属 SCC 的类型
+        """
+        analysis = SCCAnalysis.from_pruned_transitions(pruned_transitions)
+        return analysis.scc_log(), analysis.node_scc_type(), analysis.edge_scc_type()
+
+    # 在 MappedGraph 上做 SCC 识别与分类，不还原字典
+    @staticmethod
+    def classify_mapped_AO_ACAG_SCC(graph, edge_mask=None):
+        """
+        graph: write_AO_ACAG 写出的 MappedGraph；edge_mask 为 prune_mapped_AO_ACAG 返回的掩码，
+               为 None 时分析除 AX 边以外的全部边
+        分类规则与 classify_pruned_AO_ACAG_SCC 相同；SCC 按节点 id 顺序编号，
+        编号可能与字典版本不同，但每个 SCC 的节点集合与类型一致。
+        :return: (scc_log, node_scc), node_scc 为 {节点 id: SCC 编号}
+        """
+        analysis = SCCAnalysis.from_mapped(graph, edge_mask)
+        return analysis.scc_log(), analysis.node_scc()
+
+    # 由 pruned AO-ACAG 提取可执行的主动攻击者（凝聚 DAG、到胜利状态的可达性与篡改策略表）
+    @staticmethod
+    def extract_active_attacker(pruned_transitions, ao_transitions, q0_tags, lable_ACAG_map, secret_states):
+        """
+        ao_transitions: 剪枝前的 AO-ACAG，必胜区需要环境在每个 Qe 下的全部观测事件
+        :return: ActiveAttacker，attacker.tamper(qe, o_sigma) 为 O(1) 查表
+        """
+        return ActiveAttacker.from_pruned_transitions(pruned_transitions, ao_transitions, q0_tags,
+                                                      lable_ACAG_map, secret_states)
+
     @staticmethod
     def draw_purned_AO_ACAG_graph_marked_SCC(pruned_transitions, 
                                             lable_ACAG_map,
                                             secret_states,
                                             qe_map, 
-                                            filename):
-        G_analysis = nx.DiGraph()
-        
+                                            filename,
+                                            render=True,
+                                            scc_result=None):
+        """
+        scc_result: classify_pruned_AO_ACAG_SCC 的结果，已计算过（如流水线的 SCC 阶段）时直接传入，避免重复分析
+        """
+        # 标签 -> ACAG 状态的逆映射只建一次
+        tag_to_state = {v: k for k, v in lable_ACAG_map.items()}
+
         def check_is_vic(tags):
-            tag_to_state = {v: k for k, v in lable_ACAG_map.items()}
             return any(len(tag_to_state.get(t, [])) >= 2 and 
                     tag_to_state[t][1].issubset(secret_states) and 
                     len(tag_to_state[t][1]) > 0 for t in tags)
 
-        # 1. 构图
-        for (qa_info, t_sigma), next_qe_tags in pruned_transitions.items():
-            u_qe = qa_info[0]
-            G_analysis.add_node(u_qe, kind='Qe')
-            G_analysis.add_node(qa_info, kind='Qa')
-            G_analysis.add_node(next_qe_tags, kind='Qe')
-            G_analysis.add_edge(u_qe, qa_info, role='env', label=str(qa_info[1]))
-            G_analysis.add_edge(qa_info, next_qe_tags, role='atk', label=str(t_sigma))
-
-        # 2. 识别 SCC (节点数 > 1 或有自环)
-        sccs = [set(scc) for scc in nx.strongly_connected_components(G_analysis) 
-                if len(scc) > 1 or G_analysis.has_edge(list(scc)[0], list(scc)[0])]
-
-        # 颜色配置: Alpha (洋红), Beta (橙), Sink (灰), Complex (绿)
-        COLORS = {'alpha': "#DC26DC", 'beta': '#D97706', 'sink': "#6B0513", 'complex': '#16A34A'}
-        node_style_map, edge_style_map, scc_log = {}, {}, {}
-
-        def classify_scc_swapped(nodes):
-            exit_edges = [(u, v) for u, v in G_analysis.edges(nodes) if v not in nodes]
-            exit_nodes = set(v for _, v in exit_edges)
-            
-            # --- 判定 1: Sink SCC ---
-            if not exit_edges:
-                return 'sink'
-            
-            # --- 判定 2: 结构约束检查 ---
-            for q_a in [n for n in nodes if G_analysis.nodes[n].get('kind') == 'Qa']:
-                successors_in_phi = [v for v in G_analysis.successors(q_a) if v in nodes]
-                if len(successors_in_phi) != 1:
-                    return 'complex'
-
-            # --- 判定 3: 类型识别 (逻辑已对调) ---
-            
-            # 对调后的 alpha-SCC: 所有出口节点都是 attack AO-states (Qa)
-            is_alpha_exit = all(G_analysis.nodes[v].get('kind') == 'Qa' for v in exit_nodes)
-            
-            # 对调后的 beta-SCC: 所有出口节点都是 environment AO-states (Qe)
-            is_beta_exit = all(G_analysis.nodes[v].get('kind') == 'Qe' for v in exit_nodes)
-
-            if is_alpha_exit:
-                return 'alpha'
-            if is_beta_exit:
-                return 'beta'
-
-            return 'complex'
-
-        # 处理 SCC 并染色
-        for i, scc_nodes in enumerate(sccs):
-            s_type = classify_scc_swapped(scc_nodes)
-            color = COLORS[s_type]
-            
-            scc_log[f"SCC_{i}"] = {
-                "type": s_type,
-                "node_count": len(scc_nodes),
-                "exit_node_types": list(set(G_analysis.nodes[v]['kind'] for u, v in G_analysis.edges(scc_nodes) if v not in scc_nodes))
-            }
-            
-            for n in scc_nodes:
-                node_style_map[n] = color
-            for u, v in G_analysis.edges(scc_nodes):
-                if v in scc_nodes:
-                    edge_style_map[(u, v)] = color
+        # 1-2. 识别、分类 SCC
+        if scc_result is None:
+            scc_result = AttackerGenerator.classify_pruned_AO_ACAG_SCC(pruned_transitions)
+        scc_log, node_scc_type, edge_scc_type = scc_result
+
+        COLORS = AttackerGenerator.SCC_COLORS
+        node_style_map = {n: COLORS[t] for n, t in node_scc_type.items()}
+        edge_style_map = {e: COLORS[t] for e, t in edge_scc_type.items()}
 
         # 3. 绘图
         dot = graphviz.Digraph(comment='Swapped SCC Definition Graph', format='svg')
@@ -129,5 +118,6 @@ class AttackerGenerator:
                             penwidth='1.8' if e_c in [COLORS['alpha'], COLORS['beta']] else '1.0')
                     drawn_edges.add(edge_key)
 
-        dot.render(filename, cleanup=True)
+        if render:
+            dot.render(filename, cleanup=True)
         return dot, scc_log
\ No newline at end of file
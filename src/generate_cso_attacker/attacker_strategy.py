@@ -0,0 +1,208 @@
+from array import array
+from collections import Counter, deque
+from .scc_analysis import SCCAnalysis
+
+"""
+从 pruned AO-ACAG 提取可执行的主动攻击者（线性时间的后处理，必胜区另需剪枝前的 AO-ACAG）：
+1. 凝聚 DAG：SCCAnalysis 的全部强连通分量按 Tarjan 完成顺序（逆拓扑序）排列，逐分量得到能否到达胜利状态；
+2. 胜利状态：Qe 中存在某个 ACAG 状态，其攻击者估计非空且包含于秘密状态（与绘图中的 check_is_vic 相同）；
+3. 反向 BFS：
+   - distance: 环境配合时到最近胜利 Qe 的步数（Qe -> Qa -> Qe' 计两步）
+   - 必胜区（attractor）：Qa 只需一个后继必胜，Qe 需全部后继必胜；rank 为必胜时最多还需的步数。
+     Qe 的后继必须按未剪枝的 AO-ACAG 计数：只能篡改到 AX 的 (Qe, o_sigma) 在剪枝时整体消失，
+     但环境仍可能产生 o_sigma，这类选择对攻击者是必败的
+4. 篡改策略：每个 (Qe, 观测事件 o_sigma) 选一个篡改事件 t_sigma，
+   必胜时选 rank 最小的后继，否则选 distance 最小的后继，都不可达时保留剪枝后的第一个合法选择。
+策略存为按行展开的 int 表 policy[Qe 下标 * 事件数 + 事件下标] = 篡改事件下标（-1 为该 Qe 下不会观测到此事件），在线查询为 O(1)。
+"""
+
+UNREACHABLE = -1
+
+
+def victory_states(qe_nodes, lable_ACAG_map, secret_states):
+    """
+    :return: 揭示秘密的 Qe 集合
+    """
+    tag_to_state = {v: k for k, v in lable_ACAG_map.items()}
+
+    def is_vic(tags):
+        for tag in tags:
+            state = tag_to_state.get(tag)
+            if state is not None and len(state) >= 2 and state[1] and state[1].issubset(secret_states):
+                return True
+        return False
+    return {qe for qe in qe_nodes if is_vic(qe)}
+
+
+class ActiveAttacker:
+    """
+    用法：
+        attacker = ActiveAttacker.from_pruned_transitions(pruned, ao, q0_tags, lable_ACAG_map, secret_states)
+        t_sigma = attacker.tamper(qe, o_sigma)
+        next_qe = attacker.step(qe, o_sigma)
+    qe_index: Qe -> 行号；events / event_index: 事件表；policy: array('i')，按行展开的 [Qe 数 × 事件数] 表；
+    successor: 与 policy 同形，按策略篡改后到达的 Qe 行号；
+    winning / rank / distance: 每个 Qe 是否必胜、必胜 rank、到胜利状态的步数（不可达为 -1）；
+    scc_reaches: 每个非平凡 SCC（与 scc_log 的 SCC_i 对应）能否到达胜利状态。
+    """
+    __slots__ = ('initial', 'qe_nodes', 'qe_index', 'events', 'event_index', 'policy', 'successor',
+                 'victory', 'winning', 'rank', 'distance', 'scc_reaches', 'condensation')
+
+    @classmethod
+    def from_pruned_transitions(cls, pruned_transitions, ao_transitions, q0_tags, lable_ACAG_map, secret_states,
+                                analysis=None):
+        """
+        ao_transitions: 剪枝前的 AO-ACAG，用于统计每个 Qe 下环境可以产生的全部观测事件
+        analysis: 已有的 SCCAnalysis（同一 pruned AO-ACAG），为 None 时新建
+        """
+        if analysis is None:
+            analysis = SCCAnalysis.from_pruned_transitions(pruned_transitions)
+        nodes, kinds, adjacency = analysis.nodes, analysis.kinds, analysis.adjacency
+        n = len(nodes)
+        node_ids = {node: i for i, node in enumerate(nodes)}
+
+        # 1. 胜利状态与凝聚 DAG 上的可达性（分量按逆拓扑序，后继分量总是先处理）
+        qe_ids = [u for u in range(n) if kinds[u] == 'Qe']
+        target = [False] * n
+        for qe in victory_states([nodes[u] for u in qe_ids], lable_ACAG_map, secret_states):
+            target[node_ids[qe]] = True
+        condensation = analysis.condensation()
+        reaches = [False] * len(analysis.components)
+        for c, scc in enumerate(analysis.components):
+            reaches[c] = any(target[u] for u in scc) or any(reaches[d] for d in condensation[c])
+
+        # 2. 反向 BFS：最短距离与必胜区
+        predecessors = [[] for _ in range(n)]
+        for u, targets in enumerate(adjacency):
+            for v in targets:
+                predecessors[v].append(u)
+        distance = [UNREACHABLE] * n
+        queue = deque(u for u in range(n) if target[u])
+        for u in queue:
+            distance[u] = 0
+        while queue:
+            v = queue.popleft()
+            for u in predecessors[v]:
+                if distance[u] == UNREACHABLE:
+                    distance[u] = distance[v] + 1
+                    queue.append(u)
+
+        rank = [UNREACHABLE] * n
+        pending = [len(targets) for targets in adjacency]
+        env_moves = Counter(qe for qe, _ in dict.fromkeys(qa_info for qa_info, _ in ao_transitions))
+        for u in qe_ids:
+            pending[u] = env_moves[nodes[u]]
+        queue = deque(u for u in range(n) if target[u])
+        for u in queue:
+            rank[u] = 0
+        while queue:
+            v = queue.popleft()
+            for u in predecessors[v]:
+                if rank[u] != UNREACHABLE:
+                    continue
+                pending[u] -= 1
+                # Qa 由攻击者选择，一个必胜后继即可；Qe 由环境选择，需未剪枝 AO-ACAG 中的全部后继必胜
+                if kinds[u] == 'Qa' or pending[u] == 0:
+                    rank[u] = rank[v] + 1
+                    queue.append(u)
+
+        # 3. 策略表
+        attacker = cls()
+        attacker.initial = q0_tags
+        attacker.qe_nodes = [nodes[u] for u in qe_ids]
+        attacker.qe_index = {nodes[u]: row for row, u in enumerate(qe_ids)}
+        events = {}
+        for (qa_info, t_sigma) in pruned_transitions:
+            events.setdefault(qa_info[1], len(events))
+            events.setdefault(t_sigma, len(events))
+        attacker.events = list(events)
+        attacker.event_index = events
+        attacker.policy = array('i', [UNREACHABLE]) * (len(qe_ids) * len(events))
+        attacker.successor = array('i', [UNREACHABLE]) * (len(qe_ids) * len(events))
+
+        def preference(v):
+            if rank[v] != UNREACHABLE:
+                return 0, rank[v]
+            if distance[v] != UNREACHABLE:
+                return 1, distance[v]
+            return 2, 0
+
+        best = {}
+        for (qa_info, t_sigma), next_qe in pruned_transitions.items():
+            key = preference(node_ids[next_qe])
+            if qa_info not in best or key < best[qa_info][0]:
+                best[qa_info] = (key, t_sigma, next_qe)
+        for (qe, o_sigma), (_, t_sigma, next_qe) in best.items():
+            cell = attacker.qe_index[qe] * len(events) + events[o_sigma]
+            attacker.policy[cell] = events[t_sigma]
+            attacker.successor[cell] = attacker.qe_index[next_qe]
+
+        attacker.victory = [target[u] for u in qe_ids]
+        attacker.winning = [rank[u] != UNREACHABLE for u in qe_ids]
+        attacker.rank = array('i', [rank[u] for u in qe_ids])
+        attacker.distance = array('i', [distance[u] for u in qe_ids])
+        attacker.condensation = condensation
+        attacker.scc_reaches = [reaches[analysis.component_index[next(iter(scc))]] for scc in analysis.sccs]
+        return attacker
+
+    def tamper(self, qe, o_sigma):
+        """
+        在 qe 处观测到 o_sigma 时应替换成的事件；qe 下不会出现 o_sigma 时返回 None
+        """
+        row = self.qe_index.get(qe)
+        col = self.event_index.get(o_sigma)
+        if row is None or col is None:
+            return None
+        t = self.policy[row * len(self.events) + col]
+        return None if t == UNREACHABLE else self.events[t]
+
+    def step(self, qe, o_sigma):
+        """
+        按策略篡改后到达的 Qe；无对应策略时返回 None
+        """
+        row = self.qe_index.get(qe)
+        col = self.event_index.get(o_sigma)
+        if row is None or col is None:
+            return None
+        nxt = self.successor[row * len(self.events) + col]
+        return None if nxt == UNREACHABLE else self.qe_nodes[nxt]
+
+    def is_winning(self, qe):
+        """
+        无论环境如何选择观测事件，攻击者都能迫使系统到达揭示秘密的状态
+        """
+        row = self.qe_index.get(qe)
+        return row is not None and self.winning[row]
+
+    def replay_winning(self, ao_transitions):
+        """
+        检查必胜区：对每个非胜利的必胜 Qe 与环境在未剪枝 AO-ACAG 中的每个观测事件 o_sigma，
+        按策略篡改一步必须到达 rank 更小的必胜 Qe（不是 AX），归纳可知攻击者在 rank 步内必胜。
+        :return: 不满足的 (Qe, o_sigma) 列表，正确时为空
+        """
+        failures = []
+        for (qe, o_sigma) in dict.fromkeys(qa_info for qa_info, _ in ao_transitions):
+            row = self.qe_index.get(qe)
+            if row is None or not self.winning[row] or self.victory[row]:
+                continue
+            t_sigma = self.tamper(qe, o_sigma)
+            next_qe = ao_transitions.get(((qe, o_sigma), t_sigma)) if t_sigma is not None else None
+            next_row = self.qe_index.get(next_qe)
+            if (next_qe != self.step(qe, o_sigma) or next_row is None or not self.winning[next_row]
+                    or self.rank[next_row] >= self.rank[row]):
+                failures.append((qe, o_sigma))
+        return failures
+
+    def summary(self):
+        initial_row = self.qe_index.get(self.initial)
+        return {
+            "Qe_states": len(self.qe_nodes),
+            "events": len(self.events),
+            "policy_entries": len(self.policy) - self.policy.count(UNREACHABLE),
+            "victory_states": sum(self.victory),
+            "winning_states": sum(self.winning),
+            "initial_winning": initial_row is not None and self.winning[initial_row],
+            "initial_distance": None if initial_row is None else self.distance[initial_row],
+            "components": len(self.condensation),
+            "SCC_reaching_victory": sum(self.scc_reaches),
+        }
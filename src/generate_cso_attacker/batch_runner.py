@@ -0,0 +1,188 @@
+import argparse
+import json
+import os
+import re
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+from .system_DFA_basic import SystemAssumptions
+from .stage_cache import StageCache
+from .stage_profiler import StageProfiler
+from .utils.logger import flush_loggers
+from .generate_CSO_attacker_entry import CSO_Attacker_Generator
+
+"""
+批量攻击者综合：对大量 SystemAssumptions（不同的可篡改事件、秘密状态、监督器……）
+在进程池中逐个运行完整流水线（headless，不绘图），输出：
+- out_dir/<index>-<name>.json: 单个模型的各阶段规模、SCC 分类、主动攻击者摘要与各阶段耗时（StageProfiler）
+- out_dir/summary.json: 所有模型的汇总
+模型以 SystemAssumptions.to_dict() 的纯列表形式发给工作进程，
+每个工作进程把日志写到 log_dir/worker-<pid>/ 下，互不干扰。
+"""
+
+# 每个工作进程最多同时排队的模型数，流式输入时限制内存占用
+MAX_PENDING_PER_WORKER = 2
+
+
+def summarize_results(results):
+    """
+    从 generate_cso_attacker 的结果中提取可写入 JSON 的规模统计
+    """
+    scc_types = Counter(info["type"] for info in results["SCC"].values())
+    return {
+        "closed_loop_states": len(results["closed_loop"]),
+        "closed_loop_transitions": len(results["closed_loop"].transitions),
+        # ao_mode='lazy' 时不生成 ACAG
+        "ACAG_transitions": None if results["ACAG"] is None else len(results["ACAG"]),
+        "ACAG_states": len(results["lable_ACAG_map"]),
+        "AO_ACAG_transitions": len(results["AO_ACAG"]),
+        "AO_ACAG_states": len(results["lable_AOACAG_map"]),
+        "pruned_AO_ACAG_transitions": len(results["pruned_AO_ACAG"]),
+        "scc_types": dict(scc_types),
+        "active_attacker": results["active_attacker"].summary(),
+    }
+
+
+def result_path(out_dir, index, name):
+    """
+    单个模型的结果文件：名字中路径分隔符等字符替换为 _，加上序号避免重名模型互相覆盖
+    """
+    safe_name = re.sub(r"[^\w.-]+", "_", str(name)).strip("._") or "model"
+    return Path(out_dir) / f"{index:05d}-{safe_name}.json"
+
+
+def run_one(index, name, model, out_dir, log_dir="logs", cache_dir=None, ao_mode="compact"):
+    """
+    工作进程中执行：还原模型、运行流水线、写出单个模型的结果文件。
+    异常（包括写出结果文件失败）不向外抛出，记录在返回的摘要里，一个模型失败不影响整批。
+    :return: 摘要字典
+    """
+    worker_log_dir = Path(log_dir) / f"worker-{os.getpid()}"
+    worker_log_dir.mkdir(parents=True, exist_ok=True)
+    cache = StageCache(cache_dir) if cache_dir else StageCache(enabled=False)
+
+    summary = {"index": index, "name": name, "pid": os.getpid()}
+    start = time.perf_counter()
+    try:
+        assumption = SystemAssumptions.from_dict(model)
+        results = CSO_Attacker_Generator.generate_cso_attacker(
+            assumption, cache=cache, draw=False, log_dir=str(worker_log_dir), log_background='batch',
+            profiler=StageProfiler(), ao_mode=ao_mode)
+        summary["status"] = "ok"
+        summary.update(summarize_results(results))
+        detail = dict(summary, SCC=results["SCC"], stages=results["profile"]["stages"])
+    except Exception as e:
+        summary["status"] = "error"
+        summary["error"] = f"{type(e).__name__}: {e}"
+        detail = summary
+    finally:
+        # 工作进程退出时不执行 atexit，每个模型结束后写完该进程的日志队列
+        flush_loggers()
+    summary["seconds"] = round(time.perf_counter() - start, 6)
+    detail["seconds"] = summary["seconds"]
+
+    path = result_path(out_dir, index, name)
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(detail, f, ensure_ascii=False, indent=2)
+        summary["result_file"] = path.name
+    except (OSError, TypeError, ValueError) as e:
+        summary["status"] = "error"
+        summary["error"] = f"写出 {path.name} 失败: {type(e).__name__}: {e}"
+    return summary
+
+
+def _as_model(item, index):
+    """
+    统一输入：SystemAssumptions 对象或 to_dict() 形式的字典，
+    返回 (name, 纯字典)
+    """
+    if isinstance(item, dict):
+        return item.get("name", f"model_{index}"), item
+    return f"model_{index}", item.to_dict()
+
+
+def run_batch(assumptions, out_dir="resources/cso-attacker-batch", max_workers=None,
+              log_dir="logs", cache_dir=None, ao_mode="compact"):
+    """
+    :param assumptions: SystemAssumptions 或其字典形式的列表 / 迭代器，可以是生成器（流式读取）
+    :param max_workers: 进程数，None 为 CPU 核数；0 表示在当前进程中顺序执行
+    :param cache_dir: 阶段缓存目录，None 时不使用缓存
+    :param ao_mode: AO-ACAG 构建模式，见 generate_cso_attacker；'lazy' 不生成完整 ACAG
+    :return: 汇总字典（同时写入 out_dir/summary.json）
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+    summaries = []
+
+    if max_workers == 0:
+        for index, item in enumerate(assumptions):
+            name, model = _as_model(item, index)
+            summaries.append(run_one(index, name, model, out_dir, log_dir, cache_dir, ao_mode))
+    else:
+        max_workers = max_workers or os.cpu_count()
+        max_pending = max_workers * MAX_PENDING_PER_WORKER
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            pending = set()
+            for index, item in enumerate(assumptions):
+                # 在途任务达到上限时先等待，避免一次性把整个输入流提交进队列
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    summaries.extend(f.result() for f in done)
+                name, model = _as_model(item, index)
+                pending.add(executor.submit(run_one, index, name, model, out_dir, log_dir, cache_dir, ao_mode))
+            summaries.extend(f.result() for f in pending)
+
+    summaries.sort(key=lambda s: s["index"])
+    scc_types = Counter()
+    for s in summaries:
+        scc_types.update(s.get("scc_types", {}))
+    report = {
+        "models": len(summaries),
+        "failed": sum(s["status"] != "ok" for s in summaries),
+        "seconds": round(time.perf_counter() - start, 6),
+        "scc_types": dict(scc_types),
+        "results": summaries,
+    }
+    with open(out_dir / "summary.json", "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    return report
+
+
+def iter_models(path):
+    """
+    读取模型文件：.jsonl 每行一个模型（流式）；.json 为模型列表或单个模型
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        if str(path).endswith(".jsonl"):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+            return
+        data = json.load(f)
+    yield from (data if isinstance(data, list) else [data])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="对一批 SystemAssumptions 并行生成 CSO 攻击者")
+    parser.add_argument("models", help="模型文件（.json 列表或 .jsonl，每项为 SystemAssumptions.to_dict() 格式）")
+    parser.add_argument("--out", default="resources/cso-attacker-batch", help="结果输出目录")
+    parser.add_argument("--workers", type=int, default=None, help="进程数，默认 CPU 核数，0 为顺序执行")
+    parser.add_argument("--log-dir", default="logs", help="日志根目录，每个工作进程一个子目录")
+    parser.add_argument("--cache-dir", default=None, help="阶段缓存目录，默认不缓存")
+    parser.add_argument("--ao-mode", default="compact", choices=["compact", "lazy"],
+                        help="AO-ACAG 构建模式，lazy 不生成完整 ACAG（峰值内存更低）")
+    args = parser.parse_args(argv)
+
+    report = run_batch(iter_models(args.models), args.out, args.workers, args.log_dir, args.cache_dir,
+                       args.ao_mode)
+    print(f"models: {report['models']}, failed: {report['failed']}, seconds: {report['seconds']}")
+    print(f"SCC types: {report['scc_types']}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
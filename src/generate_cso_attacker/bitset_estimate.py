@@ -0,0 +1,128 @@
+"""
+位集形式的状态预估：
+每个状态对应一个二进制位，状态集合就是一个 Python int。
+集合的并、差与相等判定是整数运算，集合可以直接作为字典键；
+闭包与一步后继仍需逐个取出置位的位下标再查表，节省的是 frozenset 的构造与哈希，
+以及按 (mask, z) 记忆化后重复闭包的计算，而不是按机器字并行地扩展状态。
+"""
+
+def iter_bits(mask):
+    """
+    依次产生 mask 中置位的位下标（每次取最低置位，逐位进行）
+    """
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class StateBitset:
+    """
+    状态 <-> 位下标的编码表，位下标按首次出现的顺序分配
+    """
+    __slots__ = ('_bit_of', '_states')
+
+    def __init__(self, states=()):
+        self._bit_of = {}
+        self._states = []
+        for state in states:
+            self.bit(state)
+
+    def bit(self, state):
+        index = self._bit_of.get(state)
+        if index is None:
+            index = len(self._states)
+            self._bit_of[state] = index
+            self._states.append(state)
+        return index
+
+    def encode(self, states):
+        mask = 0
+        for state in states:
+            mask |= 1 << self.bit(state)
+        return mask
+
+    def decode(self, mask):
+        return frozenset(self._states[i] for i in iter_bits(mask))
+
+    def __len__(self):
+        return len(self._states)
+
+
+class BitsetObserver:
+    """
+    位集观察器运算：
+    - closure(mask, z): 不可观测可达闭包（精确不动点），可按监督器状态 z 过滤被禁止的事件
+    - post(mask, event): 集合经 event 一步到达的状态
+    闭包按 (mask, z) 记忆化，解码结果按 mask 缓存。
+    """
+    __slots__ = ('codec', 'events_unobservable', 'transition_supervisor',
+                 '_unobs_edges', '_post', '_unobs_succ', '_closures', '_decoded')
+
+    def __init__(self, transition, events_unobservable, transition_supervisor=None, codec=None):
+        self.codec = codec if codec is not None else StateBitset()
+        self.events_unobservable = frozenset(events_unobservable)
+        self.transition_supervisor = transition_supervisor
+        # 不可观出边: 位下标 -> [(event, 目标位掩码), ...]
+        self._unobs_edges = {}
+        # 一步后继: event -> {位下标: 目标位掩码}
+        self._post = {}
+        for (state, event), target in transition.items():
+            bit = self.codec.bit(state)
+            target_mask = 1 << self.codec.bit(target)
+            self._post.setdefault(event, {})[bit] = target_mask
+            if event in self.events_unobservable:
+                self._unobs_edges.setdefault(bit, []).append((event, target_mask))
+        # 按 z 合并后的不可观后继掩码: z -> {位下标: 掩码}
+        self._unobs_succ = {}
+        self._closures = {}
+        self._decoded = {}
+
+    def _successor_masks(self, state_supervisor):
+        succ = self._unobs_succ.get(state_supervisor)
+        if succ is None:
+            succ = {}
+            for bit, edges in self._unobs_edges.items():
+                mask = 0
+                for event, target_mask in edges:
+                    if (state_supervisor is None or self.transition_supervisor is None
+                            or (state_supervisor, event) in self.transition_supervisor):
+                        mask |= target_mask
+                if mask:
+                    succ[bit] = mask
+            self._unobs_succ[state_supervisor] = succ
+        return succ
+
+    def closure(self, mask, state_supervisor=None):
+        key = (mask, state_supervisor)
+        cached = self._closures.get(key)
+        if cached is not None:
+            return cached
+        succ = self._successor_masks(state_supervisor)
+        reach = frontier = mask
+        while frontier:
+            new = 0
+            for bit in iter_bits(frontier):
+                new |= succ.get(bit, 0)
+            frontier = new & ~reach
+            reach |= frontier
+        self._closures[key] = reach
+        return reach
+
+    def post(self, mask, event):
+        table = self._post.get(event)
+        if not table:
+            return 0
+        result = 0
+        for bit in iter_bits(mask):
+            result |= table.get(bit, 0)
+        return result
+
+    def encode(self, states):
+        return self.codec.encode(states)
+
+    def decode(self, mask):
+        states = self._decoded.get(mask)
+        if states is None:
+            states = self._decoded[mask] = self.codec.decode(mask)
+        return states
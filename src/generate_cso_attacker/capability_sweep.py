@@ -0,0 +1,281 @@
+import argparse
+import json
+import time
+from itertools import combinations
+
+from .system_DFA_basic import ClosedLoopSystem, SystemAssumptions
+from .generate_ACAG_helper import GenerateACAGFunctionTools
+from .generate_ACAG_generator import ACAGSystemCreater
+from .generate_AO_ACAG_generator import AOACAGSystemCreater
+from .stage_cache import StageCache, fingerprint
+
+"""
+攻击能力扫描：对 event_vulnerable × event_alterable 的所有子集 (V', A')，判断是否存在成功的 CSO 攻击者。
+- 闭环系统、监督器 / 攻击者观测器、初始 Ye 与 V/A 无关，只计算一次
+- ACAG 片段跨能力集复用：
+    Ye --sigma--> Ya 除篡改选项外与 V/A 无关，按 (Ye, sigma) 缓存；
+    Ya --t_sigma--> Ye' 不依赖篡改选项，按 (Ya 去掉选项, t_sigma) 缓存
+- 能力集按大小逐层枚举，默认逐个精确计算；V' 为空时 A' 不生效，相同的实际能力集只计算一次
+- 格剪枝（sweep(monotone=True)，可选）：已知可攻击集合的超集直接判为可攻击。
+  该单调性假设并不成立：GenerateACAGFunctionTools.tamper_events 把 sigma ∈ V' 的篡改选项换成 A'，
+  sigma 不在 A' 中时原样放行的选项随之消失，把 sigma 加入 V' 反而可能迫使攻击者篡改并暴露；
+  此外篡改成攻击者不可观的事件还会改变不可观闭包与 Qe 的聚类。
+  误判比例与模型有关，benchmark_capability_sweep 中 60 状态的模型 128 个能力集误判 67 个，只适合作快速估计
+攻击存在的判定（可达判据）：剪枝后的 AO-ACAG 中，从 q0 可达某个 Qe，其中含有 xi_A 非空且 xi_A ⊆ 秘密状态的 Ye。
+这里假定环境（系统实际发生的事件）配合攻击者，只要存在一条路径即可；
+attacker_strategy.ActiveAttacker 的 initial_winning 是更强的必胜判据（无论环境如何选择都能到达），
+因此可攻击的能力集在 generate_cso_attacker 的结果中 initial_winning 仍可能为 False。
+剪枝只删除指向 AX 的转移（Qa 的出边都指向 Qe，不会因死节点传播被删除），
+因此该 Qe 一旦在构建中出现即可判定，不必构建完整的 AO-ACAG。
+"""
+
+AX = frozenset({'AX'})
+
+
+class CapabilitySweep:
+    """
+    用法：
+        sweep = CapabilitySweep(assumption)
+        sweep.admits_attack({'o2'}, {'o3', 'empty'})     # 单个能力集
+        report = sweep.sweep()                           # 全部子集，报告最小可攻击能力集
+    可攻击指可达判据（见模块说明），与主动攻击者的必胜判据不同。
+    """
+
+    def __init__(self, assumption, cache=None):
+        self.assumption = assumption
+        cache = cache if cache is not None else StageCache(enabled=False)
+
+        self.event_unobservable_supervisor = ClosedLoopSystem.generate_unobservable_events(
+            assumption.event_system, assumption.event_supervisor_observable)
+        self.event_unobservable_attacker = ClosedLoopSystem.generate_unobservable_events(
+            assumption.event_system, assumption.event_attacker_observable)
+
+        # 1. 与能力集无关的阶段：键与 generate_cso_attacker 相同，可共用其磁盘缓存
+        key_closed_loop = fingerprint('closed_loop',
+                                      assumption.state_initial_origin_ststem,
+                                      assumption.state_initial_supervisor,
+                                      assumption.event_system,
+                                      assumption.transition_origin_system,
+                                      assumption.transition_supervisor)
+        key_supervisor = fingerprint('observer_supervisor',
+                                     key_closed_loop,
+                                     assumption.event_supervisor_observable)
+        key_attacker = fingerprint('observer_attacker',
+                                   assumption.state_initial_origin_ststem,
+                                   assumption.event_system,
+                                   assumption.event_attacker_observable,
+                                   assumption.state_supervisor,
+                                   assumption.transition_origin_system,
+                                   assumption.transition_supervisor)
+        closed_loop = cache.get_or_compute('closed_loop', key_closed_loop, lambda: ClosedLoopSystem.build_closed_loop_automaton(
+            assumption.state_initial_origin_ststem,
+            assumption.state_initial_supervisor,
+            assumption.event_system,
+            assumption.transition_origin_system,
+            assumption.transition_supervisor
+        ))
+        self.estimation_result_supervisor = cache.get_or_compute('observer_supervisor', key_supervisor, lambda: GenerateACAGFunctionTools.generate_unobserver_reach_supervisor(
+            closed_loop.transitions,
+            assumption.event_supervisor_observable,
+            self.event_unobservable_supervisor
+        ))
+        self.estimation_result_attacker = cache.get_or_compute('observer_attacker', key_attacker, lambda: GenerateACAGFunctionTools.generate_unobserver_reach_attacker(
+            assumption.state_initial_origin_ststem,
+            assumption.transition_origin_system,
+            assumption.event_attacker_observable,
+            assumption.state_supervisor,
+            assumption.transition_supervisor,
+            self.event_unobservable_attacker
+        ))
+        self.initial_env_state = ACAGSystemCreater.generate_initial_ACAG_state(
+            self.event_unobservable_attacker,
+            self.event_unobservable_supervisor,
+            closed_loop.transitions,
+            assumption.transition_origin_system,
+            assumption.transition_supervisor,
+            assumption.state_initial_origin_ststem,
+            list(closed_loop.initial_states),
+            assumption.state_initial_supervisor
+        )
+
+        # 2. 跨能力集共享的 ACAG 片段与 Ye 标签
+        self._ye_cores = {}     # Ye -> [(sigma, (xi_S, xi_A, z, x')), ...]
+        self._ye_next = {}      # (xi_S, xi_A, z, x', sigma, t_sigma) -> Ye'
+        self.lable_ACAG_map = {}
+        self.get_tag(self.initial_env_state)
+
+    # 全局 Ye 标签：各能力集的 AO-ACAG 共用，标签只用于聚类
+    def get_tag(self, ye):
+        tag = self.lable_ACAG_map.get(ye)
+        if tag is None:
+            tag = self.lable_ACAG_map[ye] = f"ye{len(self.lable_ACAG_map)}"
+        return tag
+
+    def _ya_cores(self, ye):
+        """
+        Ye 的出边，Ya 只保留与能力集无关的部分；已检测或秘密已暴露的 Ye 没有出边
+        """
+        cores = self._ye_cores.get(ye)
+        if cores is None:
+            cores = []
+            if ye[0] != AX and not (len(ye[1]) > 0 and ye[1].issubset(self.assumption.state_system_secret)):
+                for sigma, _ in self.assumption.index_origin_system.enabled(ye[3]):
+                    ya = ACAGSystemCreater.cal_transition_ACAG_environment_to_attacker(
+                        ye, sigma, (), (),
+                        self.assumption.transition_supervisor,
+                        self.assumption.transition_origin_system)
+                    if ya:
+                        cores.append((sigma, ya[:4]))
+            self._ye_cores[ye] = cores
+        return cores
+
+    def edge_functions(self, event_vulnerable, event_alterable):
+        """
+        能力集 (V', A') 下的 (ye_edges, ya_edges)，展开规则同 ACAGSystemCreater.generate_ACAG_edge_functions
+        """
+        options = {}
+        ye_edges_cache = {}
+        ye_next_cache = self._ye_next
+
+        def ye_edges(ye):
+            edges = ye_edges_cache.get(ye)
+            if edges is None:
+                edges = ye_edges_cache[ye] = []
+                for sigma, core in self._ya_cores(ye):
+                    tampered = options.get(sigma)
+                    if tampered is None:
+                        tampered = options[sigma] = GenerateACAGFunctionTools.tamper_events(
+                            event_vulnerable, event_alterable, sigma)
+                    edges.append((sigma, core + (tampered, sigma)))
+            return edges
+
+        def ya_edges(ya):
+            edges = []
+            for t_sigma in ya[-2]:
+                key = ya[:4] + (ya[5], t_sigma)
+                ye_next = ye_next_cache.get(key)
+                if ye_next is None:
+                    ye_next = ye_next_cache[key] = ACAGSystemCreater.cal_transition_ACAG_attacker_to_environment(
+                        ya,
+                        self.estimation_result_supervisor,
+                        self.assumption.transition_supervisor,
+                        self.event_unobservable_supervisor,
+                        t_sigma,
+                        self.estimation_result_attacker,
+                        self.event_unobservable_attacker)
+                edges.append((t_sigma, ye_next))
+            return edges
+
+        return ye_edges, ya_edges
+
+    def admits_attack(self, event_vulnerable, event_alterable):
+        """
+        在能力集 (V', A') 下按需构建 AO-ACAG，判断从 q0 经未暴露的转移能否到达含秘密暴露 Ye 的 Qe，
+        到达即停止构建。可达判据：不要求攻击者能迫使环境走到该 Qe
+        """
+        ye_edges, ya_edges = self.edge_functions(event_vulnerable, event_alterable)
+        secret_states = self.assumption.state_system_secret
+        found = []
+
+        def is_victory(qe_set):
+            if any(len(ye[1]) > 0 and ye[1].issubset(secret_states) for ye in qe_set):
+                found.append(qe_set)
+            return bool(found)
+
+        AOACAGSystemCreater.cluster_AO_ACAG(
+            self.initial_env_state,
+            ye_edges,
+            ya_edges,
+            self.event_unobservable_attacker,
+            self.get_tag,
+            lambda ye: ye[0] == AX,
+            stop_at=is_victory
+        )
+        return bool(found)
+
+    def sweep(self, event_vulnerable=None, event_alterable=None, max_size=None, monotone=False):
+        """
+        枚举 V' ⊆ event_vulnerable、A' ⊆ event_alterable 的所有组合（默认取系统假设中的集合），
+        按 |V'| + |A'| 从小到大逐层处理。
+        :param max_size: 只枚举 |V'| + |A'| <= max_size 的能力集
+        :param monotone: 为 True 时已知可攻击集合的超集直接判为可攻击、不再计算；
+                         单调性不成立，结果可能有误，只用于快速估计
+        :return: 报告字典，minimal_sets 为最小可攻击能力集
+        """
+        if event_vulnerable is None:
+            event_vulnerable = self.assumption.event_vulnerable
+        if event_alterable is None:
+            event_alterable = self.assumption.event_alterable
+        atoms = ([('vulnerable', e) for e in sorted(event_vulnerable, key=repr)] +
+                 [('alterable', e) for e in sorted(event_alterable, key=repr)])
+        if max_size is None:
+            max_size = len(atoms)
+
+        start = time.perf_counter()
+        minimal, results = [], []
+        counts = {'evaluated': 0, 'inferred': 0, 'reused': 0}
+        # V' 为空时不发生篡改，A' 不影响结果：按实际生效的能力集复用结果
+        effective_results = {}
+
+        for size in range(max_size + 1):
+            for chosen in combinations(atoms, size):
+                chosen = frozenset(chosen)
+                if monotone and any(m <= chosen for m in minimal):
+                    admitted, source = True, 'inferred'
+                else:
+                    vulnerable = frozenset(e for kind, e in chosen if kind == 'vulnerable')
+                    alterable = frozenset(e for kind, e in chosen if kind == 'alterable') if vulnerable else frozenset()
+                    admitted = effective_results.get((vulnerable, alterable))
+                    if admitted is None:
+                        admitted = effective_results[(vulnerable, alterable)] = self.admits_attack(vulnerable, alterable)
+                        source = 'evaluated'
+                    else:
+                        source = 'reused'
+                    if admitted and not any(m < chosen for m in minimal):
+                        minimal.append(chosen)
+                counts[source] += 1
+                results.append((chosen, admitted, source))
+
+        def to_capability(chosen):
+            return {
+                'event_vulnerable': sorted((e for kind, e in chosen if kind == 'vulnerable'), key=repr),
+                'event_alterable': sorted((e for kind, e in chosen if kind == 'alterable'), key=repr),
+            }
+
+        return {
+            'criterion': 'reachable',
+            'monotone': monotone,
+            'capability_sets': len(results),
+            'admitting': sum(admitted for _, admitted, _ in results),
+            **counts,
+            'seconds': round(time.perf_counter() - start, 6),
+            'minimal_sets': [to_capability(m) for m in minimal],
+            'results': [dict(to_capability(c), admits_attack=a, source=s) for c, a, s in results],
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="扫描 event_vulnerable / event_alterable 子集，报告最小可攻击能力集")
+    parser.add_argument("model", help="模型文件（SystemAssumptions.to_dict() 格式的 JSON）")
+    parser.add_argument("--max-size", type=int, default=None, help="只枚举 |V'|+|A'| 不超过该值的能力集")
+    parser.add_argument("--monotone", action="store_true",
+                        help="使用单调性剪枝（超集直接判为可攻击），更快但结果可能有误")
+    parser.add_argument("--out", default=None, help="报告输出文件（JSON）")
+    args = parser.parse_args(argv)
+
+    with open(args.model, "r", encoding="utf-8") as f:
+        assumption = SystemAssumptions.from_dict(json.load(f))
+    report = CapabilitySweep(assumption).sweep(max_size=args.max_size, monotone=args.monotone)
+    print(f"capability sets: {report['capability_sets']}, admitting: {report['admitting']}, "
+          f"evaluated: {report['evaluated']}, inferred: {report['inferred']}, reused: {report['reused']}, "
+          f"seconds: {report['seconds']}")
+    for capability in report['minimal_sets']:
+        print(f"minimal: V'={capability['event_vulnerable']} A'={capability['event_alterable']}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
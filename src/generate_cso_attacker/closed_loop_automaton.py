@@ -0,0 +1,50 @@
+from types import MappingProxyType
+from .transition_index import TransitionIndex
+
+"""
+闭环系统的不可变表示：一次 BFS 得到的状态、初始状态与转移关系放在同一个对象里，
+流水线后续阶段都从这里取数据，状态集合与转移集合不会出现不一致。
+"""
+
+class ClosedLoopAutomaton:
+    """
+    - states: 全部可达闭环状态 (supervisor_state, origin_system_state)，已排序
+    - initial_states: 初始闭环状态，顺序同监督器初始状态 × 物理初始状态
+    - transitions: 只读转移字典 {((s, o), event): (s', o')}
+    - index: 转移的按状态邻接索引 (TransitionIndex)
+    - enabled_events: 只读字典 {state: (event, ...)}，每个可达状态都有一项
+    """
+    __slots__ = ('states', 'initial_states', 'transitions', 'index', 'enabled_events', '_state_set')
+
+    def __init__(self, states, initial_states, transitions):
+        object.__setattr__(self, 'states', tuple(sorted(states)))
+        object.__setattr__(self, 'initial_states', tuple(initial_states))
+        object.__setattr__(self, 'transitions', MappingProxyType(dict(transitions)))
+        index = TransitionIndex(self.transitions)
+        object.__setattr__(self, 'index', index)
+        object.__setattr__(self, 'enabled_events', MappingProxyType({
+            state: tuple(index.enabled_events(state)) for state in self.states
+        }))
+        object.__setattr__(self, '_state_set', frozenset(self.states))
+
+    # MappingProxyType 无法直接 pickle，按构造参数重建
+    def __reduce__(self):
+        return (ClosedLoopAutomaton, (self.states, self.initial_states, dict(self.transitions)))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ClosedLoopAutomaton 为不可变对象")
+
+    def __delattr__(self, name):
+        raise AttributeError("ClosedLoopAutomaton 为不可变对象")
+
+    def enabled(self, state):
+        """
+        返回 state 处所有可发生的转移 [(event, next_state), ...]
+        """
+        return self.index.enabled(state)
+
+    def __contains__(self, state):
+        return state in self._state_set
+
+    def __len__(self):
+        return len(self.states)
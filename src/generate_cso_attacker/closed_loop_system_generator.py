@@ -1,6 +1,7 @@
 from typing import Set, Dict, Any, List, Tuple
 from collections import deque
 from graphviz import Digraph
+from .transition_index import TransitionIndex
 
 """
 给定初始所有的系统假设
@@ -22,6 +23,8 @@ class SystemAssumptions:
         event_alterable:Set[str],
         transition_origin_system:Dict[Any,Any],
         transition_supervisor:Dict[Any,Any],
+        index_origin_system:TransitionIndex=None,
+        index_supervisor:TransitionIndex=None,
         ):
         self.state_oringin_system = state_oringin_system
         self.state_supervisor = state_supervisor
@@ -36,6 +39,59 @@ class SystemAssumptions:
         self.event_alterable = event_alterable
         self.transition_origin_system = transition_origin_system
         self.transition_supervisor = transition_supervisor
+        # 邻接索引在首次访问时构建，之后整个流水线复用同一份；
+        # 流式加载模型时直接传入加载过程中建好的索引（其 transition 即上面的转移字典）
+        self._index_origin_system = index_origin_system
+        self._index_supervisor = index_supervisor
+
+    # 物理系统转移的按状态邻接索引
+    @property
+    def index_origin_system(self):
+        if self._index_origin_system is None:
+            self._index_origin_system = TransitionIndex(self.transition_origin_system)
+        return self._index_origin_system
+
+    # 监督器转移的按状态邻接索引
+    @property
+    def index_supervisor(self):
+        if self._index_supervisor is None:
+            self._index_supervisor = TransitionIndex(self.transition_supervisor)
+        return self._index_supervisor
+
+    # 可序列化字段：集合字段与转移字段，顺序同构造参数
+    SET_FIELDS = (
+        'state_oringin_system', 'state_supervisor', 'state_initial_origin_ststem',
+        'state_initial_supervisor', 'state_system_secret', 'event_system',
+        'event_attacker_observable', 'event_supervisor_observable',
+        'event_supervisor_controllable', 'event_vulnerable', 'event_alterable',
+    )
+    TRANSITION_FIELDS = ('transition_origin_system', 'transition_supervisor')
+
+    def to_dict(self):
+        """
+        转为只含 list / str / int 的字典，可直接 json.dump，跨进程传递时也比整个对象轻
+        - 集合按 repr 排序成列表
+        - 转移展开为 [state, event, next_state] 列表，保持原插入顺序
+        """
+        data = {name: sorted(getattr(self, name), key=repr) for name in self.SET_FIELDS}
+        for name in self.TRANSITION_FIELDS:
+            data[name] = [[state, event, next_state]
+                          for (state, event), next_state in getattr(self, name).items()]
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        to_dict 的逆过程；JSON 中的列表型状态还原为元组，多余的键（如 name）忽略
+        """
+        def hashable(value):
+            return tuple(hashable(v) for v in value) if isinstance(value, list) else value
+
+        kwargs = {name: {hashable(v) for v in data[name]} for name in cls.SET_FIELDS}
+        for name in cls.TRANSITION_FIELDS:
+            kwargs[name] = {(hashable(state), event): hashable(next_state)
+                            for state, event, next_state in data[name]}
+        return cls(**kwargs)
 
 # 闭环系统
 class ClosedLoopSystem:
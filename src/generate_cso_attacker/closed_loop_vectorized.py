@@ -0,0 +1,153 @@
+try:
+    import numpy as np
+except ImportError:  # numpy 为可选依赖，只有选择向量化后端时才需要
+    np = None
+
+"""
+闭环系统（物理系统 × 监督器）的向量化构建后端：
+- 物理状态、监督器状态分别编号为 0..P-1、0..S-1，闭环状态 (z, x) 编号为 z * P + x
+- 每个事件的转移函数存成整数数组 delta[e][state] = next_state，未定义处为 -1
+- 可达性搜索按层进行，一层前沿对每个事件只做一次数组索引
+"""
+
+# 闭环状态总数不超过该值时用 bool 数组标记已访问，否则用有序 id 数组配合 np.isin
+DENSE_VISITED_LIMIT = 1 << 26
+
+
+class VectorizedClosedLoopBuilder:
+    """
+    用法：
+        builder = VectorizedClosedLoopBuilder(transition_origin_system, transition_supervisor, event_system)
+        transitions = builder.build(state_initial_supervisor, state_initial_origin_ststem)
+    build 的结果与 ClosedLoopSystem.generate_transition_closed_loop_system 相同；
+    explore 返回未解码的 (src, event, dst) 整数数组，适合超大规模系统直接使用。
+    """
+    __slots__ = ('events', 'plant_states', 'supervisor_states', '_plant_ids', '_supervisor_ids',
+                 'delta_plant', 'delta_supervisor')
+
+    def __init__(self, transition_origin_system, transition_supervisor, event_system):
+        if np is None:
+            raise ImportError("向量化闭环构建需要 numpy，请先安装 numpy 或改用 backend='python'")
+
+        # 只保留两侧都有定义的事件，其余事件在闭环中不可能发生
+        plant_events = {event for (_, event) in transition_origin_system}
+        supervisor_events = {event for (_, event) in transition_supervisor}
+        self.events = [e for e in event_system if e in plant_events and e in supervisor_events]
+
+        self.plant_states, self._plant_ids = self._number_states(transition_origin_system)
+        self.supervisor_states, self._supervisor_ids = self._number_states(transition_supervisor)
+        self.delta_plant = self._delta_arrays(transition_origin_system, self._plant_ids)
+        self.delta_supervisor = self._delta_arrays(transition_supervisor, self._supervisor_ids)
+
+    @staticmethod
+    def _number_states(transition):
+        states, ids = [], {}
+        for (state, _), next_state in transition.items():
+            for s in (state, next_state):
+                if s not in ids:
+                    ids[s] = len(states)
+                    states.append(s)
+        return states, ids
+
+    def _delta_arrays(self, transition, ids):
+        # 每个事件一个长度为状态数的 int64 数组，多留一位给初始状态中未出现在转移里的状态
+        size = len(ids) + 1
+        index = {event: i for i, event in enumerate(self.events)}
+        delta = [np.full(size, -1, dtype=np.int64) for _ in self.events]
+        for (state, event), next_state in transition.items():
+            i = index.get(event)
+            if i is not None:
+                delta[i][ids[state]] = ids[next_state]
+        return delta
+
+    def _initial_ids(self, state_initial_supervisor, state_initial_origin_ststem):
+        # 初始状态若不出现在任何转移中，映射到多留的那一位（所有事件均未定义）
+        n_plant = len(self.plant_states) + 1
+        extra_plant, extra_supervisor = len(self.plant_states), len(self.supervisor_states)
+        ids, pairs = [], []
+        for s_init in state_initial_supervisor:
+            for o_init in state_initial_origin_ststem:
+                z = self._supervisor_ids.get(s_init, extra_supervisor)
+                x = self._plant_ids.get(o_init, extra_plant)
+                ids.append(z * n_plant + x)
+                pairs.append((s_init, o_init))
+        return ids, pairs
+
+    def explore(self, state_initial_supervisor, state_initial_origin_ststem):
+        """
+        分层可达性搜索。
+        :return: (src, event, dst, initial_pairs)，src/dst 为闭环状态编号，event 为 self.events 下标
+        """
+        n_plant = len(self.plant_states) + 1
+        n_total = n_plant * (len(self.supervisor_states) + 1)
+        initial_ids, initial_pairs = self._initial_ids(state_initial_supervisor, state_initial_origin_ststem)
+
+        frontier = np.unique(np.asarray(initial_ids, dtype=np.int64))
+        dense = n_total <= DENSE_VISITED_LIMIT
+        if dense:
+            visited = np.zeros(n_total, dtype=bool)
+            visited[frontier] = True
+        else:
+            visited = frontier
+
+        src_parts, event_parts, dst_parts = [], [], []
+        while frontier.size:
+            z, x = np.divmod(frontier, n_plant)
+            reached = []
+            for i in range(len(self.events)):
+                next_z = self.delta_supervisor[i][z]
+                next_x = self.delta_plant[i][x]
+                enabled = (next_z >= 0) & (next_x >= 0)
+                if not enabled.any():
+                    continue
+                dst = next_z[enabled] * n_plant + next_x[enabled]
+                src_parts.append(frontier[enabled])
+                event_parts.append(np.full(dst.size, i, dtype=np.int32))
+                dst_parts.append(dst)
+                reached.append(dst)
+
+            if not reached:
+                break
+            candidates = np.unique(np.concatenate(reached))
+            if dense:
+                frontier = candidates[~visited[candidates]]
+                visited[frontier] = True
+            else:
+                frontier = candidates[~np.isin(candidates, visited, assume_unique=True)]
+                visited = np.union1d(visited, frontier)
+
+        if src_parts:
+            src = np.concatenate(src_parts)
+            event = np.concatenate(event_parts)
+            dst = np.concatenate(dst_parts)
+        else:
+            src = dst = np.empty(0, dtype=np.int64)
+            event = np.empty(0, dtype=np.int32)
+        return src, event, dst, initial_pairs
+
+    def decode_state(self, state_id):
+        n_plant = len(self.plant_states) + 1
+        z, x = divmod(int(state_id), n_plant)
+        return self.supervisor_states[z], self.plant_states[x]
+
+    def build(self, state_initial_supervisor, state_initial_origin_ststem):
+        """
+        输出格式与 generate_transition_closed_loop_system 相同:
+        {((s_curr, o_curr), event): (s_next, o_next)}
+        """
+        src, event, dst, _ = self.explore(state_initial_supervisor, state_initial_origin_ststem)
+        n_plant = len(self.plant_states) + 1
+        plant_states, supervisor_states = self.plant_states, self.supervisor_states
+
+        # 每个出现过的闭环状态只解码一次
+        ids, inverse = np.unique(np.concatenate([src, dst]), return_inverse=True)
+        z, x = np.divmod(ids, n_plant)
+        pairs = [(supervisor_states[zi], plant_states[xi]) for zi, xi in zip(z.tolist(), x.tolist())]
+        src_pairs = inverse[:src.size].tolist()
+        dst_pairs = inverse[src.size:].tolist()
+        events = self.events
+
+        return {
+            (pairs[s], events[e]): pairs[d]
+            for s, e, d in zip(src_pairs, event.tolist(), dst_pairs)
+        }
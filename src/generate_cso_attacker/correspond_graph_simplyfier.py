@@ -11,7 +11,8 @@ class GraphSimplyfier:
                                    Sigma_oS, # 增加：监督者可观事件集
                                    Sigma_oA, # 增加：攻击者可观事件集
                                    filename,
-                                   max_nodes=30):
+                                   max_nodes=30,
+                                   render=True):
         """
         原函数逻辑完全保留，仅在末尾添加图例绘制逻辑
         """
@@ -154,11 +155,13 @@ class GraphSimplyfier:
                 </TABLE>>'''
             l.node('legend_node', label=legend_html, shape='none')
 
-        dot.render(filename, cleanup=True)
+        if render:
+            dot.render(filename, cleanup=True)
         return dot, ye_map
 
     @staticmethod
-    def draw_simplified_AO_ACAG_graph(ao_transitions, q0_tags, lable_ACAG_map, secret_states, filename, max_nodes=35):
+    def draw_simplified_AO_ACAG_graph(ao_transitions, q0_tags, lable_ACAG_map, secret_states, filename, max_nodes=35,
+                                      render=True):
         """
         """
         import graphviz
@@ -251,7 +254,8 @@ class GraphSimplyfier:
                     </TR>
                 </TABLE>>'''
             l.node('legend_node', label=legend_html, shape='none')
-        dot.render(filename, cleanup=True)
+        if render:
+            dot.render(filename, cleanup=True)
         return dot, qe_map
 
     
\ No newline at end of file
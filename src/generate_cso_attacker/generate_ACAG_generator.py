@@ -1,4 +1,6 @@
 from .generate_ACAG_helper import GenerateACAGFunctionTools
+from .transition_index import TransitionIndex
+from .state_interning import ACAGStateTable, CompactACAG
 from collections import deque
 import graphviz
 
@@ -92,6 +94,85 @@ class ACAGSystemCreater:
         # 注意：这里使用的是刚刚计算出的 next_est_atk
         return (frozenset(next_est_sup), frozenset(next_est_atk), next_state_supervisor, cur_sys_x)
 
+    # 计算 ACAG 初始环境状态 Ye0
+    @staticmethod
+    def generate_initial_ACAG_state(event_attacker_unobservable,
+                                    event_supervisor_unobservable,
+                                    transition_closed_loop_system,
+                                    transition_origin_system,
+                                    transition_supervisor,
+                                    state_initial_origin,
+                                    state_initial_closed_loop_system,
+                                    state_initial_supervisor):
+        '''
+        Ye0 = (xi_S0, xi_A0, z0, x0)，攻击者初始预估考虑初始 z0 的约束
+        '''
+        def to_s(s): return list(s)[0] if isinstance(s, (set, frozenset, list)) else s
+        init_z = to_s(state_initial_supervisor)
+        init_x = to_s(state_initial_origin)
+
+        initial_est_sup = GenerateACAGFunctionTools.cal_unobservable_reach_supervisor(
+            state_initial_closed_loop_system,
+            transition_closed_loop_system,
+            event_supervisor_unobservable
+        )
+        initial_est_atk = GenerateACAGFunctionTools.cal_unobservable_reach_attacker(
+            {init_x},
+            transition_origin_system,
+            event_attacker_unobservable,
+            transition_supervisor,
+            init_z
+        )
+        return (initial_est_sup, initial_est_atk, init_z, init_x)
+
+    # 按需展开 ACAG 的邻接查询函数
+    @staticmethod
+    def generate_ACAG_edge_functions(event_attacker_unobservable,
+                                     event_vulnerable,
+                                     event_attacker_alterable,
+                                     event_supervisor_unobservable,
+                                     transition_origin_system,
+                                     transition_supervisor,
+                                     estimation_result_supervisor,
+                                     estimation_result_attacker,
+                                     secret_states,
+                                     index_origin_system=None):
+        '''
+        返回 (ye_edges, ya_edges)，与 generate_ACAG_transition 的展开规则一致：
+        - ye_edges(ye): [(sigma, ya), ...]，已检测 (AX) 或秘密已暴露的 Ye 没有出边
+        - ya_edges(ya): [(tampered_sigma, ye'), ...]
+        不保存任何节点，调用一次现算一次。
+        '''
+        if index_origin_system is None:
+            index_origin_system = TransitionIndex(transition_origin_system)
+
+        def ye_edges(ye):
+            if ye[0] == frozenset({'AX'}):
+                return []
+            if len(ye[1]) > 0 and ye[1].issubset(secret_states):
+                return []
+            edges = []
+            for sigma, _ in index_origin_system.enabled(ye[3]):
+                ya = ACAGSystemCreater.cal_transition_ACAG_environment_to_attacker(
+                    ye, sigma, event_vulnerable, event_attacker_alterable,
+                    transition_supervisor, transition_origin_system)
+                if ya:
+                    edges.append((sigma, ya))
+            return edges
+
+        def ya_edges(ya):
+            edges = []
+            for tampered_sigma in ya[-2]:
+                ye_next = ACAGSystemCreater.cal_transition_ACAG_attacker_to_environment(
+                    ya, estimation_result_supervisor, transition_supervisor,
+                    event_supervisor_unobservable, tampered_sigma,
+                    estimation_result_attacker, event_attacker_unobservable)
+                if ye_next:
+                    edges.append((tampered_sigma, ye_next))
+            return edges
+
+        return ye_edges, ya_edges
+
     #生成ACAG转移关系
     @staticmethod
     def generate_ACAG_transition(
@@ -107,33 +188,26 @@ class ACAGSystemCreater:
         state_initial_supervisor,
         estimation_result_supervisor,
         estimation_result_attacker,
-        secret_states                  
+        secret_states,
+        index_origin_system=None       # 物理系统邻接索引，为 None 时现场构建
     ):
+        if index_origin_system is None:
+            index_origin_system = TransitionIndex(transition_origin_system)
         environment_ACAG_states = set()
         attacker_ACAG_states = set()
         all_ACAG_transition = {}
 
-        # 工具函数：确保初始状态非集合
-        def to_s(s): return list(s)[0] if isinstance(s, (set, frozenset, list)) else s
-        init_z = to_s(state_initial_supervisor)
-        init_x = to_s(state_initial_origin)
-
-        # 1. 初始化预估集
-        initial_est_sup = GenerateACAGFunctionTools.cal_unobservable_reach_supervisor(
-            state_initial_closed_loop_system,
+        # 1. 初始化预估集与初始环境状态
+        initial_env_state = ACAGSystemCreater.generate_initial_ACAG_state(
+            event_attacker_unobservable,
+            event_supervisor_unobservable,
             transition_closed_loop_system,
-            event_supervisor_unobservable
-        )
-        # 初始攻击者预估需要考虑初始 z0 的约束
-        initial_est_atk = GenerateACAGFunctionTools.cal_unobservable_reach_attacker(
-            {init_x}, # 传入集合
             transition_origin_system,
-            event_attacker_unobservable,
             transition_supervisor,
-            init_z
+            state_initial_origin,
+            state_initial_closed_loop_system,
+            state_initial_supervisor
         )
-        
-        initial_env_state = (initial_est_sup, initial_est_atk, init_z, init_x)
         environment_ACAG_states.add(initial_env_state)
         queue = deque([initial_env_state])
 
@@ -147,57 +221,245 @@ class ACAGSystemCreater:
             curr_xi_S, curr_xi_A, curr_z, curr_x = curr_env_state
 
             # --- Ye -> Ya ---
-            # 遍历物理系统当前状态下可发生的所有事件 sigma
-            for (state_in_origin, sigma), next_x_in_dict in transition_origin_system.items():
-                if state_in_origin == curr_x:
-                    
-                    # 【修改点】：调用 Ye -> Ya 时减少参数
-                    next_atk_state = ACAGSystemCreater.cal_transition_ACAG_environment_to_attacker(
-                        curr_env_state,
-                        sigma,
-                        event_vulnerable,
-                        event_attacker_alterable,
-                        transition_supervisor,
-                        transition_origin_system
-                    )
+            # 遍历物理系统当前状态下可发生的所有事件 sigma（按邻接索引只看 curr_x 的出边）
+            for sigma, _ in index_origin_system.enabled(curr_x):
+                
+                # 【修改点】：调用 Ye -> Ya 时减少参数
+                next_atk_state = ACAGSystemCreater.cal_transition_ACAG_environment_to_attacker(
+                    curr_env_state,
+                    sigma,
+                    event_vulnerable,
+                    event_attacker_alterable,
+                    transition_supervisor,
+                    transition_origin_system
+                )
+                
+                if next_atk_state:
+                    all_ACAG_transition[(curr_env_state, sigma)] = next_atk_state
                     
-                    if next_atk_state:
-                        all_ACAG_transition[(curr_env_state, sigma)] = next_atk_state
+                    if next_atk_state not in attacker_ACAG_states:
+                        attacker_ACAG_states.add(next_atk_state)
                         
-                        if next_atk_state not in attacker_ACAG_states:
-                            attacker_ACAG_states.add(next_atk_state)
-                            
-                            # --- Ya -> Ye' ---
-                            # 注意：next_atk_state 现在长度为 6，options 位于倒数第二位 [-2]
-                            options = next_atk_state[-2] 
-                            for tampered_sigma in options:
-                                # 【修改点】：调用 Ya -> Ye' 时增加参数
-                                next_env_state = ACAGSystemCreater.cal_transition_ACAG_attacker_to_environment(
-                                    next_atk_state,
-                                    estimation_result_supervisor,
-                                    transition_supervisor,
-                                    event_supervisor_unobservable,
-                                    tampered_sigma,
-                                    estimation_result_attacker,   # 新增
-                                    event_attacker_unobservable   # 新增
-                                )
-
-                                if next_env_state:
-                                    all_ACAG_transition[(next_atk_state, tampered_sigma)] = next_env_state
-                                    
-                                    if next_env_state not in environment_ACAG_states:
-                                        environment_ACAG_states.add(next_env_state)
-                                        queue.append(next_env_state)
+                        # --- Ya -> Ye' ---
+                        # 注意：next_atk_state 现在长度为 6，options 位于倒数第二位 [-2]
+                        options = next_atk_state[-2] 
+                        for tampered_sigma in options:
+                            # 【修改点】：调用 Ya -> Ye' 时增加参数
+                            next_env_state = ACAGSystemCreater.cal_transition_ACAG_attacker_to_environment(
+                                next_atk_state,
+                                estimation_result_supervisor,
+                                transition_supervisor,
+                                event_supervisor_unobservable,
+                                tampered_sigma,
+                                estimation_result_attacker,   # 新增
+                                event_attacker_unobservable   # 新增
+                            )
+
+                            if next_env_state:
+                                all_ACAG_transition[(next_atk_state, tampered_sigma)] = next_env_state
+                                
+                                if next_env_state not in environment_ACAG_states:
+                                    environment_ACAG_states.add(next_env_state)
+                                    queue.append(next_env_state)
 
         return all_ACAG_transition, initial_env_state
 
+    #生成整数编码的 ACAG 转移关系
+    @staticmethod
+    def generate_compact_ACAG_transition(
+        event_attacker_unobservable,
+        event_vulnerable,
+        event_attacker_alterable,
+        event_supervisor_unobservable,
+        transition_closed_loop_system,
+        transition_origin_system,
+        transition_supervisor,
+        state_initial_origin,
+        state_initial_closed_loop_system,
+        state_initial_supervisor,
+        estimation_result_supervisor,
+        estimation_result_attacker,
+        secret_states,
+        index_origin_system=None,
+        state_table=None
+    ):
+        """
+        与 generate_ACAG_transition 相同的 BFS，但节点、预估集合、事件全部以整数 id 表示，
+        返回 CompactACAG；需要原始字典时调用 CompactACAG.decode()。
+        """
+        if index_origin_system is None:
+            index_origin_system = TransitionIndex(transition_origin_system)
+        if state_table is None:
+            state_table = ACAGStateTable()
+        estimates = state_table.estimates
+        events = state_table.events
+        sup_states = state_table.supervisor_states
+        plant_states = state_table.plant_states
+
+        # 1. 预估转移、监督器转移编码
+        sup_table = GenerateACAGFunctionTools.encode_unobserver_reach_supervisor(
+            estimation_result_supervisor, state_table)
+        atk_table = GenerateACAGFunctionTools.encode_unobserver_reach_attacker(
+            estimation_result_attacker, state_table)
+        sup_transition = {
+            (sup_states.intern(z), events.intern(event)): sup_states.intern(next_z)
+            for (z, event), next_z in transition_supervisor.items()
+        }
+        ax_id = estimates.intern(frozenset({'AX'}))
+        empty_id = estimates.intern(frozenset())
+        z_det_id = sup_states.intern('z_det')
+        empty_event_id = events.intern('empty')
+        atk_unobs_ids = {events.intern(e) for e in event_attacker_unobservable}
+        sup_unobs_ids = {events.intern(e) for e in event_supervisor_unobservable}
+
+        # 物理系统邻接按 x id 缓存
+        plant_adj = {}
+        def enabled_plant(x_id):
+            edges = plant_adj.get(x_id)
+            if edges is None:
+                edges = plant_adj[x_id] = [
+                    (events.intern(sigma), plant_states.intern(next_x))
+                    for sigma, next_x in index_origin_system.enabled(plant_states.lookup(x_id))
+                ]
+            return edges
+
+        # 篡改选项按事件 id 缓存
+        options_of = {}
+        def tamper_options(event_id):
+            options_id = options_of.get(event_id)
+            if options_id is None:
+                options_id = options_of[event_id] = state_table.encode_options(
+                    GenerateACAGFunctionTools.tamper_events(
+                        event_vulnerable, event_attacker_alterable, events.lookup(event_id)))
+            return options_id
+
+        # 秘密暴露判定按预估 id 缓存
+        revealed = {}
+        def is_revealed(est_id):
+            result = revealed.get(est_id)
+            if result is None:
+                est = estimates.lookup(est_id)
+                result = revealed[est_id] = len(est) > 0 and est.issubset(secret_states)
+            return result
+
+        # 2. 初始预估与初始环境节点
+        initial_est_sup, initial_est_atk, init_z, init_x = ACAGSystemCreater.generate_initial_ACAG_state(
+            event_attacker_unobservable,
+            event_supervisor_unobservable,
+            transition_closed_loop_system,
+            transition_origin_system,
+            transition_supervisor,
+            state_initial_origin,
+            state_initial_closed_loop_system,
+            state_initial_supervisor
+        )
+        initial_node = state_table.environment_node(
+            estimates.intern(initial_est_sup), estimates.intern(initial_est_atk),
+            sup_states.intern(init_z), plant_states.intern(init_x))
+
+        compact_ACAG = CompactACAG(state_table, initial_node)
+        environment_nodes = {initial_node}
+        attacker_nodes = set()
+        queue = deque([initial_node])
+
+        while queue:
+            ye = queue.popleft()
+            sup_id = state_table.est_sup[ye]
+            atk_id = state_table.est_atk[ye]
+            z_id = state_table.sup_z[ye]
+            x_id = state_table.sys_x[ye]
+
+            # 终止检查
+            if sup_id == ax_id: continue
+            if is_revealed(atk_id): continue
+
+            # --- Ye -> Ya ---
+            for sigma_id, next_x_id in enabled_plant(x_id):
+                # 监督器当前禁止的事件
+                if (z_id, sigma_id) not in sup_transition:
+                    continue
+                options_id = tamper_options(sigma_id)
+                ya = state_table.attacker_node(sup_id, atk_id, z_id, next_x_id, options_id, sigma_id)
+                compact_ACAG.add_transition(ye, sigma_id, ya)
+                if ya in attacker_nodes:
+                    continue
+                attacker_nodes.add(ya)
+
+                # --- Ya -> Ye' ---
+                # 攻击者预估基于原始事件 sigma 更新
+                if sigma_id in atk_unobs_ids:
+                    next_atk_id = atk_id
+                else:
+                    next_atk_id = atk_table.get(z_id, {}).get((atk_id, sigma_id), empty_id)
+
+                for t_id in state_table.options.lookup(options_id):
+                    # 监督器预估基于篡改后的事件更新
+                    if sup_id == ax_id:
+                        next_sup_id = ax_id
+                    elif t_id == empty_event_id or t_id in sup_unobs_ids:
+                        next_sup_id = sup_id
+                    else:
+                        next_sup_id = sup_table.get((sup_id, t_id), ax_id)
+
+                    # 监督器内部状态 z'
+                    if t_id == empty_event_id:
+                        next_z_id = z_id
+                    else:
+                        next_z_id = sup_transition.get((z_id, t_id))
+                        if next_z_id is None:
+                            next_z_id = z_det_id
+                            next_sup_id = ax_id
+
+                    next_ye = state_table.environment_node(next_sup_id, next_atk_id, next_z_id, next_x_id)
+                    compact_ACAG.add_transition(ya, t_id, next_ye)
+                    if next_ye not in environment_nodes:
+                        environment_nodes.add(next_ye)
+                        queue.append(next_ye)
+
+        return compact_ACAG
+
+    # ACAG 环境状态编号（与 draw_ACAG_graph 的 xlabel 相同），不涉及绘图
+    @staticmethod
+    def label_ACAG_states(all_ACAG_transition, initial_env_state):
+        '''
+        从初始状态按 BFS 顺序为 Ye 编号: {Ye: 'ye0', ...}
+        '''
+        if isinstance(all_ACAG_transition, tuple):
+            all_ACAG_transition = all_ACAG_transition[0]
+
+        adj_map = {}
+        possible_nodes = set()
+        for (curr, event), next_s in all_ACAG_transition.items():
+            adj_map.setdefault(curr, []).append((event, next_s))
+            possible_nodes.add(curr)
+            possible_nodes.add(next_s)
+
+        real_start_node = next((n for n in possible_nodes if len(n) == 4 and str(n).replace("set", "frozenset") == str(initial_env_state).replace("set", "frozenset")), 
+                               next((n for n in possible_nodes if len(n) == 4), None))
+        if real_start_node is None:
+            return {}
+
+        queue = deque([real_start_node])
+        visited = {real_start_node}
+        ye_map = {real_start_node: "ye0"}
+        while queue:
+            curr_state = queue.popleft()
+            for _, next_s in adj_map.get(curr_state, ()):
+                if next_s not in visited:
+                    visited.add(next_s)
+                    if len(next_s) == 4:
+                        ye_map[next_s] = f"ye{len(ye_map)}"
+                    queue.append(next_s)
+        return ye_map
+
     @staticmethod
     def draw_ACAG_graph(all_ACAG_transition, 
                         initial_env_state, 
                         secret_states,
                         labled_unobservable_reachable_supervisor, 
                         labled_unobservable_reachable_attacker,
-                        filename):
+                        filename,
+                        render=True):
         if isinstance(all_ACAG_transition, tuple):
             all_ACAG_transition = all_ACAG_transition[0]
 
@@ -339,10 +601,11 @@ class ACAGSystemCreater:
                              color=e_color, 
                              arrowsize='0.6')
 
-        try:
-            dot.render(filename, cleanup=True)
-            print(f"Graph generated: {filename}.svg")
-        except Exception as e:
-            print(f"Rendering error: {e}")
+        if render:
+            try:
+                dot.render(filename, cleanup=True)
+                print(f"Graph generated: {filename}.svg")
+            except Exception as e:
+                print(f"Rendering error: {e}")
 
         return dot, ye_map
\ No newline at end of file
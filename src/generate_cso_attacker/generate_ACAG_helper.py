@@ -1,26 +1,21 @@
 from collections import deque
+from .unobservable_closure import UnobservableClosureEngine
+from .bitset_estimate import BitsetObserver
 
 class GenerateACAGFunctionTools:
     #计算监督器单次不可观测可达集
     @staticmethod
     def cal_unobservable_reach_supervisor(states_current_estimation, 
                                           transition, 
-                                          events_unobeservable, 
-                                          max_depth=15):
-        state_next_estiamtion_supervisor = set(states_current_estimation)
-        queue = deque([(s, 0) for s in states_current_estimation])
-        
-        while queue:
-            curr_state, depth = queue.popleft()
-            if depth >= max_depth: 
-                continue
-            # 搜索所有以当前预估为起点的不可观测转移
-            for (src, event), target in transition.items():
-                if src == curr_state and event in events_unobeservable:
-                    if target not in state_next_estiamtion_supervisor:
-                        state_next_estiamtion_supervisor.add(target)
-                        queue.append((target, depth + 1))
-        return frozenset(state_next_estiamtion_supervisor)
+                                          events_unobeservable,
+                                          closure_engine=None):
+        """
+        计算不可观测可达闭包（精确不动点）。
+        批量计算时应传入同一个 closure_engine，以复用不可观邻接索引和已算出的闭包。
+        """
+        if closure_engine is None:
+            closure_engine = UnobservableClosureEngine(transition, events_unobeservable)
+        return closure_engine.closure(states_current_estimation)
 
 
     # 生成监督器视角的所有转移关系
@@ -28,16 +23,22 @@ class GenerateACAGFunctionTools:
     def generate_unobserver_reach_supervisor(
                                       transition_closed_loop_system,
                                         observable_events, 
-                                      event_ubobservable_supervisor):
+                                      event_ubobservable_supervisor,
+                                      use_bitset=True):
         """
         生成观察者视角的转移关系。
         输出格式: {(当前估算集合, 观测事件): 结果估算集合}
+        use_bitset 为 True 时内部以位集运算，输出结果不变。
         """
+        if use_bitset:
+            return GenerateACAGFunctionTools.generate_unobserver_reach_supervisor_bitset(
+                transition_closed_loop_system, observable_events, event_ubobservable_supervisor)
 
         # 1. 找到初始估算集 xi_0
         # 假设 (0,0) 是唯一的物理初始态
         initial_physical_state = (0, 0) 
-        initial_estimation_supervisor = GenerateACAGFunctionTools.cal_unobservable_reach_supervisor([initial_physical_state], transition_closed_loop_system, event_ubobservable_supervisor)
+        closure_engine = UnobservableClosureEngine(transition_closed_loop_system, event_ubobservable_supervisor)
+        initial_estimation_supervisor = GenerateACAGFunctionTools.cal_unobservable_reach_supervisor([initial_physical_state], transition_closed_loop_system, event_ubobservable_supervisor, closure_engine)
 
         # 2. BFS 搜索所有可达的估算集合
         estimation_result_set_supervisor = {}
@@ -58,7 +59,7 @@ class GenerateACAGFunctionTools:
                 # 如果有转移发生
                 if next_physical_states:
                     # 计算到达状态的不可观测可达集
-                    next_estimate = GenerateACAGFunctionTools.cal_unobservable_reach_supervisor(next_physical_states, transition_closed_loop_system, event_ubobservable_supervisor)
+                    next_estimate = GenerateACAGFunctionTools.cal_unobservable_reach_supervisor(next_physical_states, transition_closed_loop_system, event_ubobservable_supervisor, closure_engine)
                     
                     # 记录转移关系
                     estimation_result_set_supervisor[(curr_estimate, event)] = next_estimate
@@ -127,9 +128,9 @@ class GenerateACAGFunctionTools:
                                         events_unobeservable,
                                         transition_supervisor, 
                                         current_state_supervisor,
-                                        max_depth=15):
+                                        closure_engine=None):
         """
-        计算攻击者不可观测可达集
+        计算攻击者不可观测可达集（精确不动点，只沿 z 允许的不可观事件扩展）
         """
         if isinstance(current_state_supervisor, (set, frozenset)):
             if len(current_state_supervisor) == 1:
@@ -139,42 +140,35 @@ class GenerateACAGFunctionTools:
         else:
             z_key = current_state_supervisor
 
-        state_next_estiamtion_attacker = set(states_current_estimation)
-        queue = deque([(s, 0) for s in states_current_estimation])
-        
-        while queue:
-            curr_x, depth = queue.popleft()
-            
-            if depth >= max_depth: 
-                continue
-                
-            for (src_x, event), target_x in transition.items():
-                if src_x == curr_x and event in events_unobeservable:
-                    
-                    if (z_key, event) in transition_supervisor:
-                        if target_x not in state_next_estiamtion_attacker:
-                            state_next_estiamtion_attacker.add(target_x)
-                            queue.append((target_x, depth + 1))
-                            
-        return frozenset(state_next_estiamtion_attacker)
+        if closure_engine is None:
+            closure_engine = UnobservableClosureEngine(transition, events_unobeservable, transition_supervisor)
+        return closure_engine.closure(states_current_estimation, z_key)
     @staticmethod
     def generate_unobserver_reach_attacker(state_initial_origin, 
                                            transition_origin_system,
                                            event_attacker_observable,
                                            states_supervisor,
                                            transition_supervisor, 
-                                           uo_events_attacker):
+                                           uo_events_attacker,
+                                           use_bitset=True):
         """
         攻击者视角转移生成：物理全集 + 监督器约束演化
         1. 阶段 1 确定物理上攻击者可能产生的预估上限。
         2. 阶段 2 针对每个 z，不仅投影物理集，还演化由于拦截导致的新子集。
+        use_bitset 为 True 时内部以位集运算，输出结果不变。
         """
+        if use_bitset:
+            return GenerateACAGFunctionTools.generate_unobserver_reach_attacker_bitset(
+                state_initial_origin, transition_origin_system, event_attacker_observable,
+                states_supervisor, transition_supervisor, uo_events_attacker)
         # --- 阶段 1: 计算物理系统的全观察器 (上限) ---
         init_seeds = state_initial_origin if isinstance(state_initial_origin, (set, frozenset)) else {state_initial_origin}
+        # 两个阶段共用一个闭包引擎：阶段 1 不带 z 约束，阶段 2 按 z 过滤
+        closure_engine = UnobservableClosureEngine(transition_origin_system, uo_events_attacker, transition_supervisor)
         
         # 初始物理闭包（无监督）
         pure_initial_view = GenerateACAGFunctionTools.cal_unobservable_reach_supervisor(
-            init_seeds, transition_origin_system, uo_events_attacker
+            init_seeds, transition_origin_system, uo_events_attacker, closure_engine
         )
 
         physical_observer_states = {pure_initial_view}
@@ -185,7 +179,7 @@ class GenerateACAGFunctionTools:
                 next_seeds = {transition_origin_system[(x, sigma)] for x in curr_xi if (x, sigma) in transition_origin_system}
                 if next_seeds:
                     next_xi = GenerateACAGFunctionTools.cal_unobservable_reach_supervisor(
-                        next_seeds, transition_origin_system, uo_events_attacker
+                        next_seeds, transition_origin_system, uo_events_attacker, closure_engine
                     )
                     if next_xi not in physical_observer_states:
                         physical_observer_states.add(next_xi)
@@ -200,7 +194,7 @@ class GenerateACAGFunctionTools:
             # 初始探索队列：包含物理全集中的所有预估集（作为潜在的攻击起点）
             # 以及在当前 z 约束下真正能达到的初始预估集
             initial_constrained_xi = GenerateACAGFunctionTools.cal_unobservable_reach_attacker(
-                init_seeds, transition_origin_system, uo_events_attacker, transition_supervisor, z
+                init_seeds, transition_origin_system, uo_events_attacker, transition_supervisor, z, closure_engine
             )
             
             # 将物理全集和初始受限集都放入队列进行演化
@@ -223,7 +217,8 @@ class GenerateACAGFunctionTools:
                                 transition_origin_system, 
                                 uo_events_attacker, 
                                 transition_supervisor, 
-                                z
+                                z,
+                                closure_engine
                             )
                             
                             # 存储转移关系
@@ -236,6 +231,88 @@ class GenerateACAGFunctionTools:
                                 
         return estimation_result_attacker
     
+    # 位集版监督器观察器
+    @staticmethod
+    def generate_unobserver_reach_supervisor_bitset(transition_closed_loop_system,
+                                                    observable_events,
+                                                    event_ubobservable_supervisor):
+        """
+        与 generate_unobserver_reach_supervisor 相同的 BFS，预估集合以位集表示，
+        闭包与后继为按字并行的位运算，只在写入结果时解码为 frozenset。
+        """
+        observer = BitsetObserver(transition_closed_loop_system, event_ubobservable_supervisor)
+        initial_mask = observer.closure(observer.encode([(0, 0)]))
+
+        estimation_result_set_supervisor = {}
+        visited_masks = {initial_mask}
+        queue = deque([initial_mask])
+
+        while queue:
+            curr_mask = queue.popleft()
+            for event in observable_events:
+                next_seeds = observer.post(curr_mask, event)
+                if next_seeds:
+                    next_mask = observer.closure(next_seeds)
+                    estimation_result_set_supervisor[(observer.decode(curr_mask), event)] = observer.decode(next_mask)
+                    if next_mask not in visited_masks:
+                        visited_masks.add(next_mask)
+                        queue.append(next_mask)
+
+        return estimation_result_set_supervisor
+
+    # 位集版攻击者观察器
+    @staticmethod
+    def generate_unobserver_reach_attacker_bitset(state_initial_origin,
+                                                  transition_origin_system,
+                                                  event_attacker_observable,
+                                                  states_supervisor,
+                                                  transition_supervisor,
+                                                  uo_events_attacker):
+        """
+        与 generate_unobserver_reach_attacker 相同的两阶段演化，预估集合以位集表示
+        """
+        init_seeds = state_initial_origin if isinstance(state_initial_origin, (set, frozenset)) else {state_initial_origin}
+        observer = BitsetObserver(transition_origin_system, uo_events_attacker, transition_supervisor)
+        init_mask = observer.encode(init_seeds)
+
+        # --- 阶段 1: 物理系统的全观察器 ---
+        pure_initial_view = observer.closure(init_mask)
+        physical_observer_states = [pure_initial_view]
+        seen = {pure_initial_view}
+        observer_queue = deque([pure_initial_view])
+        while observer_queue:
+            curr_mask = observer_queue.popleft()
+            for sigma in event_attacker_observable:
+                next_seeds = observer.post(curr_mask, sigma)
+                if next_seeds:
+                    next_mask = observer.closure(next_seeds)
+                    if next_mask not in seen:
+                        seen.add(next_mask)
+                        physical_observer_states.append(next_mask)
+                        observer_queue.append(next_mask)
+
+        # --- 阶段 2: 在 z 约束下增量演化 ---
+        estimation_result_attacker = {z: {} for z in states_supervisor}
+        for z in states_supervisor:
+            initial_constrained_mask = observer.closure(init_mask, z)
+            queue = deque(physical_observer_states + [initial_constrained_mask])
+            visited_in_z = set(queue)
+            z_dict = estimation_result_attacker[z]
+
+            while queue:
+                curr_mask = queue.popleft()
+                for sigma in event_attacker_observable:
+                    if (z, sigma) in transition_supervisor:
+                        next_seeds = observer.post(curr_mask, sigma)
+                        if next_seeds:
+                            next_mask = observer.closure(next_seeds, z)
+                            z_dict[(observer.decode(curr_mask), sigma)] = observer.decode(next_mask)
+                            if next_mask not in visited_in_z:
+                                visited_in_z.add(next_mask)
+                                queue.append(next_mask)
+
+        return estimation_result_attacker
+
     @staticmethod
     def label_unobserver_reach_attacker(estimation_result_attacker, states_supervisor):
         """
@@ -300,3 +377,30 @@ class GenerateACAGFunctionTools:
             return tuple(event_alterable)
         else:
             return (event,)
+
+    # 将监督器预估转移编码为整数 id
+    @staticmethod
+    def encode_unobserver_reach_supervisor(estimation_result_supervisor, state_table):
+        """
+        输出格式: {(预估 id, 事件 id): 预估 id}，id 来自 state_table (ACAGStateTable)
+        """
+        estimates, events = state_table.estimates, state_table.events
+        return {
+            (estimates.intern(curr_est), events.intern(event)): estimates.intern(next_est)
+            for (curr_est, event), next_est in estimation_result_supervisor.items()
+        }
+
+    # 将攻击者预估转移编码为整数 id
+    @staticmethod
+    def encode_unobserver_reach_attacker(estimation_result_attacker, state_table):
+        """
+        输出格式: {z id: {(预估 id, 事件 id): 预估 id}}
+        """
+        estimates, events = state_table.estimates, state_table.events
+        return {
+            state_table.supervisor_states.intern(z): {
+                (estimates.intern(curr_est), events.intern(event)): estimates.intern(next_est)
+                for (curr_est, event), next_est in z_dict.items()
+            }
+            for z, z_dict in estimation_result_attacker.items()
+        }
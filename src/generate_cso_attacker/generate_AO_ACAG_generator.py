@@ -1,5 +1,6 @@
 import graphviz
 from collections import deque
+from .generate_ACAG_generator import ACAGSystemCreater
 
 class AOACAGSystemCreater:
     @staticmethod
@@ -12,23 +13,204 @@ class AOACAGSystemCreater:
         def get_tag(s):
             return lable_ACAG_map.get(s, str(s))
 
-        # 辅助工具：计算 ACAG 环境节点的攻击者不可观闭包
-        def get_unobservable_closure(start_states):
-            closure = set(start_states)
-            stack = list(start_states)
+        # 预处理转换关系
+        ye_adj = {}
+        ya_adj = {}
+        for (curr, event), nxt in all_ACAG_transition.items():
+            if len(curr) == 4: 
+                # 环境节点 Ye (长度 4)
+                ye_adj.setdefault(curr, []).append((event, nxt))
+            else: 
+                # 攻击节点 Ya (长度 6) - 进入 else 分支
+                ya_adj.setdefault(curr, []).append((event, nxt))
+
+        def is_exposed(ye):
+            return ye[0] == 'AX' or ye[0] == frozenset({'AX'})
+
+        return AOACAGSystemCreater.cluster_AO_ACAG(
+            initial_env_state,
+            lambda ye: ye_adj.get(ye, ()),
+            lambda ya: ya_adj.get(ya, ()),
+            event_attacker_unobservable,
+            get_tag,
+            is_exposed
+        )
+
+    # 由整数编码的 ACAG 生成 AO-ACAG 转移
+    @staticmethod
+    def generate_compact_AO_ACAG_transition(compact_ACAG, lable_ACAG_map, event_attacker_unobservable):
+        """
+        与 generate_AO_ACAG_transition 结果相同，但直接在 CompactACAG 的整数节点上聚类，
+        只有生成标签时才解码节点。
+        lable_ACAG_map 既可以按原始 Ye 元组索引，也可以按节点 id 索引。
+        """
+        table = compact_ACAG.table
+        ax_id = table.estimates.get(frozenset({'AX'}))
+        unobservable_ids = {table.events.get(e) for e in event_attacker_unobservable} - {None}
+
+        node_tags = {}
+
+        def get_tag(node):
+            tag = node_tags.get(node)
+            if tag is None:
+                tag = lable_ACAG_map.get(node)
+                if tag is None:
+                    state = table.decode_state(node)
+                    tag = lable_ACAG_map.get(state, str(state))
+                node_tags[node] = tag
+            return tag
+
+        return AOACAGSystemCreater.cluster_AO_ACAG(
+            compact_ACAG.initial,
+            compact_ACAG.enabled,
+            compact_ACAG.enabled,
+            unobservable_ids,
+            get_tag,
+            lambda ye: table.est_sup[ye] == ax_id,
+            table.events.lookup
+        )
+
+    # 不生成完整 ACAG，按需展开 Ye/Ya 直接构建 AO-ACAG
+    @staticmethod
+    def generate_lazy_AO_ACAG_transition(event_attacker_unobservable,
+                                         event_vulnerable,
+                                         event_attacker_alterable,
+                                         event_supervisor_unobservable,
+                                         transition_closed_loop_system,
+                                         transition_origin_system,
+                                         transition_supervisor,
+                                         state_initial_origin,
+                                         state_initial_closed_loop_system,
+                                         state_initial_supervisor,
+                                         estimation_result_supervisor,
+                                         estimation_result_attacker,
+                                         secret_states,
+                                         index_origin_system=None):
+        """
+        参数与 generate_ACAG_transition 相同。只有 Qe/Qa 聚类用到的 Ye/Ya 才会被计算，
+        峰值内存与 AO-ACAG 规模成正比，而不是与完整 ACAG 成正比。
+        Ye 标签按发现顺序分配 (ye0 为初始状态)，与 draw_ACAG_graph 的编号不一定相同。
+        :return: (ao_transitions, q0_tags, lable_ACAG_map)，lable_ACAG_map 只包含聚类中出现过的 Ye
+        """
+        initial_env_state = ACAGSystemCreater.generate_initial_ACAG_state(
+            event_attacker_unobservable,
+            event_supervisor_unobservable,
+            transition_closed_loop_system,
+            transition_origin_system,
+            transition_supervisor,
+            state_initial_origin,
+            state_initial_closed_loop_system,
+            state_initial_supervisor
+        )
+        ye_edges, ya_edges = ACAGSystemCreater.generate_ACAG_edge_functions(
+            event_attacker_unobservable,
+            event_vulnerable,
+            event_attacker_alterable,
+            event_supervisor_unobservable,
+            transition_origin_system,
+            transition_supervisor,
+            estimation_result_supervisor,
+            estimation_result_attacker,
+            secret_states,
+            index_origin_system
+        )
+
+        lable_ACAG_map = {}
+
+        def get_tag(ye):
+            tag = lable_ACAG_map.get(ye)
+            if tag is None:
+                tag = lable_ACAG_map[ye] = f"ye{len(lable_ACAG_map)}"
+            return tag
+
+        get_tag(initial_env_state)
+        ao_transitions, q0_tags = AOACAGSystemCreater.cluster_AO_ACAG(
+            initial_env_state,
+            ye_edges,
+            ya_edges,
+            event_attacker_unobservable,
+            get_tag,
+            lambda ye: ye[0] == 'AX' or ye[0] == frozenset({'AX'})
+        )
+        return ao_transitions, q0_tags, lable_ACAG_map
+
+    # AO-ACAG 聚类核心：只依赖邻接查询函数，与 ACAG 的存储方式无关
+    @staticmethod
+    def cluster_AO_ACAG(initial_env_state,
+                        ye_edges,
+                        ya_edges,
+                        event_attacker_unobservable,
+                        get_tag,
+                        is_exposed,
+                        event_name=None,
+                        stop_at=None):
+        """
+        Args:
+            initial_env_state: 初始 Ye
+            ye_edges(ye): Ye 的出边 [(sigma, ya), ...]
+            ya_edges(ya): Ya 的出边 [(t_sigma, ye'), ...]
+            event_attacker_unobservable: 攻击者不可观事件（与出边中的事件同一表示）
+            get_tag(ye): Ye 的标签，如 'ye0'
+            is_exposed(ye): Ye 是否已被监督器检测 (AX)
+            event_name(e): 输出时事件的表示，默认原样输出
+            stop_at(qe_set): 每发现一个新的 Qe（含 q0）调用一次，返回 True 时立即结束构建，
+                   返回已构建的部分转移；用于只关心某类 Qe 是否可达的场景
+        """
+        if event_name is None:
+            event_name = lambda e: e
+
+        # 不可观一步后继：Ye --(unobs_sigma)--> Ya --(unobs_tamper)--> Ye'，按需计算并缓存
+        unobs_ye_adj = {}
+
+        def unobservable_successors(ye):
+            succ = unobs_ye_adj.get(ye)
+            if succ is None:
+                succ = unobs_ye_adj[ye] = [
+                    ye_next
+                    for sigma, ya in ye_edges(ye) if sigma in event_attacker_unobservable
+                    for t_sigma, ye_next in ya_edges(ya) if t_sigma in event_attacker_unobservable
+                ]
+            return succ
+
+        # 单个 Ye 的闭包缓存：整个构建过程中每个 Ye 的闭包只计算一次
+        ye_closure_cache = {}
+
+        def get_ye_closure(ye):
+            cached = ye_closure_cache.get(ye)
+            if cached is not None:
+                return cached
+            closure = {ye}
+            stack = [ye]
             while stack:
                 curr = stack.pop()
-                # 遍历从当前 Ye 经过不可观事件到达的下一个 Ye
-                # 路径逻辑：Ye --(unobs_sigma)--> Ya --(unobs_tamper)--> Ye'
-                for (state, sigma), nxt in all_ACAG_transition.items():
-                    if state == curr and sigma in event_attacker_unobservable:
-                        # 【修复点 1】：判断 Ya 节点长度由 5 改为 6
-                        if len(nxt) == 6: # Ya 节点现在是 6 维元组
-                            for (ya_s, t_sigma), ye_next in all_ACAG_transition.items():
-                                if ya_s == nxt and t_sigma in event_attacker_unobservable:
-                                    if ye_next not in closure:
-                                        closure.add(ye_next)
-                                        stack.append(ye_next)
+                for ye_next in unobservable_successors(curr):
+                    if ye_next in closure:
+                        continue
+                    done = ye_closure_cache.get(ye_next)
+                    if done is not None:
+                        # 已知闭包直接并入，不再向下展开
+                        closure |= done
+                    else:
+                        closure.add(ye_next)
+                        stack.append(ye_next)
+            closure = frozenset(closure)
+            ye_closure_cache[ye] = closure
+            return closure
+
+        # 单个 Ye 的闭包中是否含有已暴露 (AX) 的节点，按 Ye 缓存
+        ye_exposed_cache = {}
+
+        def is_ye_closure_exposed(ye):
+            exposed = ye_exposed_cache.get(ye)
+            if exposed is None:
+                exposed = ye_exposed_cache[ye] = any(is_exposed(s) for s in get_ye_closure(ye))
+            return exposed
+
+        # 辅助工具：计算 ACAG 环境节点集合的攻击者不可观闭包（各 Ye 闭包之并）
+        def get_unobservable_closure(start_states):
+            closure = set()
+            for ye in start_states:
+                closure |= get_ye_closure(ye)
             return frozenset(closure)
 
         def to_tag_tuple(state_set):
@@ -41,66 +223,68 @@ class AOACAGSystemCreater:
         q0_tags = to_tag_tuple(q0_set)
         
         ao_transitions = {}
+        if stop_at is not None and stop_at(q0_set):
+            return ao_transitions, q0_tags
         queue = deque([(q0_set, q0_tags)])
         visited_qe_tags = {q0_tags}
 
-        # 预处理转换关系
-        ye_adj = {}
-        ya_adj = {}
-        for (curr, event), nxt in all_ACAG_transition.items():
-            if len(curr) == 4: 
-                # 环境节点 Ye (长度 4)
-                ye_adj.setdefault(curr, []).append((event, nxt))
-            else: 
-                # 攻击节点 Ya (长度 6) - 进入 else 分支
-                ya_adj.setdefault(curr, []).append((event, nxt))
-
         while queue:
             curr_qe_set, curr_qe_tags = queue.popleft()
 
             # --- 步骤 A: 聚类 Qe --(可观 sigma)--> Qa ---
             obs_groups = {}
             for ye in curr_qe_set:
-                if ye in ye_adj:
-                    for sigma, ya in ye_adj[ye]:
-                        if sigma not in event_attacker_unobservable: # 仅处理可观事件
-                            obs_groups.setdefault(sigma, set()).add(ya)
+                for sigma, ya in ye_edges(ye):
+                    if sigma not in event_attacker_unobservable: # 仅处理可观事件
+                        obs_groups.setdefault(sigma, set()).add(ya)
             
             for sigma, ya_set in obs_groups.items():
-                curr_qa_key = (curr_qe_tags, sigma)
+                curr_qa_key = (curr_qe_tags, event_name(sigma))
                 
                 # --- 步骤 B: 聚类 Qa --(tampered)--> Qe' ---
                 decision_groups = {}
                 for ya in ya_set:
-                    if ya in ya_adj:
-                        for t_sigma, ye_next in ya_adj[ya]:
-                            decision_groups.setdefault(t_sigma, set()).add(ye_next)
+                    for t_sigma, ye_next in ya_edges(ya):
+                        decision_groups.setdefault(t_sigma, set()).add(ye_next)
                 
                 for t_sigma, next_ye_set in decision_groups.items():
+                    # 暴露检查：闭包之并含 AX 当且仅当某个 Ye 的闭包含 AX，命中即停止
+                    if any(is_ye_closure_exposed(ye) for ye in next_ye_set):
+                        ao_transitions[(curr_qa_key, event_name(t_sigma))] = 'AX'
+                        continue
+
                     # 计算新到达状态的不可观闭包
                     closure_set = get_unobservable_closure(next_ye_set)
+                    next_qe_tags = to_tag_tuple(closure_set)
+                    ao_transitions[(curr_qa_key, event_name(t_sigma))] = next_qe_tags
                     
-                    # 暴露检查
-                    is_exposed = any((s[0] == 'AX' or s[0] == frozenset({'AX'})) for s in closure_set)
-                    
-                    if is_exposed:
-                        ao_transitions[(curr_qa_key, t_sigma)] = 'AX'
-                    else:
-                        next_qe_tags = to_tag_tuple(closure_set)
-                        ao_transitions[(curr_qa_key, t_sigma)] = next_qe_tags
-                        
-                        if next_qe_tags not in visited_qe_tags:
-                            visited_qe_tags.add(next_qe_tags)
-                            queue.append((closure_set, next_qe_tags))
-                            
+                    if next_qe_tags not in visited_qe_tags:
+                        visited_qe_tags.add(next_qe_tags)
+                        queue.append((closure_set, next_qe_tags))
+                        if stop_at is not None and stop_at(closure_set):
+                            return ao_transitions, q0_tags
+
         return ao_transitions, q0_tags
         
+    # AO-ACAG 环境状态编号（与 draw_AO_ACAG_graph 返回的 qe_map 相同），不涉及绘图
+    @staticmethod
+    def label_AO_ACAG_states(ao_transitions, q0_tags):
+        """
+        q0 记为 qe0，其余 Qe 按转移中首次作为目标出现的顺序编号；AX 不编号
+        """
+        qe_map = {q0_tags: "qe0"}
+        for _, next_qe_tags in ao_transitions.items():
+            if next_qe_tags != 'AX' and next_qe_tags not in qe_map:
+                qe_map[next_qe_tags] = f"qe{len(qe_map)}"
+        return qe_map
+
     @staticmethod
     def draw_AO_ACAG_graph(ao_transitions, 
                         q0_tags,
                         lable_ACAG_map,
                         secret_states,
-                        filename):
+                        filename,
+                        render=True):
         dot = graphviz.Digraph(comment='AO-ACAG System', format='svg')
         
         dot.attr(
@@ -223,5 +407,6 @@ class AOACAGSystemCreater:
                 dot.edge(qa_id, next_id, label=f" {t_sigma} ", 
                         style='dashed', color='#2563EB', fontcolor='#2563EB', arrowsize='0.6')
 
-        dot.render(filename, cleanup=True)
+        if render:
+            dot.render(filename, cleanup=True)
         return dot, qe_map
\ No newline at end of file
@@ -1,3 +1,5 @@
+import logging
+import os
 from .utils.logger import get_logger
 from .system_DFA_basic import ClosedLoopSystem
 from .generate_ACAG_helper import GenerateACAGFunctionTools
@@ -7,12 +9,70 @@ from .generate_pruned_AO_ACAG_generator import PrunedAOACAGSystemCreater
 from .correspond_graph_simplyfier import GraphSimplyfier
 from .system_assumption import assumption_one
 from .active_attacker_generator import AttackerGenerator
+from .state_interning import ACAGStateTable
+from .stage_cache import StageCache, fingerprint
+from .render_scheduler import RenderScheduler
+from .transition_export import export_transitions
+from .mapped_graph import write_ACAG, write_AO_ACAG
+from .stage_profiler import StageProfiler
 
-assumption = assumption_one
 class CSO_Attacker_Generator:
     @staticmethod
-    def generate_cso_attacker():
-        app_logger = get_logger("cso_atk", "logs")
+    def generate_cso_attacker(assumption=None, cache=None, renderer=None, draw=True, log_dir="logs",
+                              log_level=logging.INFO, export_dir=None, export_format='jsonl',
+                              log_background=True, profiler=None, ao_mode='compact'):
+        """
+        assumption: SystemAssumptions，为 None 时使用 system_assumption.assumption_one
+        cache: StageCache，为 None 时不使用缓存（每次重新计算、不写盘）；
+               传入 StageCache() 启用 .cache/cso-attacker 下的磁盘缓存。缓存文件是 pickle，
+               读取时会执行其中的代码，只应对自己写出、他人无法改写的目录启用
+        renderer: RenderScheduler，为 None 时新建；所有图在进程池中并行渲染，函数返回前等待全部完成
+        draw: 为 False 时只计算（headless），不构建也不渲染任何图
+        log_dir: 日志目录，批量运行时每个工作进程使用各自的目录
+        log_level: 日志级别；ACAG / AO-ACAG / pruned AO-ACAG 的逐条转移只在 DEBUG 级别记录
+        export_dir: 不为 None 时将三张图的转移关系流式导出到该目录（ACAG / AO-ACAG / pruned-AO-ACAG）
+        export_format: 'jsonl'、'binary' 或 'mapped'（CSR 内存映射格式，可用 MappedGraph 打开后直接剪枝 / 分析 SCC）
+        log_background: 日志后台写模式，True 为 QueueListener，'batch' 为攒批写盘，False 为同步写
+        profiler: StageProfiler，记录每个阶段的耗时、内存与规模；为 None 时不记录
+        ao_mode: 'compact' 先生成整数编码的完整 ACAG 再聚类；'lazy' 不生成 ACAG，按需展开直接构建 AO-ACAG，
+                 峰值内存与 AO-ACAG 而不是 ACAG 成正比，只能与 draw=False 一起使用。
+                 lazy 模式下结果中的 ACAG / initial_env_state 为 None，lable_ACAG_map 只含聚类中出现过的 Ye，
+                 Ye 标签按发现顺序分配，与 compact 模式的编号不一定相同
+        :return: 各阶段的分析结果字典，active_attacker 项为提取出的 ActiveAttacker（篡改策略表），
+                 profile 项为 profiler 的报告（未传入 profiler 时为 None）
+        """
+        if assumption is None:
+            assumption = assumption_one
+        app_logger = get_logger("cso_atk", log_dir, log_level, log_background)
+        log_transitions = app_logger.is_enabled_for(logging.DEBUG)
+        export_suffix = {'jsonl': '.jsonl', 'binary': '.bin', 'mapped': '.csr'}[export_format]
+        if ao_mode not in ('compact', 'lazy'):
+            raise ValueError(f"未知的 AO-ACAG 构建模式: {ao_mode}")
+        if ao_mode == 'lazy' and draw:
+            raise ValueError("ao_mode='lazy' 不生成 ACAG，无法绘图，请同时传入 draw=False")
+
+        def export_stage(transitions, graph):
+            if export_dir is None:
+                return
+            profiler.begin(f'export_{graph}')
+            path = os.path.join(export_dir, graph + export_suffix)
+            if export_format == 'mapped':
+                write = write_ACAG if graph == 'ACAG' else write_AO_ACAG
+                n_nodes, n_edges = write(path, transitions, graph)
+                profiler.end(nodes=n_nodes, transitions=n_edges)
+                app_logger.info('%s 已导出: 节点 %s, 边 %s', graph, n_nodes, n_edges)
+                return
+            n_nodes, n_labels, n_edges = export_transitions(transitions, path, export_format, graph)
+            profiler.end(nodes=n_nodes, labels=n_labels, transitions=n_edges)
+            app_logger.info('%s 已导出: 节点 %s, 事件 %s, 转移 %s', graph, n_nodes, n_labels, n_edges)
+        if cache is None:
+            cache = StageCache(enabled=False)
+        if draw and renderer is None:
+            renderer = RenderScheduler()
+        report_profile = profiler is not None
+        if profiler is None:
+            profiler = StageProfiler(enabled=False)
+        profiler.attach_cache(cache)
         
         #1.闭环系统
         #生成攻击者和监督器的不可观测事件集
@@ -20,217 +80,349 @@ class CSO_Attacker_Generator:
             assumption.event_system,
             assumption.event_supervisor_observable
         )
-        app_logger.info(f'监督器不可观测事件: {event_unobservable_supervisor}')
+        app_logger.info('监督器不可观测事件: %s', event_unobservable_supervisor)
         app_logger.info("="*60)
         event_unobservable_attacker=ClosedLoopSystem.generate_unobservable_events(
             assumption.event_system,
             assumption.event_attacker_observable
         )
-        app_logger.info(f'攻击者不可观测事件: {event_unobservable_attacker}')
+        app_logger.info('攻击者不可观测事件: %s', event_unobservable_attacker)
         app_logger.info("="*60)
-        #1.1 生成闭环系统状态集合
-        states_closed_loop_system=ClosedLoopSystem.generate_states_closed_loop_system(assumption.state_oringin_system,
-                                                                assumption.state_initial_origin_ststem,
-                                                                assumption.state_initial_supervisor,
-                                                                assumption.event_system,
-                                                                assumption.transition_origin_system,
-                                                                assumption.transition_supervisor
-                                                                )
-        app_logger.info(f'闭环系统状态集合: {states_closed_loop_system}')
+        # 各阶段缓存键：只包含该阶段用到的系统假设字段与上游阶段的键
+        key_closed_loop = fingerprint('closed_loop',
+                                      assumption.state_initial_origin_ststem,
+                                      assumption.state_initial_supervisor,
+                                      assumption.event_system,
+                                      assumption.transition_origin_system,
+                                      assumption.transition_supervisor)
+        key_supervisor = fingerprint('observer_supervisor',
+                                     key_closed_loop,
+                                     assumption.event_supervisor_observable)
+        key_attacker = fingerprint('observer_attacker',
+                                   assumption.state_initial_origin_ststem,
+                                   assumption.event_system,
+                                   assumption.event_attacker_observable,
+                                   assumption.state_supervisor,
+                                   assumption.transition_origin_system,
+                                   assumption.transition_supervisor)
+        key_ACAG = fingerprint('ACAG',
+                               key_supervisor,
+                               key_attacker,
+                               assumption.event_vulnerable,
+                               assumption.event_alterable,
+                               assumption.state_system_secret)
+        #1.1 一次搜索生成闭环系统（状态集合、转换关系、初始状态）
+        profiler.begin('closed_loop')
+        closed_loop_automaton = cache.get_or_compute('closed_loop', key_closed_loop, lambda: ClosedLoopSystem.build_closed_loop_automaton(
+            assumption.state_initial_origin_ststem,
+            assumption.state_initial_supervisor,
+            assumption.event_system,
+            assumption.transition_origin_system,
+            assumption.transition_supervisor
+        ))
+        states_closed_loop_system = list(closed_loop_automaton.states)
+        app_logger.info('闭环系统状态集合: %s', states_closed_loop_system)
         app_logger.info("="*60)
-        #1.2 生成闭环转换关系
-        transition_closed_loop_system=ClosedLoopSystem.generate_transition_closed_loop_system(assumption.state_oringin_system,
-                                                                assumption.state_initial_origin_ststem,
-                                                                assumption.state_initial_supervisor,
-                                                                assumption.event_system,
-                                                                assumption.transition_origin_system,
-                                                                assumption.transition_supervisor
-                                                                )
-        app_logger.info(f'闭环转换关系:{transition_closed_loop_system}')
+        #1.2 闭环转换关系
+        transition_closed_loop_system = closed_loop_automaton.transitions
+        app_logger.info('闭环转换关系:%s', dict(transition_closed_loop_system))
         app_logger.info("="*60)
         # 1.3 闭环系统初始状态
-        state_initial_closed_loop_system = ClosedLoopSystem.generate_states_initial_closed_loop_system(
-            assumption.state_initial_supervisor,
-            assumption.state_initial_origin_ststem,
-            states_closed_loop_system
-        )
-        app_logger.info(f'初始状态:{state_initial_closed_loop_system}')
+        state_initial_closed_loop_system = list(closed_loop_automaton.initial_states)
+        app_logger.info('初始状态:%s', state_initial_closed_loop_system)
         app_logger.info("="*60)
+        profiler.end(states=len(closed_loop_automaton), transitions=len(transition_closed_loop_system))
         # 1.4 生成闭环系统图
-        closed_loop_graph = ClosedLoopSystem.generate_closed_loop_system_graph(
-            transition_closed_loop_system, 
-            state_initial_closed_loop_system,
-            assumption.event_system,
-            assumption.event_attacker_observable,
-            assumption.event_vulnerable,
-            assumption.event_supervisor_observable,
-            assumption.event_supervisor_controllable,
-            assumption.state_system_secret,
-            file_name="resources/cso-attacker/closed_loop_graph"
-        )
-        # 额外输出PDF格式
-        closed_loop_graph.format = 'pdf'
-        closed_loop_graph.render("resources/cso-attacker/closed_loop_graph_pdf", cleanup=True)  # 输出PDF格式
+        if draw:
+            profiler.begin('draw_closed_loop')
+            closed_loop_graph = ClosedLoopSystem.generate_closed_loop_system_graph(
+                transition_closed_loop_system, 
+                state_initial_closed_loop_system,
+                assumption.event_system,
+                assumption.event_attacker_observable,
+                assumption.event_vulnerable,
+                assumption.event_supervisor_observable,
+                assumption.event_supervisor_controllable,
+                assumption.state_system_secret,
+                file_name="resources/cso-attacker/closed_loop_graph",
+                render=False
+            )
+            renderer.submit(closed_loop_graph, "resources/cso-attacker/closed_loop_graph")
+            renderer.submit(closed_loop_graph, "resources/cso-attacker/closed_loop_graph_pdf", 'pdf')
+            profiler.end()
         # 1.5 生成闭环语言
+        profiler.begin('language_closed_loop')
         language_closed_loop_system = ClosedLoopSystem.generate_language_closed_loop_system(
             transition_closed_loop_system,
             state_initial_closed_loop_system
         )
-        app_logger.info(f'闭环系统语言:{language_closed_loop_system}')
+        app_logger.info('闭环系统语言:%s', language_closed_loop_system)
         app_logger.info("="*60)
+        profiler.end(words=len(language_closed_loop_system))
         #2. ACAG系统
         
         #2.1 生成监督器不可观测可达集
-        unobservable_reachable_supervisor = GenerateACAGFunctionTools.generate_unobserver_reach_supervisor(
+        profiler.begin('observer_supervisor')
+        unobservable_reachable_supervisor = cache.get_or_compute('observer_supervisor', key_supervisor, lambda: GenerateACAGFunctionTools.generate_unobserver_reach_supervisor(
             transition_closed_loop_system,
             assumption.event_supervisor_observable,
             event_unobservable_supervisor
-            )
+            ))
         #验证结果
         print("生成监督器不可观测可达集")
-        app_logger.info(f'监督器不可观测可达集:{unobservable_reachable_supervisor}')
+        app_logger.info('监督器不可观测可达集:%s', unobservable_reachable_supervisor)
         app_logger.info("="*60)
         #验证标签结果集
         labled_unobservable_reachable_supervisor=GenerateACAGFunctionTools.label_unobserver_reach_supervisor(unobservable_reachable_supervisor)
         print("验证标签结果集")
-        app_logger.info(f'标签结果集:{labled_unobservable_reachable_supervisor}')
+        app_logger.info('标签结果集:%s', labled_unobservable_reachable_supervisor)
+        profiler.end(transitions=len(unobservable_reachable_supervisor))
         #2.2 生成攻击者不可观测可达集
-        unobservable_reachable_attacker = GenerateACAGFunctionTools.generate_unobserver_reach_attacker(
+        profiler.begin('observer_attacker')
+        unobservable_reachable_attacker = cache.get_or_compute('observer_attacker', key_attacker, lambda: GenerateACAGFunctionTools.generate_unobserver_reach_attacker(
             assumption.state_initial_origin_ststem,
             assumption.transition_origin_system,
             assumption.event_attacker_observable,
             assumption.state_supervisor,
             assumption.transition_supervisor,
             event_unobservable_attacker
-        )
+        ))
         print("生成攻击者不可观测可达集")
-        app_logger.info(f'攻击者不可观测可达集:{unobservable_reachable_attacker}')
+        app_logger.info('攻击者不可观测可达集:%s', unobservable_reachable_attacker)
         app_logger.info("="*60)
         #验证标签结果集
         labled_unobservable_reachable_attacker=GenerateACAGFunctionTools.label_unobserver_reach_attacker(unobservable_reachable_attacker,assumption.state_supervisor)
-        app_logger.info(f'标签结果集:{labled_unobservable_reachable_attacker}')
-        #2.3 生成ACAG系统转移关系集合
-        transition_ACAG_system,initial_env_state = ACAGSystemCreater.generate_ACAG_transition(
-            event_unobservable_attacker,
-            assumption.event_vulnerable,
-            assumption.event_alterable,
-            event_unobservable_supervisor,
-            transition_closed_loop_system,
-            assumption.transition_origin_system,      # 物理系统转移字典
-            assumption.transition_supervisor,         # 监督器实现字典
-            assumption.state_initial_origin_ststem,
-            state_initial_closed_loop_system,
-            assumption.state_initial_supervisor,
-            unobservable_reachable_supervisor,
-            unobservable_reachable_attacker,
-            assumption.state_system_secret,                # 秘密状态集
-        )
-        #验证结果
-        app_logger.info("ACAG系统转移关系集合:")
-        for state,next_state in transition_ACAG_system.items():
-            app_logger.info(f'{state} -> {next_state}')
-        app_logger.info("="*60)
-        print("记录ACAG系统转移关系集合")
-        #3. 生成ACAG完整图
-        graph_ACAG_system,lable_ACAG_map = ACAGSystemCreater.draw_ACAG_graph(
-            transition_ACAG_system,
-            initial_env_state,
-            assumption.state_system_secret,
-            labled_unobservable_reachable_supervisor,
-            labled_unobservable_reachable_attacker,
-            filename='resources/cso-attacker/ACAG'
-        )
-        print("生成ACAG完整图")
-        graph_ACAG_system.format = 'pdf'
-        graph_ACAG_system.render("resources/cso-attacker/ACAG_pdf", cleanup=True)
-        #查看ACAG标签关系
-        app_logger.info("ACAG标签关系:")
-        for key,value in lable_ACAG_map.items():
-            app_logger.info(f'{key} -> {value}')
-        app_logger.info("="*60)
-        #4. 生成AO-ACAG系统完整信息
-        #4.1 生成AO-ACAG系统转换关系集合
-        all_transition_AO_ACAG_system,intial_AO_env_state = AOACAGSystemCreater.generate_AO_ACAG_transition(
-            transition_ACAG_system,
-            initial_env_state,
-            lable_ACAG_map,
-            event_unobservable_attacker
-        )
+        app_logger.info('标签结果集:%s', labled_unobservable_reachable_attacker)
+        profiler.end(transitions=len(unobservable_reachable_attacker))
+        if ao_mode == 'lazy':
+            #2.3-4.1 不生成 ACAG，按需展开 Ye / Ya 直接聚类得到 AO-ACAG；Ye 标签按发现顺序分配
+            transition_ACAG_system = initial_env_state = None
+            key_AO_ACAG = fingerprint('AO_ACAG_lazy', key_ACAG)
+            profiler.begin('AO_ACAG')
+            all_transition_AO_ACAG_system,intial_AO_env_state,lable_ACAG_map = cache.get_or_compute('AO_ACAG', key_AO_ACAG, lambda: AOACAGSystemCreater.generate_lazy_AO_ACAG_transition(
+                event_unobservable_attacker,
+                assumption.event_vulnerable,
+                assumption.event_alterable,
+                event_unobservable_supervisor,
+                transition_closed_loop_system,
+                assumption.transition_origin_system,
+                assumption.transition_supervisor,
+                assumption.state_initial_origin_ststem,
+                state_initial_closed_loop_system,
+                assumption.state_initial_supervisor,
+                unobservable_reachable_supervisor,
+                unobservable_reachable_attacker,
+                assumption.state_system_secret,
+                index_origin_system=assumption.index_origin_system
+            ))
+        else:
+            #2.3 生成ACAG系统转移关系集合（节点整数编码，只在日志与绘图时解码）
+            profiler.begin('ACAG')
+            compact_ACAG_system = cache.get_or_compute('ACAG', key_ACAG, lambda: ACAGSystemCreater.generate_compact_ACAG_transition(
+                event_unobservable_attacker,
+                assumption.event_vulnerable,
+                assumption.event_alterable,
+                event_unobservable_supervisor,
+                transition_closed_loop_system,
+                assumption.transition_origin_system,      # 物理系统转移字典
+                assumption.transition_supervisor,         # 监督器实现字典
+                assumption.state_initial_origin_ststem,
+                state_initial_closed_loop_system,
+                assumption.state_initial_supervisor,
+                unobservable_reachable_supervisor,
+                unobservable_reachable_attacker,
+                assumption.state_system_secret,                # 秘密状态集
+                index_origin_system=assumption.index_origin_system,
+                state_table=ACAGStateTable(),
+            ))
+            transition_ACAG_system = compact_ACAG_system.decode()
+            initial_env_state = compact_ACAG_system.decode_initial()
+            profiler.end(nodes=len(compact_ACAG_system.table), transitions=len(transition_ACAG_system))
+            #验证结果（逐条转移只在 DEBUG 级别记录，完整结果见导出文件）
+            app_logger.info('ACAG系统转移数: %s', len(transition_ACAG_system))
+            if log_transitions:
+                app_logger.debug("ACAG系统转移关系集合:")
+                for state,next_state in transition_ACAG_system.items():
+                    app_logger.debug('%s -> %s', state, next_state)
+                app_logger.debug("="*60)
+            export_stage(transition_ACAG_system, 'ACAG')
+            print("记录ACAG系统转移关系集合")
+            #3. ACAG 环境状态编号，生成ACAG完整图
+            profiler.begin('label_ACAG')
+            lable_ACAG_map = ACAGSystemCreater.label_ACAG_states(transition_ACAG_system, initial_env_state)
+            profiler.end(environment_states=len(lable_ACAG_map))
+            if draw:
+                profiler.begin('draw_ACAG')
+                graph_ACAG_system,_ = ACAGSystemCreater.draw_ACAG_graph(
+                    transition_ACAG_system,
+                    initial_env_state,
+                    assumption.state_system_secret,
+                    labled_unobservable_reachable_supervisor,
+                    labled_unobservable_reachable_attacker,
+                    filename='resources/cso-attacker/ACAG',
+                    render=False
+                )
+                print("生成ACAG完整图")
+                renderer.submit(graph_ACAG_system, "resources/cso-attacker/ACAG")
+                renderer.submit(graph_ACAG_system, "resources/cso-attacker/ACAG_pdf", 'pdf')
+                profiler.end()
+            #查看ACAG标签关系
+            if log_transitions:
+                app_logger.debug("ACAG标签关系:")
+                for key,value in lable_ACAG_map.items():
+                    app_logger.debug('%s -> %s', key, value)
+                app_logger.debug("="*60)
+            #4. 生成AO-ACAG系统完整信息
+            #4.1 生成AO-ACAG系统转换关系集合
+            # Ye 标签一并计入键
+            key_AO_ACAG = fingerprint('AO_ACAG', key_ACAG, lable_ACAG_map)
+            profiler.begin('AO_ACAG')
+            all_transition_AO_ACAG_system,intial_AO_env_state = cache.get_or_compute('AO_ACAG', key_AO_ACAG, lambda: AOACAGSystemCreater.generate_compact_AO_ACAG_transition(
+                compact_ACAG_system,
+                lable_ACAG_map,
+                event_unobservable_attacker
+            ))
+        profiler.end(transitions=len(all_transition_AO_ACAG_system))
         print("生成AO-ACAG系统转换关系集合")
-        app_logger.info("AO-ACAG系统转换关系集合:")
-        for state,next_state in all_transition_AO_ACAG_system.items():
-            app_logger.info(f'{state} -> {next_state}')
-        app_logger.info("="*60)
-        #5. 绘制AO-ACAG完整图
-        graph_AO_ACAG_system,lable_AOACAG_map=AOACAGSystemCreater.draw_AO_ACAG_graph(
-            all_transition_AO_ACAG_system,
-            intial_AO_env_state,
-            lable_ACAG_map,
-            assumption.state_system_secret,
-            filename='resources/cso-attacker/AO-ACAG'
-        )
-        print("绘制AO-ACAG完整图")
-        graph_AO_ACAG_system.format='pdf'
-        graph_AO_ACAG_system.render("resources/cso-attacker/AO-ACAG_pdf", cleanup=True)
+        app_logger.info('AO-ACAG系统转移数: %s', len(all_transition_AO_ACAG_system))
+        if log_transitions:
+            app_logger.debug("AO-ACAG系统转换关系集合:")
+            for state,next_state in all_transition_AO_ACAG_system.items():
+                app_logger.debug('%s -> %s', state, next_state)
+            app_logger.debug("="*60)
+        export_stage(all_transition_AO_ACAG_system, 'AO-ACAG')
+        #5. AO-ACAG 环境状态编号，绘制AO-ACAG完整图
+        profiler.begin('label_AO_ACAG')
+        lable_AOACAG_map = AOACAGSystemCreater.label_AO_ACAG_states(all_transition_AO_ACAG_system, intial_AO_env_state)
+        profiler.end(environment_states=len(lable_AOACAG_map))
+        if draw:
+            profiler.begin('draw_AO_ACAG')
+            graph_AO_ACAG_system,_ = AOACAGSystemCreater.draw_AO_ACAG_graph(
+                all_transition_AO_ACAG_system,
+                intial_AO_env_state,
+                lable_ACAG_map,
+                assumption.state_system_secret,
+                filename='resources/cso-attacker/AO-ACAG',
+                render=False
+            )
+            print("绘制AO-ACAG完整图")
+            renderer.submit(graph_AO_ACAG_system, "resources/cso-attacker/AO-ACAG")
+            renderer.submit(graph_AO_ACAG_system, "resources/cso-attacker/AO-ACAG_pdf", 'pdf')
+            profiler.end()
         #6. 生成pruned AO-ACAG完整信息
-        all_transition_pruned_AO_ACAG_system,intial_pruned_AO_env_state=PrunedAOACAGSystemCreater.generate_pruned_AO_ACAG_transition(
+        key_pruned_AO_ACAG = fingerprint('pruned_AO_ACAG', key_AO_ACAG)
+        profiler.begin('pruned_AO_ACAG')
+        all_transition_pruned_AO_ACAG_system,intial_pruned_AO_env_state=cache.get_or_compute('pruned_AO_ACAG', key_pruned_AO_ACAG, lambda: PrunedAOACAGSystemCreater.generate_pruned_AO_ACAG_transition(
             all_transition_AO_ACAG_system,
             intial_AO_env_state
-        )
+        ))
+        profiler.end(transitions=len(all_transition_pruned_AO_ACAG_system))
         print("生成pruned AO-ACAG系统转换关系集合")
-        app_logger.info("pruned AO-ACAG系统转换关系集合:")
-        for state,next_state in all_transition_pruned_AO_ACAG_system.items():
-            app_logger.info(f'{state} -> {next_state}')
-        app_logger.info("="*60)
-        #7. 绘制pruned AO-ACAG完整图
-        graph_pruned_AO_ACAG_system=PrunedAOACAGSystemCreater.draw_pruned_AO_ACAG_graph(
+        app_logger.info('pruned AO-ACAG系统转移数: %s', len(all_transition_pruned_AO_ACAG_system))
+        if log_transitions:
+            app_logger.debug("pruned AO-ACAG系统转换关系集合:")
+            for state,next_state in all_transition_pruned_AO_ACAG_system.items():
+                app_logger.debug('%s -> %s', state, next_state)
+            app_logger.debug("="*60)
+        export_stage(all_transition_pruned_AO_ACAG_system, 'pruned-AO-ACAG')
+        #7-8. pruned AO-ACAG 的 SCC 分类；绘制pruned AO-ACAG图与简略图
+        profiler.begin('SCC')
+        SCC_result = cache.get_or_compute('SCC', fingerprint('SCC', key_pruned_AO_ACAG), lambda: AttackerGenerator.classify_pruned_AO_ACAG_SCC(
+            all_transition_pruned_AO_ACAG_system
+        ))
+        all_SCC = SCC_result[0]
+        profiler.end(sccs=len(all_SCC))
+        #7'. 主动攻击者：凝聚 DAG 上的可达性分析与篡改策略表
+        profiler.begin('active_attacker')
+        active_attacker = AttackerGenerator.extract_active_attacker(
             all_transition_pruned_AO_ACAG_system,
-            intial_pruned_AO_env_state,
-            lable_ACAG_map,
-            assumption.state_system_secret,
-            lable_AOACAG_map,
-            filename='resources/cso-attacker/pruned-AO-ACAG'
-        )
-        print("绘制pruned AO-ACAG完整图")
-        graph_pruned_AO_ACAG_system.format='pdf'
-        graph_pruned_AO_ACAG_system.render("resources/cso-attacker/pruned-AO-ACAG_pdf", cleanup=True)
-        #8. 生成简略的可放在论文中的图
-        #8.1 生成简略的ACAG图
-        simplified_ACAG_graph,simplified_ACAG_ye_map=GraphSimplyfier.draw_simplified_ACAG_graph(
-            transition_ACAG_system,
-            initial_env_state,
-            assumption.state_system_secret,
-            labled_unobservable_reachable_supervisor,
-            labled_unobservable_reachable_attacker,
-            assumption.event_supervisor_observable,
-            assumption.event_attacker_observable,
-            filename='resources/cso-attacker/simplified-ACAG'
-        )
-        simplified_ACAG_graph.format='pdf'
-        simplified_ACAG_graph.render("resources/cso-attacker/simplified-ACAG_pdf", cleanup=True)
-        print("生成简略的ACAG图")
-        #8.2 生成简略的AO-ACAG图
-        simplified_AO_ACAG_graph,simplified_AO_ACAG_qe_map=GraphSimplyfier.draw_simplified_AO_ACAG_graph(
             all_transition_AO_ACAG_system,
-            intial_AO_env_state,
-            lable_ACAG_map,
-            assumption.state_system_secret,
-            filename='resources/cso-attacker/simplified-AO-ACAG'
-        )
-        simplified_AO_ACAG_graph.format='pdf'
-        simplified_AO_ACAG_graph.render("resources/cso-attacker/simplified-AO-ACAG_pdf", cleanup=True)
-        print("生成简略的AO-ACAG图")
-        #8.3 生成带成功值的pruned AO-ACAG图
-        marked_SCC_pruned_AO_ACAG_graph,all_SCC=AttackerGenerator.draw_purned_AO_ACAG_graph_marked_SCC(
-            all_transition_pruned_AO_ACAG_system,
+            intial_pruned_AO_env_state,
             lable_ACAG_map,
-            assumption.state_system_secret,
-            lable_AOACAG_map,
-            filename='resources/cso-attacker/marked-SCC-pruned-AO-ACAG'
+            assumption.state_system_secret
         )
-        marked_SCC_pruned_AO_ACAG_graph.format='pdf'
-        marked_SCC_pruned_AO_ACAG_graph.render("resources/cso-attacker/marked-SCC-pruned-AO-ACAG_pdf", cleanup=True)
-        print("生成标记SCC的pruned AO-ACAG图")
+        attacker_summary = active_attacker.summary()
+        profiler.end(**attacker_summary)
+        app_logger.info('主动攻击者: %s', attacker_summary)
+        if draw:
+            profiler.begin('draw_pruned_AO_ACAG')
+            #7. 绘制pruned AO-ACAG完整图
+            graph_pruned_AO_ACAG_system=PrunedAOACAGSystemCreater.draw_pruned_AO_ACAG_graph(
+                all_transition_pruned_AO_ACAG_system,
+                intial_pruned_AO_env_state,
+                lable_ACAG_map,
+                assumption.state_system_secret,
+                lable_AOACAG_map,
+                filename='resources/cso-attacker/pruned-AO-ACAG',
+                render=False
+            )
+            print("绘制pruned AO-ACAG完整图")
+            renderer.submit(graph_pruned_AO_ACAG_system, "resources/cso-attacker/pruned-AO-ACAG")
+            renderer.submit(graph_pruned_AO_ACAG_system, "resources/cso-attacker/pruned-AO-ACAG_pdf", 'pdf')
+            #8. 生成简略的可放在论文中的图
+            #8.1 生成简略的ACAG图
+            simplified_ACAG_graph,simplified_ACAG_ye_map=GraphSimplyfier.draw_simplified_ACAG_graph(
+                transition_ACAG_system,
+                initial_env_state,
+                assumption.state_system_secret,
+                labled_unobservable_reachable_supervisor,
+                labled_unobservable_reachable_attacker,
+                assumption.event_supervisor_observable,
+                assumption.event_attacker_observable,
+                filename='resources/cso-attacker/simplified-ACAG',
+                render=False
+            )
+            renderer.submit(simplified_ACAG_graph, "resources/cso-attacker/simplified-ACAG")
+            renderer.submit(simplified_ACAG_graph, "resources/cso-attacker/simplified-ACAG_pdf", 'pdf')
+            print("生成简略的ACAG图")
+            #8.2 生成简略的AO-ACAG图
+            simplified_AO_ACAG_graph,simplified_AO_ACAG_qe_map=GraphSimplyfier.draw_simplified_AO_ACAG_graph(
+                all_transition_AO_ACAG_system,
+                intial_AO_env_state,
+                lable_ACAG_map,
+                assumption.state_system_secret,
+                filename='resources/cso-attacker/simplified-AO-ACAG',
+                render=False
+            )
+            renderer.submit(simplified_AO_ACAG_graph, "resources/cso-attacker/simplified-AO-ACAG")
+            renderer.submit(simplified_AO_ACAG_graph, "resources/cso-attacker/simplified-AO-ACAG_pdf", 'pdf')
+            print("生成简略的AO-ACAG图")
+            #8.3 生成带成功值的pruned AO-ACAG图
+            marked_SCC_pruned_AO_ACAG_graph,_=AttackerGenerator.draw_purned_AO_ACAG_graph_marked_SCC(
+                all_transition_pruned_AO_ACAG_system,
+                lable_ACAG_map,
+                assumption.state_system_secret,
+                lable_AOACAG_map,
+                filename='resources/cso-attacker/marked-SCC-pruned-AO-ACAG',
+                render=False,
+                scc_result=SCC_result
+            )
+            renderer.submit(marked_SCC_pruned_AO_ACAG_graph, "resources/cso-attacker/marked-SCC-pruned-AO-ACAG")
+            renderer.submit(marked_SCC_pruned_AO_ACAG_graph, "resources/cso-attacker/marked-SCC-pruned-AO-ACAG_pdf", 'pdf')
+            print("生成标记SCC的pruned AO-ACAG图")
+            profiler.end()
         app_logger.info("所有的pruned ACAG SCC:")
         for scc,nodes in all_SCC.items():
-            app_logger.info(f'{scc}: {nodes}')
\ No newline at end of file
+            app_logger.info('%s: %s', scc, nodes)
+        #9. 等待所有图渲染完成，日志写盘
+        if draw:
+            profiler.begin('render')
+            outputs, failures = renderer.wait()
+            profiler.end(outputs=len(outputs), failures=len(failures))
+        app_logger.flush()
+        return {
+            "closed_loop": closed_loop_automaton,
+            "language_closed_loop": language_closed_loop_system,
+            "observer_supervisor": unobservable_reachable_supervisor,
+            "observer_attacker": unobservable_reachable_attacker,
+            "ACAG": transition_ACAG_system,
+            "initial_env_state": initial_env_state,
+            "lable_ACAG_map": lable_ACAG_map,
+            "AO_ACAG": all_transition_AO_ACAG_system,
+            "initial_AO_state": intial_AO_env_state,
+            "lable_AOACAG_map": lable_AOACAG_map,
+            "pruned_AO_ACAG": all_transition_pruned_AO_ACAG_system,
+            "SCC": all_SCC,
+            "active_attacker": active_attacker,
+            "profile": profiler.report() if report_profile else None,
+        }
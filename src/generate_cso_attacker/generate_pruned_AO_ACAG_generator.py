@@ -1,4 +1,9 @@
 import graphviz
+try:
+    import numpy as np
+except ImportError:  # numpy 为可选依赖，只有在 CSR 图上剪枝时才需要
+    np = None
+from .mapped_graph import KIND_ATTACK, KIND_EXPOSED
 
 class PrunedAOACAGSystemCreater:
     @staticmethod
@@ -6,38 +11,34 @@ class PrunedAOACAGSystemCreater:
         """
          Pruning AO-ACAG 算法
         """
-        # 1. 初始化 YP = YQ
-        pruned_trans = ao_transitions.copy()
-
-        # 2. 删除所有攻击暴露的 AO-states (即指向 AX 的转移)
-        keys_to_delete = [k for k, v in pruned_trans.items() if v == 'AX']
-        for k in keys_to_delete:
-            del pruned_trans[k]
-
-        # 3. 递归删除无输出的攻击 AO-状态 qa
-        while True:
-            changed = False
-            all_qas = {k[0] for k in pruned_trans.keys()}
-            
-            # 统计哪些 Qa 还有合法的出边 (指向 Qe')
-            qa_with_outputs = {k[0] for k, v in pruned_trans.items() if v != 'AX'}
-            
-            # 找出死掉的 Qa (没有任何 t_sigma 能通往合法的 Qe')
-            dead_qas = all_qas - qa_with_outputs
-
-            if not dead_qas:
-                break
-
-            for q_a in dead_qas:
-                target_edges = [k for k, v in pruned_trans.items() if v == q_a]
-                if target_edges:
-                    for k in target_edges:
-                        del pruned_trans[k]
-                    changed = True
-            
-            if not changed:
-                break
+        # 初始化 YP = YQ，同时删除所有攻击暴露的 AO-states (即指向 AX 的转移)。
+        # 转移的目标总是 Qe' 或 'AX'，从不是 Qa，Qe -> Qa 的环境边也不单独存储，
+        # 因此全部出边都指向 AX 的 Qa 随之从结果中消失，不需要再逐轮删除死节点
+        pruned_trans = {k: v for k, v in ao_transitions.items() if v != 'AX'}
+
         return pruned_trans, q0_tags
+
+    @staticmethod
+    def prune_mapped_AO_ACAG(graph):
+        """
+        在 write_AO_ACAG 写出的 MappedGraph 上剪枝，不还原字典。
+        与 generate_pruned_AO_ACAG_transition 的语义一致：删除指向 AX 的边；
+        CSR 中 Qe -> Qa 的环境边是显式存储的，因此没有合法出边的 Qa 还需删除指向它的环境边。
+        Qe 不会因此失去出边以外的任何东西（Qe 不是剪枝对象），删除不会继续传播，一轮即可。
+        :return: 布尔边掩码，True 为剪枝后保留的边；graph.AO_transitions(mask) 可还原 pruned AO-ACAG
+        """
+        if np is None:
+            raise ImportError("在 CSR 图上剪枝需要 numpy，请先安装 numpy")
+        kinds = np.asarray(graph.kinds)
+        targets = np.asarray(graph.targets)
+        sources = graph.edge_sources()
+        from_attack = kinds[sources] == KIND_ATTACK
+
+        live = kinds[targets] != KIND_EXPOSED
+        live_count = np.bincount(sources[from_attack & live], minlength=graph.n_nodes)
+        dead = (kinds == KIND_ATTACK) & (live_count == 0)
+        live &= ~dead[targets]
+        return live
     
     @staticmethod
     def draw_pruned_AO_ACAG_graph(pruned_transitions, 
@@ -45,7 +46,8 @@ class PrunedAOACAGSystemCreater:
                                 lable_ACAG_map,
                                 secret_states,
                                 qe_map, # 新增参数：传入 draw_AO_ACAG_graph 返回的编号映射
-                                filename):
+                                filename,
+                                render=True):
         """
         绘制 Pruned AO-ACAG 图
         """
@@ -142,10 +144,11 @@ class PrunedAOACAGSystemCreater:
                     style='dashed', color='#2563EB', fontcolor='#2563EB', arrowsize='0.7')
 
         # --- 3. 渲染 ---
-        try:
-            dot.render(filename, cleanup=True)
-            print(f"Success: Pruned AO-ACAG graph saved to {filename}")
-        except Exception as e:
-            print(f"Error rendering graph: {e}")
+        if render:
+            try:
+                dot.render(filename, cleanup=True)
+                print(f"Success: Pruned AO-ACAG graph saved to {filename}")
+            except Exception as e:
+                print(f"Error rendering graph: {e}")
             
         return dot
\ No newline at end of file
@@ -0,0 +1,286 @@
+import json
+import struct
+from pathlib import Path
+from .state_interning import Interner
+try:
+    import numpy as np
+except ImportError:  # numpy 为可选依赖，只有读写 CSR 文件时才需要
+    np = None
+
+"""
+ACAG / AO-ACAG 的内存映射二进制格式（CSR）：
+图写出一次后用 numpy.memmap 打开，剪枝与 SCC 分析直接在整数数组上进行，不必还原成以嵌套元组为键的字典。
+文件布局（小端，各段按 8 字节对齐）：
+    MAGIC(8) | <Q 头部长度 | JSON 头部 | 数据段
+    数据段:  offsets   int64[n + 1]   节点 u 的出边为 [offsets[u], offsets[u + 1])
+             targets   uint32[m]      出边目标节点 id
+             labels    uint32[m]      出边事件 id，对应头部中的事件表 labels
+             kinds     uint8[n]       节点类别（KIND_ENV / KIND_ATTACK / KIND_EXPOSED）
+             node_offsets int64[n + 1] 与 nodes 段配合，第 i 个节点取值为 nodes[node_offsets[i]:node_offsets[i + 1]]
+             nodes     bytes          节点的规范 JSON 编码（UTF-8），见 encode_node；
+                                      读取时只做 JSON 解析，打开来源不明的文件不会执行任何代码
+节点 id 按写出时首次出现的顺序分配，每个节点的出边保持原转移的插入顺序。
+AO-ACAG 写成二部图：Qe --o_sigma--> Qa=(Qe, o_sigma) --t_sigma--> Qe' / 'AX'，
+ACAG 直接按 {(src, label): dst} 写出，Ye / Ya 分别记为 KIND_ENV / KIND_ATTACK。
+"""
+
+MAGIC = b'CSOG\x02\x00\x00\x00'
+FORMAT_VERSION = 2
+_HEADER_LENGTH = struct.Struct('<Q')
+
+KIND_ENV = 0        # Ye / Qe
+KIND_ATTACK = 1     # Ya / Qa
+KIND_EXPOSED = 2    # AX
+
+_SECTIONS = (
+    ('offsets', '<i8'),
+    ('targets', '<u4'),
+    ('labels', '<u4'),
+    ('kinds', 'u1'),
+    ('node_offsets', '<i8'),
+    ('nodes', 'u1'),
+)
+
+
+def _align(n):
+    return (n + 7) & ~7
+
+
+def _to_json(node):
+    # 元组记为列表，frozenset 记为 {"f": [...]}，元素按编码排序，同一节点总得到同一字节串
+    if isinstance(node, tuple):
+        return [_to_json(e) for e in node]
+    if isinstance(node, frozenset):
+        return {'f': sorted((_to_json(e) for e in node),
+                            key=lambda e: json.dumps(e, ensure_ascii=False, separators=(',', ':')))}
+    if node is None or isinstance(node, (str, int, float, bool)):
+        return node
+    raise TypeError(f"CSR 图节点不支持的类型: {type(node).__name__}")
+
+
+def _from_json(value):
+    if isinstance(value, list):
+        return tuple(_from_json(e) for e in value)
+    if isinstance(value, dict):
+        return frozenset(_from_json(e) for e in value['f'])
+    return value
+
+
+def encode_node(node):
+    """
+    节点（嵌套的元组 / frozenset / 标量）-> 规范 JSON 字节串
+    """
+    return json.dumps(_to_json(node), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def decode_node(data):
+    return _from_json(json.loads(data.decode('utf-8')))
+
+
+def write_mapped_graph(path, edges, kinds, graph=''):
+    """
+    :param edges: 按顺序产生 (src, label, dst) 的迭代器
+    :param kinds: {node: 类别}，未列出的节点记为 KIND_ENV
+    :return: (节点数, 转移数)
+    """
+    if np is None:
+        raise ImportError("CSR 图文件需要 numpy，请先安装 numpy")
+
+    nodes, labels = Interner(), Interner()
+    sources, label_ids, targets = [], [], []
+    for src, label, dst in edges:
+        sources.append(nodes.intern(src))
+        label_ids.append(labels.intern(label))
+        targets.append(nodes.intern(dst))
+
+    n_nodes = len(nodes)
+    sources = np.asarray(sources, dtype=np.int64)
+    # 稳定排序：同一源节点的出边保持原顺序
+    order = np.argsort(sources, kind='stable')
+    offsets = np.zeros(n_nodes + 1, dtype='<i8')
+    np.cumsum(np.bincount(sources, minlength=n_nodes), out=offsets[1:])
+    blobs = [encode_node(node) for node in nodes]
+    node_offsets = np.zeros(n_nodes + 1, dtype='<i8')
+    np.cumsum([len(b) for b in blobs], out=node_offsets[1:])
+
+    arrays = {
+        'offsets': offsets,
+        'targets': np.asarray(targets, dtype='<u4')[order],
+        'labels': np.asarray(label_ids, dtype='<u4')[order],
+        'kinds': np.asarray([kinds.get(node, KIND_ENV) for node in nodes], dtype='u1'),
+        'node_offsets': node_offsets,
+        'nodes': np.frombuffer(b''.join(blobs), dtype='u1'),
+    }
+    sections, position = {}, 0
+    for name, _ in _SECTIONS:
+        sections[name] = [position, int(arrays[name].size)]
+        position = _align(position + arrays[name].nbytes)
+    header = json.dumps({
+        'version': FORMAT_VERSION,
+        'graph': graph,
+        'n_nodes': n_nodes,
+        'n_edges': len(sources),
+        'labels': list(labels),
+        'sections': sections,
+    }, ensure_ascii=False).encode('utf-8')
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data_start = _align(len(MAGIC) + _HEADER_LENGTH.size + len(header))
+    with open(path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(_HEADER_LENGTH.pack(len(header)))
+        f.write(header)
+        for name, _ in _SECTIONS:
+            f.seek(data_start + sections[name][0])
+            f.write(arrays[name].tobytes())
+        f.truncate(data_start + position)
+    return n_nodes, len(sources)
+
+
+def write_ACAG(path, transitions, graph='ACAG'):
+    """
+    ACAG 转移 {(Ye / Ya, label): Ye / Ya} 写成 CSR 文件
+    """
+    kinds = {}
+
+    def edges():
+        for (src, label), dst in transitions.items():
+            for node in (src, dst):
+                kinds[node] = KIND_ENV if len(node) == 4 else KIND_ATTACK
+            yield src, label, dst
+    return write_mapped_graph(path, edges(), kinds, graph)
+
+
+def write_AO_ACAG(path, ao_transitions, graph='AO-ACAG'):
+    """
+    AO-ACAG（或 pruned AO-ACAG）转移 {((Qe, o_sigma), t_sigma): Qe' / 'AX'} 写成二部图 CSR 文件
+    """
+    kinds = {}
+
+    def edges():
+        env_edges = set()
+        for (q_a, t_sigma), target in ao_transitions.items():
+            if q_a not in env_edges:
+                env_edges.add(q_a)
+                yield q_a[0], q_a[1], q_a
+            yield q_a, t_sigma, target
+            kinds[q_a] = KIND_ATTACK
+            if target == 'AX':
+                kinds[target] = KIND_EXPOSED
+    return write_mapped_graph(path, edges(), kinds, graph)
+
+
+class MappedGraph:
+    """
+    用法：
+        with MappedGraph('out/AO-ACAG.csr') as graph:
+            targets = graph.successors(u)
+            node = graph.node(u)
+    数组段都是只读的 numpy.memmap 视图，节点取值只在 node(i) 时按需解码。
+    """
+    __slots__ = ('path', 'header', 'graph', 'n_nodes', 'n_edges', 'label_table',
+                 'offsets', 'targets', 'labels', 'kinds', '_buffer', '_node_offsets', '_nodes', '_ids')
+
+    def __init__(self, path):
+        if np is None:
+            raise ImportError("CSR 图文件需要 numpy，请先安装 numpy")
+
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"不是 CSR 图文件: {path}")
+            (length,) = _HEADER_LENGTH.unpack(f.read(_HEADER_LENGTH.size))
+            self.header = json.loads(f.read(length).decode('utf-8'))
+        if self.header.get('version') != FORMAT_VERSION:
+            raise ValueError(f"CSR 图文件版本 {self.header.get('version')} 与当前版本 {FORMAT_VERSION} 不符: {path}")
+        self.graph = self.header['graph']
+        self.n_nodes = self.header['n_nodes']
+        self.n_edges = self.header['n_edges']
+        self.label_table = self.header['labels']
+
+        self._buffer = np.memmap(self.path, dtype='u1', mode='r')
+        data_start = _align(len(MAGIC) + _HEADER_LENGTH.size + length)
+        views = {}
+        for name, dtype in _SECTIONS:
+            start, size = self.header['sections'][name]
+            start += data_start
+            dtype = np.dtype(dtype)
+            views[name] = self._buffer[start:start + size * dtype.itemsize].view(dtype)
+        self.offsets = views['offsets']
+        self.targets = views['targets']
+        self.labels = views['labels']
+        self.kinds = views['kinds']
+        self._node_offsets = views['node_offsets']
+        self._nodes = views['nodes']
+        self._ids = None
+
+    def _node_bytes(self, node_id):
+        start, end = self._node_offsets[node_id], self._node_offsets[node_id + 1]
+        return self._nodes[start:end].tobytes()
+
+    def node(self, node_id):
+        return decode_node(self._node_bytes(node_id))
+
+    def node_id(self, node):
+        """
+        节点取值 -> id；编码是规范的，首次调用时按编码字节串建立索引，不解码任何节点
+        """
+        if self._ids is None:
+            self._ids = {self._node_bytes(i): i for i in range(self.n_nodes)}
+        return self._ids[encode_node(node)]
+
+    def label(self, label_id):
+        return self.label_table[label_id]
+
+    def successors(self, node_id):
+        return self.targets[self.offsets[node_id]:self.offsets[node_id + 1]]
+
+    def out_edges(self, node_id):
+        """
+        :return: (事件 id 数组, 目标 id 数组)
+        """
+        start, end = self.offsets[node_id], self.offsets[node_id + 1]
+        return self.labels[start:end], self.targets[start:end]
+
+    def edge_sources(self):
+        """
+        每条边的源节点 id（与 targets / labels 对齐）
+        """
+        return np.repeat(np.arange(self.n_nodes, dtype=np.int64), np.diff(self.offsets))
+
+    def transitions(self, edge_mask=None):
+        """
+        还原为 {(src, label): dst} 字典；edge_mask 为布尔数组时只还原其中为 True 的边
+        """
+        sources = self.edge_sources()
+        selected = range(self.n_edges) if edge_mask is None else np.flatnonzero(edge_mask).tolist()
+        nodes = {}
+
+        def node(i):
+            if i not in nodes:
+                nodes[i] = self.node(i)
+            return nodes[i]
+        return {(node(int(sources[e])), self.label_table[self.labels[e]]): node(int(self.targets[e]))
+                for e in selected}
+
+    def AO_transitions(self, edge_mask=None):
+        """
+        AO-ACAG 文件还原为 {((Qe, o_sigma), t_sigma): Qe' / 'AX'}：只取 Qa 出发的边
+        """
+        attack_edges = self.kinds[self.edge_sources()] == KIND_ATTACK
+        return self.transitions(attack_edges if edge_mask is None else attack_edges & edge_mask)
+
+    def close(self):
+        self._buffer._mmap.close()
+
+    def __len__(self):
+        return self.n_edges
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
@@ -0,0 +1,334 @@
+import random
+from collections import deque
+from .system_DFA_basic import SystemAssumptions
+
+"""
+合成 DES 模型生成器：按随机种子生成可复现的物理系统与监督器，用于测量流水线随规模的变化。
+- 物理系统结构：chain（带回边的链）、grid（环面网格）、product（多个小组件的同步积）、random（随机图）
+- 监督器：permissive（单状态全允许）、counter（多状态，在部分状态禁止部分可控事件）
+- 事件划分：可观 / 不可观事件数，以及攻击者可观、监督器可观、可控、脆弱、可篡改事件的比例均可调
+同一组参数与种子总是生成同一个模型（状态、事件均为 int / str，可经 to_dict 写成 JSON）。
+"""
+
+
+def _pick(rng, pool, ratio):
+    """
+    从 pool 中按比例抽取子集：ratio 为 0 时为空集，否则至少抽一个
+    """
+    pool = sorted(pool)
+    if ratio <= 0 or not pool:
+        return set()
+    count = min(len(pool), max(1, round(ratio * len(pool))))
+    return set(rng.sample(pool, count))
+
+
+# 事件划分
+def event_partition(n_observable=3, n_unobservable=1, attacker_observable=1.0, supervisor_observable=1.0,
+                    controllable=0.3, vulnerable=0.5, alterable=0.5, erase=True, seed=0):
+    """
+    事件命名为 o1..o{n_observable}（可观）、uo1..uo{n_unobservable}（不可观）及 'empty'。
+    - attacker_observable / supervisor_observable: 可观事件中分别被攻击者 / 监督器观测的比例
+    - controllable: 全部事件（不含 'empty'）中可控事件的比例
+    - vulnerable: 攻击者与监督器都能观测的事件中脆弱事件的比例
+    - alterable: 监督器可观事件中可篡改事件的比例，脆弱事件总是可篡改；erase 为 True 时 'empty' 也可篡改（擦除）
+    :return: 以 SystemAssumptions 构造参数命名的事件集合字典
+    """
+    rng = random.Random(seed)
+    observable = [f"o{i}" for i in range(1, n_observable + 1)]
+    unobservable = [f"uo{i}" for i in range(1, n_unobservable + 1)]
+
+    event_attacker_observable = _pick(rng, observable, attacker_observable)
+    event_supervisor_observable = _pick(rng, observable, supervisor_observable)
+    event_vulnerable = _pick(rng, event_attacker_observable & event_supervisor_observable, vulnerable)
+    event_alterable = _pick(rng, event_supervisor_observable, alterable) | event_vulnerable
+    if erase:
+        event_alterable.add("empty")
+    return {
+        "event_system": set(observable + unobservable + ["empty"]),
+        "event_attacker_observable": event_attacker_observable,
+        "event_supervisor_observable": event_supervisor_observable,
+        "event_supervisor_controllable": _pick(rng, observable + unobservable, controllable),
+        "event_vulnerable": event_vulnerable,
+        "event_alterable": event_alterable,
+    }
+
+
+def _plant_events(events):
+    """
+    物理系统可发生的事件（'empty' 只用于篡改，不出现在物理系统中），按名字排序保证可复现
+    """
+    return sorted(e for e in events["event_system"] if e != "empty")
+
+
+# 物理系统
+def chain_plant(n_states, events, rng, branch_ratio=0.2):
+    """
+    状态 0..n-1 依次相连，最后一个状态回到 0；每个状态以 branch_ratio 的概率附加一条随机分支
+    :return: (状态集合, 初始状态集合, 转移字典)
+    """
+    alphabet = _plant_events(events)
+    transitions = {}
+    for x in range(n_states):
+        transitions[(x, alphabet[x % len(alphabet)])] = (x + 1) % n_states
+        if rng.random() < branch_ratio:
+            sigma = rng.choice(alphabet)
+            transitions.setdefault((x, sigma), rng.randrange(n_states))
+    return set(range(n_states)), {0}, transitions
+
+
+def grid_plant(rows, cols, events, rng, branch_ratio=0.0):
+    """
+    rows x cols 的环面网格，状态编号 r * cols + c；向右、向下各一条转移，事件随位置轮换，
+    branch_ratio 控制附加的随机跳转
+    """
+    alphabet = _plant_events(events)
+    if len(alphabet) < 2:
+        raise ValueError("grid_plant 至少需要两个物理事件")
+    transitions = {}
+    for r in range(rows):
+        for c in range(cols):
+            x = r * cols + c
+            k = (r + c) % len(alphabet)
+            transitions[(x, alphabet[k])] = r * cols + (c + 1) % cols
+            transitions[(x, alphabet[(k + 1) % len(alphabet)])] = ((r + 1) % rows) * cols + c
+            if rng.random() < branch_ratio:
+                transitions.setdefault((x, rng.choice(alphabet)), rng.randrange(rows * cols))
+    return set(range(rows * cols)), {0}, transitions
+
+
+def random_plant(n_states, events, rng, out_degree=2):
+    """
+    随机图：先按随机排列连成一个环保证所有状态可达，再为每个状态补足 out_degree 条随机转移
+    """
+    alphabet = _plant_events(events)
+    order = list(range(n_states))
+    rng.shuffle(order)
+    order.remove(0)
+    order.insert(0, 0)
+    transitions = {}
+    for i, x in enumerate(order):
+        transitions[(x, rng.choice(alphabet))] = order[(i + 1) % n_states]
+    for x in range(n_states):
+        free = [e for e in alphabet if (x, e) not in transitions]
+        rng.shuffle(free)
+        for sigma in free[:max(0, out_degree - 1)]:
+            transitions[(x, sigma)] = rng.randrange(n_states)
+    return set(range(n_states)), {0}, transitions
+
+
+def product_plant(component_sizes, events, rng, shared_ratio=0.3, branch_ratio=0.2):
+    """
+    多个小组件的同步积：先给每个组件分一个独占事件（保证各组件都能单独移动），
+    其余事件随机分给一个组件，再以 shared_ratio 的概率共享给另一个组件；
+    每个组件在每个状态都允许其全部事件（第 k 个事件前进 k + 1 步），再以 branch_ratio 的概率把一条转移改为随机跳转；
+    共享事件需所有相关组件同时允许，积状态数随组件规模相乘增长。
+    从初始状态做 BFS，积状态按发现顺序编号为 int。
+    """
+    alphabet = _plant_events(events)
+    n_components = len(component_sizes)
+    owners = {}
+    shuffled = list(alphabet)
+    rng.shuffle(shuffled)
+    for i, e in enumerate(shuffled):
+        if i < n_components:
+            owners[e] = {i}
+            continue
+        owner = rng.randrange(n_components)
+        owners[e] = {owner}
+        if n_components > 1 and rng.random() < shared_ratio:
+            owners[e].add(rng.choice([i for i in range(n_components) if i != owner]))
+
+    components = []
+    for i, size in enumerate(component_sizes):
+        local = [e for e in alphabet if i in owners[e]]
+        if not local:
+            # 没有分到事件的组件借用一个事件，避免其成为无法移动的常量
+            local = [alphabet[i % len(alphabet)]]
+            owners[local[0]].add(i)
+        delta = {}
+        for x in range(size):
+            for k, e in enumerate(local):
+                delta[(x, e)] = (x + k + 1) % size
+            if rng.random() < branch_ratio:
+                delta[(x, rng.choice(local))] = rng.randrange(size)
+        components.append(delta)
+
+    initial = (0,) * n_components
+    ids = {initial: 0}
+    queue = deque([initial])
+    transitions = {}
+    while queue:
+        state = queue.popleft()
+        for e in alphabet:
+            nxt = list(state)
+            for i in owners[e]:
+                target = components[i].get((state[i], e))
+                if target is None:
+                    break
+                nxt[i] = target
+            else:
+                nxt = tuple(nxt)
+                if nxt not in ids:
+                    ids[nxt] = len(ids)
+                    queue.append(nxt)
+                transitions[(ids[state], e)] = ids[nxt]
+    return set(ids.values()), {0}, transitions
+
+
+# 监督器
+def permissive_supervisor(events):
+    """
+    单状态、允许所有事件的监督器
+    """
+    return {0}, {0}, {(0, e): 0 for e in sorted(events["event_system"])}
+
+
+def counter_supervisor(n_states, events, rng, disable_ratio=0.3):
+    """
+    n_states 个状态的监督器：监督器可观事件随机转到某个状态，不可观事件自环；
+    每个状态以 disable_ratio 的概率禁止每个可控事件（状态 0 不禁止，保证初始时不阻塞）
+    """
+    transitions = {}
+    for z in range(n_states):
+        for e in sorted(events["event_system"]):
+            if z and e in events["event_supervisor_controllable"] and rng.random() < disable_ratio:
+                continue
+            if e in events["event_supervisor_observable"]:
+                transitions[(z, e)] = rng.randrange(n_states)
+            else:
+                transitions[(z, e)] = z
+    return set(range(n_states)), {0}, transitions
+
+
+PLANTS = {
+    "chain": lambda size, events, rng, options: chain_plant(size, events, rng, **options),
+    "grid": lambda size, events, rng, options: grid_plant(*(size if isinstance(size, (tuple, list))
+                                                           else (size, size)), events, rng, **options),
+    "random": lambda size, events, rng, options: random_plant(size, events, rng, **options),
+    "product": lambda size, events, rng, options: product_plant(size, events, rng, **options),
+}
+
+
+def closed_loop_distances(initial, transitions, supervisor_initial, supervisor_transitions):
+    """
+    受控系统（物理系统 × 监督器）中从初始状态出发的 BFS 步数，按物理状态取最小值；
+    被监督器阻断而不可达的物理状态不出现
+    """
+    enabled = {}
+    for (x, e), y in transitions.items():
+        enabled.setdefault(x, []).append((e, y))
+    start = [(z, x) for z in supervisor_initial for x in initial]
+    seen = dict.fromkeys(start, 0)
+    distance = dict.fromkeys(initial, 0)
+    queue = deque(start)
+    while queue:
+        z, x = queue.popleft()
+        for e, y in enabled.get(x, ()):
+            z_next = supervisor_transitions.get((z, e))
+            if z_next is None or (z_next, y) in seen:
+                continue
+            d = seen[(z_next, y)] = seen[(z, x)] + 1
+            distance.setdefault(y, d)
+            queue.append((z_next, y))
+    return distance
+
+
+def generate_model(family, size, n_supervisor_states=1, seed=0, secret_ratio=0.1, partition=None,
+                   plant_options=None, disable_ratio=0.3, secret_distance=None):
+    """
+    :param family: 'chain' / 'grid' / 'random' / 'product'
+    :param size: chain / random 为状态数；grid 为边长或 (rows, cols)；product 为各组件状态数的列表
+    :param n_supervisor_states: 1 时使用 permissive_supervisor，否则使用 counter_supervisor
+    :param secret_ratio: 秘密状态占物理系统状态的比例（至少一个，不含初始状态）
+    :param secret_distance: 秘密状态在受控系统中与初始状态的最小 BFS 步数，默认为可达状态最大步数的一半（至少 1）；
+                            秘密状态离初始状态太近时攻击在前几步就结束，图规模不随模型规模增长
+    :param partition: 传给 event_partition 的参数字典
+    :param plant_options: 传给物理系统生成函数的额外参数（branch_ratio、out_degree、shared_ratio 等）
+    :return: SystemAssumptions
+    """
+    if family not in PLANTS:
+        raise ValueError(f"未知的模型结构: {family}，可选 {sorted(PLANTS)}")
+    rng = random.Random(f"{family}:{size}:{n_supervisor_states}:{seed}")
+    events = event_partition(seed=seed, **(partition or {}))
+    states, initial, transitions = PLANTS[family](size, events, rng, plant_options or {})
+    if n_supervisor_states <= 1:
+        supervisor_states, supervisor_initial, supervisor_transitions = permissive_supervisor(events)
+    else:
+        supervisor_states, supervisor_initial, supervisor_transitions = counter_supervisor(
+            n_supervisor_states, events, rng, disable_ratio)
+
+    distance = closed_loop_distances(initial, transitions, supervisor_initial, supervisor_transitions)
+    depth = max(distance.values())
+    if secret_distance is None:
+        secret_distance = max(1, (depth + 1) // 2)
+    # 只在足够远的可达状态中抽取；没有满足条件的状态时退而取最远的一层
+    candidates = (sorted(x for x, d in distance.items() if d >= min(secret_distance, depth))
+                  or sorted(states))
+    n_secret = min(len(candidates), max(1, round(secret_ratio * len(states))))
+    return SystemAssumptions(
+        state_oringin_system=states,
+        state_supervisor=supervisor_states,
+        state_initial_origin_ststem=initial,
+        state_initial_supervisor=supervisor_initial,
+        state_system_secret=set(rng.sample(candidates, n_secret)),
+        transition_origin_system=transitions,
+        transition_supervisor=supervisor_transitions,
+        **events,
+    )
+
+
+# 环形物理系统 + 单状态全允许监督器（早期基准测试使用的固定模型）
+def ring_assumption(n_states, seed=0, chord_ratio=0.3):
+    """
+    生成 n_states 个状态的环形物理系统：状态 x 经可观事件 o_{x%3} 转移到 x+1，
+    并以 chord_ratio 的概率附加一条随机弦（可能为不可观事件）。
+    监督器只有一个状态且允许所有事件，因此闭环系统规模与物理系统一致。
+    """
+    rng = random.Random(seed)
+    event_observable = ["o1", "o2", "o3"]
+    event_unobservable = ["uo1"]
+    event_system = set(event_observable + event_unobservable + ["empty"])
+
+    transition_origin_system = {}
+    for x in range(n_states):
+        transition_origin_system[(x, event_observable[x % 3])] = (x + 1) % n_states
+        if rng.random() < chord_ratio:
+            sigma = rng.choice(event_observable + event_unobservable)
+            transition_origin_system[(x, sigma)] = rng.randrange(n_states)
+
+    transition_supervisor = {(0, e): 0 for e in event_system}
+
+    return SystemAssumptions(
+        state_oringin_system=set(range(n_states)),
+        state_supervisor={0},
+        state_initial_origin_ststem={0},
+        state_initial_supervisor={0},
+        state_system_secret={n_states - 1},
+        event_system=event_system,
+        event_attacker_observable=set(event_observable),
+        event_supervisor_observable=set(event_observable),
+        event_supervisor_controllable={"o3"},
+        event_vulnerable={"o2"},
+        event_alterable={"o2", "o3"},
+        transition_origin_system=transition_origin_system,
+        transition_supervisor=transition_supervisor,
+    )
+
+
+# 环形物理系统 + 计数型监督器
+def product_assumption(n_states, n_supervisor_states, seed=0, chord_ratio=0.3):
+    """
+    物理系统与 ring_assumption 相同；监督器有 n_supervisor_states 个状态，
+    每发生一次 o1 计数加一，并在计数为奇数时禁止弦上的不可观事件 uo1。
+    闭环系统规模最多为 n_states * n_supervisor_states。
+    """
+    assumption = ring_assumption(n_states, seed, chord_ratio)
+    transition_supervisor = {}
+    for z in range(n_supervisor_states):
+        for e in assumption.event_system:
+            if e == "uo1" and z % 2 == 1:
+                continue
+            transition_supervisor[(z, e)] = (z + 1) % n_supervisor_states if e == "o1" else z
+    assumption.state_supervisor = set(range(n_supervisor_states))
+    assumption.transition_supervisor = transition_supervisor
+    return assumption
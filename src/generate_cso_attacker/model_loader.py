@@ -0,0 +1,290 @@
+import argparse
+import json
+import struct
+import sys
+import time
+from array import array
+from pathlib import Path
+from .system_DFA_basic import SystemAssumptions
+from .transition_index import TransitionIndex
+from .state_interning import Interner
+from .stage_cache import fingerprint
+
+"""
+从外部文件加载 SystemAssumptions，转移逐条解析后直接写入 TransitionIndex（同时得到转移字典与邻接表），
+不经过巨大的 Python 字典字面量。支持的格式（fmt 为 None 时按后缀判断）：
+- json  (.json):  SystemAssumptions.to_dict() 的整体 JSON
+- jsonl (.jsonl): 首行为集合字段的 JSON 对象，之后每行一条转移 ["p" | "s", state, event, next_state]，
+                  p 为物理系统、s 为监督器；首行若已含转移字段则视为一个完整的 to_dict() 模型
+- text  (.des):   紧凑文本格式，# 之后为注释：
+                      secret 5                 集合字段：字段短名后跟元素（见 TEXT_FIELDS）
+                      plant                    之后每行 "state event next_state" 为物理系统转移
+                      supervisor               之后每行为监督器转移
+                  由纯数字组成的状态解析为 int，其余为 str；未给出 states / supervisor_states 时由转移推出
+- binary (.desb): MAGIC + <I 长度> + JSON 头（集合字段、状态表、事件表、转移条数）
+                  + 物理系统与监督器的 <I 三元组数组 (state_id, event_id, next_id)，用于快速重新加载
+"""
+
+BINARY_MAGIC = b'CSOM\x01'
+_LENGTH = struct.Struct('<I')
+# 三元组 (state_id, event_id, next_id) 按小端 uint32 存放；array('I') 的宽度随平台而定，
+# 这里要求它恰好是 4 字节，否则读写的字节数与 _TRIPLE 对不上
+_TRIPLE = struct.Struct('<III')
+if array('I').itemsize != 4:
+    raise ImportError("二进制模型格式要求 array('I') 为 4 字节")
+
+# 文本格式的字段短名
+TEXT_FIELDS = {
+    'states': 'state_oringin_system',
+    'supervisor_states': 'state_supervisor',
+    'initial': 'state_initial_origin_ststem',
+    'supervisor_initial': 'state_initial_supervisor',
+    'secret': 'state_system_secret',
+    'events': 'event_system',
+    'attacker_observable': 'event_attacker_observable',
+    'supervisor_observable': 'event_supervisor_observable',
+    'controllable': 'event_supervisor_controllable',
+    'vulnerable': 'event_vulnerable',
+    'alterable': 'event_alterable',
+}
+TEXT_SECTIONS = {'plant': 'transition_origin_system', 'supervisor': 'transition_supervisor'}
+SUFFIX_FORMATS = {'.json': 'json', '.jsonl': 'jsonl', '.des': 'text', '.desb': 'binary'}
+
+
+def detect_format(path):
+    suffix = Path(path).suffix
+    if suffix not in SUFFIX_FORMATS:
+        raise ValueError(f"无法从后缀判断模型格式: {path}，可选后缀 {sorted(SUFFIX_FORMATS)}")
+    return SUFFIX_FORMATS[suffix]
+
+
+def _hashable(value):
+    return tuple(_hashable(v) for v in value) if isinstance(value, list) else value
+
+
+def _parse_token(token):
+    return int(token) if token.lstrip('-').isdigit() else token
+
+
+def model_fingerprint(assumption):
+    """
+    模型指纹：与集合迭代顺序、转移插入顺序及文件格式无关，同一模型的各种格式得到同一指纹
+    """
+    return fingerprint('model', *(getattr(assumption, name) for name in
+                                  SystemAssumptions.SET_FIELDS + SystemAssumptions.TRANSITION_FIELDS))
+
+
+def _build(sets, index_origin_system, index_supervisor):
+    """
+    由集合字段与两份流式建好的索引构造 SystemAssumptions；缺省的状态集合由转移推出
+    """
+    if 'state_oringin_system' not in sets:
+        sets['state_oringin_system'] = (set(index_origin_system.successors)
+                                        | set(index_origin_system.transition.values()))
+    if 'state_supervisor' not in sets:
+        sets['state_supervisor'] = set(index_supervisor.successors) | set(index_supervisor.transition.values())
+    missing = [name for name in SystemAssumptions.SET_FIELDS if name not in sets]
+    if missing:
+        raise ValueError(f"模型缺少字段: {missing}")
+    return SystemAssumptions(
+        transition_origin_system=index_origin_system.transition,
+        transition_supervisor=index_supervisor.transition,
+        index_origin_system=index_origin_system,
+        index_supervisor=index_supervisor,
+        **{name: sets[name] for name in SystemAssumptions.SET_FIELDS},
+    )
+
+
+def _read_sets(data):
+    return {name: {_hashable(v) for v in data[name]} for name in SystemAssumptions.SET_FIELDS if name in data}
+
+
+def _load_dict(data):
+    indexes = (TransitionIndex(), TransitionIndex())
+    for name, index in zip(SystemAssumptions.TRANSITION_FIELDS, indexes):
+        for state, event, next_state in data[name]:
+            index.add(_hashable(state), event, _hashable(next_state))
+    return _build(_read_sets(data), *indexes)
+
+
+def load_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return _load_dict(json.load(f))
+
+
+def load_jsonl(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        header = json.loads(f.readline())
+        if all(name in header for name in SystemAssumptions.TRANSITION_FIELDS):
+            return _load_dict(header)
+        index_origin_system, index_supervisor = TransitionIndex(), TransitionIndex()
+        add = {'p': index_origin_system.add, 's': index_supervisor.add}
+        for line in f:
+            if not line.strip():
+                continue
+            kind, state, event, next_state = json.loads(line)
+            add[kind](_hashable(state), event, _hashable(next_state))
+    return _build(_read_sets(header), index_origin_system, index_supervisor)
+
+
+def load_text(path):
+    sets = {}
+    indexes = {name: TransitionIndex() for name in TEXT_SECTIONS.values()}
+    add = None
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_no, line in enumerate(f, 1):
+            tokens = line.split('#', 1)[0].split()
+            if not tokens:
+                continue
+            head = tokens[0]
+            if len(tokens) == 1 and head in TEXT_SECTIONS:
+                add = indexes[TEXT_SECTIONS[head]].add
+            elif head in TEXT_FIELDS:
+                values = tokens[1:] if TEXT_FIELDS[head].startswith('event') else map(_parse_token, tokens[1:])
+                sets.setdefault(TEXT_FIELDS[head], set()).update(values)
+            elif len(tokens) == 3 and add is not None:
+                add(_parse_token(tokens[0]), tokens[1], _parse_token(tokens[2]))
+            else:
+                raise ValueError(f"{path}:{line_no}: 无法解析的行: {line.rstrip()}")
+    return _build(sets, *(indexes[name] for name in SystemAssumptions.TRANSITION_FIELDS))
+
+
+def load_binary(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    if not data.startswith(BINARY_MAGIC):
+        raise ValueError(f"不是二进制模型文件: {path}")
+    pos = len(BINARY_MAGIC)
+    (length,) = _LENGTH.unpack_from(data, pos)
+    pos += _LENGTH.size
+    header = json.loads(data[pos:pos + length].decode('utf-8'))
+    pos += length
+
+    states = [_hashable(v) for v in header['states']]
+    events = header['events']
+    indexes = []
+    for count in header['counts']:
+        size = _TRIPLE.size * count
+        if pos + size > len(data):
+            raise ValueError(f"二进制模型文件被截断: {path}")
+        triples = array('I')
+        triples.frombytes(data[pos:pos + size])
+        if sys.byteorder != 'little':
+            triples.byteswap()
+        pos += size
+        # 二进制文件由 save_model 写出，(state, event) 不会重复，按列整体还原后一次建索引
+        sources = [states[i] for i in triples[0::3]]
+        labels = [events[i] for i in triples[1::3]]
+        targets = [states[i] for i in triples[2::3]]
+        indexes.append(TransitionIndex(dict(zip(zip(sources, labels), targets))))
+    return _build(_read_sets(header['sets']), *indexes)
+
+
+LOADERS = {'json': load_json, 'jsonl': load_jsonl, 'text': load_text, 'binary': load_binary}
+
+
+def load_model(path, fmt=None, with_fingerprint=True):
+    """
+    :return: (SystemAssumptions, 报告字典)，报告包含格式、转移条数、加载与计算指纹的耗时
+    """
+    fmt = fmt or detect_format(path)
+    if fmt not in LOADERS:
+        raise ValueError(f"未知的模型格式: {fmt}")
+    start = time.perf_counter()
+    assumption = LOADERS[fmt](path)
+    report = {
+        'path': str(path),
+        'format': fmt,
+        'plant_states': len(assumption.state_oringin_system),
+        'plant_transitions': len(assumption.transition_origin_system),
+        'supervisor_transitions': len(assumption.transition_supervisor),
+        'load_seconds': round(time.perf_counter() - start, 6),
+    }
+    if with_fingerprint:
+        start = time.perf_counter()
+        report['fingerprint'] = model_fingerprint(assumption)
+        report['hash_seconds'] = round(time.perf_counter() - start, 6)
+    return assumption, report
+
+
+def _format_token(value, path):
+    token = str(value)
+    if not token or token.split() != [token] or '#' in token or _parse_token(token) != value:
+        raise ValueError(f"{value!r} 无法写成文本格式 {path}，请使用 json / jsonl / binary")
+    return token
+
+
+def save_model(assumption, path, fmt=None):
+    """
+    将 SystemAssumptions 写成任一支持的格式；集合元素按 repr 排序，转移保持插入顺序
+    """
+    fmt = fmt or detect_format(path)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = assumption.to_dict()
+
+    if fmt == 'json':
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+    elif fmt == 'jsonl':
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({name: data[name] for name in SystemAssumptions.SET_FIELDS},
+                               ensure_ascii=False) + '\n')
+            for kind, name in zip('ps', SystemAssumptions.TRANSITION_FIELDS):
+                for row in data[name]:
+                    f.write(json.dumps([kind] + row, ensure_ascii=False) + '\n')
+    elif fmt == 'text':
+        with open(path, 'w', encoding='utf-8') as f:
+            for short, name in TEXT_FIELDS.items():
+                f.write(' '.join([short] + [_format_token(v, path) for v in data[name]]) + '\n')
+            for section, name in TEXT_SECTIONS.items():
+                f.write(section + '\n')
+                for row in data[name]:
+                    f.write(' '.join(_format_token(v, path) for v in row) + '\n')
+    elif fmt == 'binary':
+        states, events = Interner(), Interner()
+        arrays = []
+        for name in SystemAssumptions.TRANSITION_FIELDS:
+            triples = array('I')
+            for (state, event), next_state in getattr(assumption, name).items():
+                triples.extend((states.intern(state), events.intern(event), states.intern(next_state)))
+            if sys.byteorder != 'little':
+                triples.byteswap()
+            arrays.append(triples)
+        header = {
+            'version': 1,
+            'sets': {name: data[name] for name in SystemAssumptions.SET_FIELDS},
+            'states': list(states),
+            'events': list(events),
+            'counts': [len(triples) // 3 for triples in arrays],
+        }
+        blob = json.dumps(header, ensure_ascii=False).encode('utf-8')
+        with open(path, 'wb') as f:
+            f.write(BINARY_MAGIC)
+            f.write(_LENGTH.pack(len(blob)))
+            f.write(blob)
+            for triples in arrays:
+                f.write(triples.tobytes())
+    else:
+        raise ValueError(f"未知的模型格式: {fmt}")
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="加载 / 转换 SystemAssumptions 模型文件")
+    parser.add_argument("model", help="模型文件（.json / .jsonl / .des / .desb）")
+    parser.add_argument("--format", default=None, choices=sorted(LOADERS), help="输入格式，默认按后缀判断")
+    parser.add_argument("--convert", default=None, help="转换后的输出路径，格式按后缀判断")
+    args = parser.parse_args(argv)
+
+    assumption, report = load_model(args.model, args.format)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if args.convert:
+        start = time.perf_counter()
+        save_model(assumption, args.convert)
+        print(f"已写出 {args.convert}，耗时 {time.perf_counter() - start:.3f}s")
+    return assumption, report
+
+
+if __name__ == "__main__":
+    main()
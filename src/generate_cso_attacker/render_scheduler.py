@@ -0,0 +1,76 @@
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+import graphviz
+
+"""
+Graphviz 渲染调度：
+绘图函数只负责构建 Digraph（render=False），渲染任务交给 RenderScheduler，
+每个 (图, 输出格式) 是一个独立任务，在进程池中并行调用 dot。
+任务在图构建完成时立即提交，渲染与后续阶段的计算重叠进行，最后统一 wait()。
+"""
+
+def _render_job(source, engine, fmt, filename):
+    """
+    进程池中执行的渲染任务：只传递 DOT 源码，避免序列化 Digraph 对象
+    """
+    return graphviz.Source(source, engine=engine, format=fmt).render(filename, cleanup=True)
+
+
+class RenderScheduler:
+    """
+    用法：
+        renderer = RenderScheduler()
+        renderer.submit(dot, 'resources/cso-attacker/ACAG')              # 按 dot.format 输出
+        renderer.submit(dot, 'resources/cso-attacker/ACAG_pdf', 'pdf')   # 额外输出 PDF
+        renderer.wait()
+    max_workers 为 0 时不启用进程池，submit 时直接在当前进程渲染。
+    """
+    __slots__ = ('max_workers', '_executor', '_jobs')
+
+    def __init__(self, max_workers=None):
+        self.max_workers = os.cpu_count() if max_workers is None else max_workers
+        self._executor = None
+        self._jobs = []
+
+    def submit(self, dot, filename, fmt=None):
+        fmt = fmt or dot.format
+        job = (dot.source, dot.engine, fmt, filename)
+        if self.max_workers == 0:
+            try:
+                self._jobs.append((filename, fmt, _render_job(*job), None))
+            except Exception as e:
+                self._jobs.append((filename, fmt, None, e))
+            return
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        self._jobs.append((filename, fmt, self._executor.submit(_render_job, *job), None))
+
+    def wait(self):
+        """
+        等待所有渲染任务结束并关闭进程池。
+        :return: (输出文件列表, 失败列表 [(filename, fmt, 异常), ...])
+        """
+        outputs, failures = [], []
+        for filename, fmt, result, error in self._jobs:
+            if isinstance(result, Future):
+                try:
+                    result = result.result()
+                except Exception as e:
+                    error = e
+            if error is None:
+                outputs.append(result)
+            else:
+                print(f"Rendering error: {filename}.{fmt}: {error}")
+                failures.append((filename, fmt, error))
+        self._jobs = []
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        return outputs, failures
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.wait()
+        return False
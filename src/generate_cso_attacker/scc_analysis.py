@@ -0,0 +1,237 @@
+try:
+    import numpy as np
+except ImportError:  # numpy 为可选依赖，只有分析 CSR 图（from_mapped）时才需要
+    np = None
+from .mapped_graph import KIND_ATTACK, KIND_EXPOSED
+
+"""
+pruned AO-ACAG 的 SCC 分析引擎，与绘图分离：
+节点按构图顺序编号为 0..n-1，后继为去重后的整数列表，迭代式 Tarjan 一次遍历得到全部强连通分量；
+每个分量在弹出时立即计算出口集合并完成 alpha / beta / sink / complex 分类。
+与原 networkx 实现得到相同的强连通分量及其分类；SCC_i 的编号按当前 pruned AO-ACAG 转移的插入顺序产生，
+上游的构建方式（例如紧凑的 AO-ACAG 构建、哈希随机化下的集合迭代顺序）改变转移顺序时编号也随之改变，
+比较不同版本的结果时应按分量内容而不是编号对齐。
+"""
+
+SCC_TYPES = ('alpha', 'beta', 'sink', 'complex')
+
+
+def strongly_connected_components(adjacency, roots=None):
+    """
+    迭代式 Tarjan：adjacency[u] 为节点 u 的后继 id 列表，roots 为 DFS 起点顺序（默认 0..n-1）。
+    SCC 按完成顺序产生，每个 SCC 为节点 id 的集合；不使用递归，深图不会触发递归深度限制。
+    """
+    n = len(adjacency)
+    index = [-1] * n
+    lowlink = [0] * n
+    on_stack = [False] * n
+    stack = []
+    counter = 0
+    for root in (range(n) if roots is None else roots):
+        if index[root] >= 0:
+            continue
+        index[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        work = [(root, 0)]
+        while work:
+            v, pos = work[-1]
+            successors = adjacency[v]
+            while pos < len(successors):
+                w = successors[pos]
+                pos += 1
+                if index[w] < 0:
+                    work[-1] = (v, pos)
+                    index[w] = lowlink[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack[w] = True
+                    work.append((w, 0))
+                    break
+                if on_stack[w] and index[w] < lowlink[v]:
+                    lowlink[v] = index[w]
+            else:
+                work.pop()
+                if work and lowlink[v] < lowlink[work[-1][0]]:
+                    lowlink[work[-1][0]] = lowlink[v]
+                if lowlink[v] == index[v]:
+                    scc = set()
+                    while True:
+                        w = stack.pop()
+                        on_stack[w] = False
+                        scc.add(w)
+                        if w == v:
+                            break
+                    yield scc
+
+
+class SCCAnalysis:
+    """
+    用法：
+        analysis = SCCAnalysis.from_pruned_transitions(pruned_transitions)
+        scc_log = analysis.scc_log()
+    kinds[u] 为 'Qe' 或 'Qa'；sccs 只包含非平凡的 SCC（节点数 > 1 或有自环），顺序即 SCC_i 的编号；
+    component_of[u] 为 u 所在的非平凡 SCC 编号，不在其中时为 -1；exits[i] 为第 i 个 SCC 的出口节点集合。
+    components 为全部强连通分量（含单节点），按 Tarjan 完成顺序排列，即凝聚图的逆拓扑序；
+    component_index[u] 为 u 在 components 中的下标。
+    nodes 为 id -> 节点取值（由 MappedGraph 构建时为 None，此时结果以节点 id 为键）。
+    """
+    __slots__ = ('nodes', 'kinds', 'adjacency', 'roots', 'sccs', 'types', 'exits', 'component_of',
+                 'components', 'component_index')
+
+    def __init__(self, nodes, kinds, adjacency, roots=None):
+        self.nodes = nodes
+        self.kinds = kinds
+        self.adjacency = adjacency
+        self.roots = roots
+        self.analyze()
+
+    @classmethod
+    def from_pruned_transitions(cls, pruned_transitions):
+        """
+        {((Qe, o_sigma), t_sigma): Qe'} 整理为整数邻接表：边 Qe -> Qa（环境）与 Qa -> Qe'（攻击），
+        节点按 u_qe、Qa、next_qe 的出现顺序编号
+        """
+        ids, nodes, kinds, adjacency = {}, [], [], []
+        seen_edges = set()
+
+        def node_id(node, kind):
+            i = ids.get(node)
+            if i is None:
+                i = ids[node] = len(nodes)
+                nodes.append(node)
+                kinds.append(kind)
+                adjacency.append([])
+            else:
+                kinds[i] = kind
+            return i
+
+        def add_edge(u, v):
+            if (u, v) not in seen_edges:
+                seen_edges.add((u, v))
+                adjacency[u].append(v)
+
+        for (qa_info, _), next_qe_tags in pruned_transitions.items():
+            u = node_id(qa_info[0], 'Qe')
+            a = node_id(qa_info, 'Qa')
+            v = node_id(next_qe_tags, 'Qe')
+            add_edge(u, a)
+            add_edge(a, v)
+        return cls(nodes, kinds, adjacency)
+
+    @classmethod
+    def from_mapped(cls, graph, edge_mask=None):
+        """
+        write_AO_ACAG 写出的 MappedGraph；edge_mask 为 prune_mapped_AO_ACAG 的掩码，为 None 时分析除 AX 边以外的全部边。
+        DFS 起点按节点 id 顺序，SCC 编号可能与字典版本不同，但节点集合与类型一致。
+        """
+        if np is None:
+            raise ImportError("分析 CSR 图需要 numpy，请先安装 numpy")
+        kinds = np.asarray(graph.kinds)
+        targets = np.asarray(graph.targets)
+        live = kinds[targets] != KIND_EXPOSED
+        if edge_mask is not None:
+            live &= edge_mask
+        offsets = graph.offsets.tolist()
+        live_list = live.tolist()
+        target_list = targets.tolist()
+
+        adjacency = [[] for _ in range(graph.n_nodes)]
+        used = [False] * graph.n_nodes
+        for u in range(graph.n_nodes):
+            successors = dict.fromkeys(target_list[e] for e in range(offsets[u], offsets[u + 1]) if live_list[e])
+            if successors:
+                adjacency[u] = list(successors)
+                used[u] = True
+                for v in successors:
+                    used[v] = True
+        kind_names = ['Qa' if k == KIND_ATTACK else 'Qe' for k in kinds.tolist()]
+        return cls(None, kind_names, adjacency, [u for u in range(graph.n_nodes) if used[u]])
+
+    def analyze(self):
+        adjacency, kinds = self.adjacency, self.kinds
+        self.sccs, self.types, self.exits = [], [], []
+        self.component_of = [-1] * len(adjacency)
+        self.components, self.component_index = [], [-1] * len(adjacency)
+        for scc in strongly_connected_components(adjacency, self.roots):
+            for u in scc:
+                self.component_index[u] = len(self.components)
+            self.components.append(scc)
+            if len(scc) == 1:
+                v = next(iter(scc))
+                if v not in adjacency[v]:
+                    continue
+            i = len(self.sccs)
+            for u in scc:
+                self.component_of[u] = i
+            exits = {v for u in scc for v in adjacency[u] if self.component_of[v] != i}
+            self.sccs.append(scc)
+            self.exits.append(exits)
+            self.types.append(self._classify(scc, exits))
+
+    def _classify(self, scc, exits):
+        # --- 判定 1: Sink SCC ---
+        if not exits:
+            return 'sink'
+        # --- 判定 2: 结构约束检查：SCC 内的每个 Qa 恰有一个 SCC 内的后继 ---
+        component = self.component_of[next(iter(scc))]
+        for u in scc:
+            if self.kinds[u] == 'Qa' and sum(self.component_of[v] == component for v in self.adjacency[u]) != 1:
+                return 'complex'
+        # --- 判定 3: 出口全为 Qa 为 alpha，全为 Qe 为 beta ---
+        exit_kinds = {self.kinds[v] for v in exits}
+        if exit_kinds == {'Qa'}:
+            return 'alpha'
+        if exit_kinds == {'Qe'}:
+            return 'beta'
+        return 'complex'
+
+    def _key(self, u):
+        return u if self.nodes is None else self.nodes[u]
+
+    def scc_log(self):
+        """
+        :return: {"SCC_i": {"type", "node_count", "exit_node_types"}}
+        """
+        return {
+            f"SCC_{i}": {
+                "type": self.types[i],
+                "node_count": len(scc),
+                "exit_node_types": list(set(self.kinds[v] for v in self.exits[i])),
+            }
+            for i, scc in enumerate(self.sccs)
+        }
+
+    def node_scc_type(self):
+        return {self._key(u): self.types[i] for i, scc in enumerate(self.sccs) for u in scc}
+
+    def edge_scc_type(self):
+        """
+        SCC 内部边 -> 所属 SCC 的类型
+        """
+        return {(self._key(u), self._key(v)): self.types[i]
+                for i, scc in enumerate(self.sccs) for u in scc
+                for v in self.adjacency[u] if self.component_of[v] == i}
+
+    def node_scc(self):
+        """
+        {节点: SCC 编号}
+        """
+        return {self._key(u): i for i, scc in enumerate(self.sccs) for u in scc}
+
+    def condensation(self):
+        """
+        凝聚 DAG：第 c 个分量到其后继分量的列表（去重，按首次出现顺序）。
+        分量下标即 Tarjan 完成顺序，每条凝聚边都从较大的下标指向较小的下标。
+        """
+        successors = [{} for _ in self.components]
+        index = self.component_index
+        for u, targets in enumerate(self.adjacency):
+            cu = index[u]
+            if cu < 0:
+                continue
+            for v in targets:
+                if index[v] != cu:
+                    successors[cu][index[v]] = None
+        return [list(s) for s in successors]
@@ -0,0 +1,113 @@
+import hashlib
+import os
+import pickle
+import zlib
+from pathlib import Path
+
+"""
+流水线阶段结果的磁盘缓存（按内容寻址）：
+- 每个阶段的键 = sha256(阶段名, 缓存版本, 该阶段用到的 SystemAssumptions 字段, 上游阶段的键)
+- 集合 / 字典先按规范顺序展开再取摘要，与 Python 的哈希随机化、插入顺序无关
+- 结果以 pickle + zlib 压缩存放在 cache_dir 下，一个阶段结果一个文件
+只修改了下游阶段的输入（例如 event_alterable）时，上游阶段的键不变，直接读取缓存。
+缓存条目是 pickle，加载即可执行任意代码：cache_dir 必须只有当前用户可写，不要指向共享目录或来源不明的缓存。
+"""
+
+# 阶段算法变化、结果格式变化时递增，旧缓存自动失效
+CACHE_VERSION = 1
+
+
+def canonical_repr(obj):
+    """
+    生成与迭代顺序无关的规范字符串：集合元素、字典项按各自的规范串排序
+    """
+    if isinstance(obj, (set, frozenset)):
+        return 'S{' + ','.join(sorted(canonical_repr(e) for e in obj)) + '}'
+    if isinstance(obj, dict):
+        items = sorted(canonical_repr(k) + ':' + canonical_repr(v) for k, v in obj.items())
+        return 'D{' + ','.join(items) + '}'
+    if isinstance(obj, tuple):
+        return 'T(' + ','.join(canonical_repr(e) for e in obj) + ')'
+    if isinstance(obj, list):
+        return 'L[' + ','.join(canonical_repr(e) for e in obj) + ']'
+    return type(obj).__name__ + ':' + repr(obj)
+
+
+def fingerprint(stage, *parts):
+    """
+    阶段键：阶段名、缓存版本与各输入规范串的 sha256
+    """
+    digest = hashlib.sha256()
+    digest.update(f'{stage}#{CACHE_VERSION}'.encode('utf-8'))
+    for part in parts:
+        digest.update(b'\x00')
+        digest.update(canonical_repr(part).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class StageCache:
+    """
+    用法：
+        cache = StageCache()
+        key = fingerprint('closed_loop', assumption.transition_origin_system, ...)
+        result = cache.get_or_compute('closed_loop', key, lambda: ...)
+    enabled 为 False 时每次都重新计算且不写盘。
+    """
+    __slots__ = ('cache_dir', 'enabled', 'compress_level', 'hits', 'misses')
+
+    def __init__(self, cache_dir='.cache/cso-attacker', enabled=True, compress_level=6):
+        self.cache_dir = Path(cache_dir)
+        self.enabled = enabled
+        self.compress_level = compress_level
+        self.hits = []
+        self.misses = []
+
+    def path(self, stage, key):
+        return self.cache_dir / f'{stage}-{key[:32]}.pkl.z'
+
+    def load(self, stage, key):
+        """
+        读取缓存，不存在或已损坏时返回 (False, None)
+        """
+        path = self.path(stage, key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            return True, pickle.loads(zlib.decompress(data))
+        except FileNotFoundError:
+            return False, None
+        except (OSError, zlib.error, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            # 损坏或与当前代码不兼容的缓存视为未命中
+            return False, None
+
+    def store(self, stage, key, result):
+        """
+        先写临时文件再原子替换，避免并发运行读到写了一半的缓存
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self.path(stage, key)
+        tmp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+        data = zlib.compress(pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL), self.compress_level)
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def get_or_compute(self, stage, key, compute):
+        if self.enabled:
+            found, result = self.load(stage, key)
+            if found:
+                self.hits.append(stage)
+                return result
+        result = compute()
+        self.misses.append(stage)
+        if self.enabled:
+            self.store(stage, key, result)
+        return result
+
+    def clear(self):
+        """
+        删除缓存目录下的所有缓存文件
+        """
+        if self.cache_dir.exists():
+            for item in self.cache_dir.glob('*.pkl.z'):
+                item.unlink()
@@ -0,0 +1,159 @@
+import cProfile
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows 没有 resource 模块，此时不记录峰值 RSS
+    resource = None
+
+"""
+流水线阶段的耗时与内存记录：
+每个阶段记录墙钟时间、CPU 时间、进程峰值 RSS、（可选）tracemalloc 阶段内峰值，以及状态数 / 边数等规模，
+结果以 JSON 报告输出，便于在不同规模、不同提交之间比较；可选为每个阶段单独保存 cProfile 数据。
+"""
+
+REPORT_VERSION = 1
+
+
+def peak_rss_kb():
+    """
+    进程启动以来的峰值常驻内存（KB），无法获取时返回 None
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 上 ru_maxrss 的单位为字节，Linux 上为 KB
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+class StageProfiler:
+    """
+    用法：
+        profiler = StageProfiler(trace_memory=True, profile_dir='profiles')
+        profiler.begin('closed_loop')
+        ...
+        profiler.end(states=len(states), transitions=len(transitions))
+        profiler.write_json('profiles/report.json')
+    或使用 with profiler.stage('closed_loop') as record: ...; record['counts'][...] = ...
+    enabled 为 False 时 begin / end 均不做任何事。
+    trace_memory 开启 tracemalloc，会明显拖慢运行，只在需要阶段内存峰值时使用。
+    """
+    __slots__ = ('enabled', 'trace_memory', 'profile_dir', 'records', 'cache',
+                 '_current', '_profile', '_started', '_cache_mark')
+
+    def __init__(self, enabled=True, trace_memory=False, profile_dir=None):
+        self.enabled = enabled
+        self.trace_memory = trace_memory
+        self.profile_dir = Path(profile_dir) if profile_dir else None
+        self.records = []
+        self._current = None
+        self._profile = None
+        self._started = time.perf_counter()
+        self.cache = None
+        self._cache_mark = 0
+
+    def attach_cache(self, cache):
+        """
+        关联 StageCache：之后每个阶段额外记录该阶段内命中的缓存阶段名 (cache_hits)
+        """
+        self.cache = cache
+
+    def begin(self, name):
+        if not self.enabled:
+            return
+        if self._current is not None:
+            self.end()
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        if self.profile_dir is not None:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        if self.cache is not None:
+            self._cache_mark = len(self.cache.hits)
+        self._current = {
+            'stage': name,
+            'wall_start': time.perf_counter(),
+            'cpu_start': time.process_time(),
+        }
+
+    def end(self, **counts):
+        """
+        结束当前阶段，counts 为该阶段的规模统计（状态数、边数等）
+        """
+        if not self.enabled or self._current is None:
+            return None
+        wall = time.perf_counter() - self._current.pop('wall_start')
+        cpu = time.process_time() - self._current.pop('cpu_start')
+        record = self._current
+        self._current = None
+
+        if self._profile is not None:
+            self._profile.disable()
+            self.profile_dir.mkdir(parents=True, exist_ok=True)
+            profile_path = self.profile_dir / f"{len(self.records):02d}-{record['stage']}.prof"
+            self._profile.dump_stats(profile_path)
+            self._profile = None
+            record['profile'] = str(profile_path)
+
+        record['wall_seconds'] = round(wall, 6)
+        record['cpu_seconds'] = round(cpu, 6)
+        record['peak_rss_kb'] = peak_rss_kb()
+        if self.trace_memory and tracemalloc.is_tracing():
+            record['tracemalloc_peak_kb'] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        if self.cache is not None:
+            record['cache_hits'] = self.cache.hits[self._cache_mark:]
+        record['counts'] = counts
+        self.records.append(record)
+        return record
+
+    @contextmanager
+    def stage(self, name):
+        self.begin(name)
+        record = {'counts': {}}
+        try:
+            yield record
+        finally:
+            self.end(**record['counts'])
+
+    def report(self):
+        """
+        :return: 可直接 json.dump 的报告字典
+        """
+        return {
+            'version': REPORT_VERSION,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'pid': os.getpid(),
+            'trace_memory': self.trace_memory,
+            'total_wall_seconds': round(time.perf_counter() - self._started, 6),
+            'stages': list(self.records),
+        }
+
+    def write_json(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
+        return path
+
+    def summary(self):
+        """
+        每个阶段一行的文本摘要，便于在终端查看
+        """
+        lines = [f"{'stage':<24} {'wall(ms)':>10} {'cpu(ms)':>10} {'rss(MB)':>9}  counts"]
+        for record in self.records:
+            rss = record['peak_rss_kb']
+            rss = f"{rss / 1024:>9.1f}" if rss is not None else f"{'-':>9}"
+            counts = ', '.join(f'{k}={v}' for k, v in record['counts'].items())
+            lines.append(f"{record['stage']:<24} {record['wall_seconds'] * 1e3:>10.1f} "
+                         f"{record['cpu_seconds'] * 1e3:>10.1f} {rss}  {counts}")
+        return '\n'.join(lines)
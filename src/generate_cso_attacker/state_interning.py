@@ -0,0 +1,192 @@
+from array import array
+
+"""
+状态驻留（interning）层：
+将预估集合、监督器状态、物理状态、事件映射为稠密整数 id，
+ACAG 节点只保存这些 id，原始元组只在日志输出与绘图时才解码。
+"""
+
+class Interner:
+    """
+    对象 <-> 稠密整数 id 的双向映射，id 按首次出现的顺序从 0 开始分配
+    """
+    __slots__ = ('_ids', '_objects')
+
+    def __init__(self, objects=()):
+        self._ids = {}
+        self._objects = []
+        for obj in objects:
+            self.intern(obj)
+
+    def intern(self, obj):
+        obj_id = self._ids.get(obj)
+        if obj_id is None:
+            obj_id = len(self._objects)
+            self._ids[obj] = obj_id
+            self._objects.append(obj)
+        return obj_id
+
+    def get(self, obj, default=None):
+        return self._ids.get(obj, default)
+
+    def lookup(self, obj_id):
+        return self._objects[obj_id]
+
+    def __contains__(self, obj):
+        return obj in self._ids
+
+    def __len__(self):
+        return len(self._objects)
+
+    def __iter__(self):
+        return iter(self._objects)
+
+
+class ACAGStateTable:
+    """
+    ACAG 节点的整数编码表。
+    - Ye: (xi_S, xi_A, z, x)                    -> 节点 id
+    - Ya: (xi_S, xi_A, z, x', options, sigma)    -> 节点 id
+    节点各分量按列存放在 array 中，Ye 的 options / sigma 列记为 -1。
+    """
+    ENVIRONMENT = 0
+    ATTACKER = 1
+
+    __slots__ = ('estimates', 'supervisor_states', 'plant_states', 'events', 'options',
+                 'closed_loop_states', 'kind', 'est_sup', 'est_atk', 'sup_z', 'sys_x',
+                 'node_options', 'node_event', '_node_ids')
+
+    def __init__(self):
+        # 监督器与攻击者的预估集合共用一个驻留表
+        self.estimates = Interner()
+        self.supervisor_states = Interner()
+        self.plant_states = Interner()
+        self.events = Interner()
+        self.options = Interner()
+        self.closed_loop_states = Interner()
+
+        self.kind = array('b')
+        self.est_sup = array('i')
+        self.est_atk = array('i')
+        self.sup_z = array('i')
+        self.sys_x = array('i')
+        self.node_options = array('i')
+        self.node_event = array('i')
+        self._node_ids = {}
+
+    def _node(self, key):
+        node_id = self._node_ids.get(key)
+        if node_id is None:
+            node_id = len(self.kind)
+            self._node_ids[key] = node_id
+            self.kind.append(key[0])
+            self.est_sup.append(key[1])
+            self.est_atk.append(key[2])
+            self.sup_z.append(key[3])
+            self.sys_x.append(key[4])
+            self.node_options.append(key[5])
+            self.node_event.append(key[6])
+        return node_id
+
+    # 按分量 id 取得（必要时新建）节点
+    def environment_node(self, est_sup_id, est_atk_id, z_id, x_id):
+        return self._node((self.ENVIRONMENT, est_sup_id, est_atk_id, z_id, x_id, -1, -1))
+
+    def attacker_node(self, est_sup_id, est_atk_id, z_id, x_id, options_id, event_id):
+        return self._node((self.ATTACKER, est_sup_id, est_atk_id, z_id, x_id, options_id, event_id))
+
+    def is_environment(self, node_id):
+        return self.kind[node_id] == self.ENVIRONMENT
+
+    def encode_options(self, options):
+        return self.options.intern(tuple(self.events.intern(e) for e in options))
+
+    def encode_state(self, state):
+        """
+        将原始 Ye(4 元组) / Ya(6 元组) 编码为节点 id
+        """
+        est_sup_id = self.estimates.intern(frozenset(state[0]))
+        est_atk_id = self.estimates.intern(frozenset(state[1]))
+        z_id = self.supervisor_states.intern(state[2])
+        x_id = self.plant_states.intern(state[3])
+        if len(state) == 4:
+            return self.environment_node(est_sup_id, est_atk_id, z_id, x_id)
+        return self.attacker_node(est_sup_id, est_atk_id, z_id, x_id,
+                                  self.encode_options(state[4]), self.events.intern(state[5]))
+
+    def decode_state(self, node_id):
+        """
+        将节点 id 还原为原始 Ye / Ya 元组（仅在输出、绘图时使用）
+        """
+        base = (self.estimates.lookup(self.est_sup[node_id]),
+                self.estimates.lookup(self.est_atk[node_id]),
+                self.supervisor_states.lookup(self.sup_z[node_id]),
+                self.plant_states.lookup(self.sys_x[node_id]))
+        if self.kind[node_id] == self.ENVIRONMENT:
+            return base
+        options = tuple(self.events.lookup(e) for e in self.options.lookup(self.node_options[node_id]))
+        return base + (options, self.events.lookup(self.node_event[node_id]))
+
+    def __len__(self):
+        return len(self.kind)
+
+
+class CompactACAG:
+    """
+    整数编码的 ACAG：节点为 ACAGStateTable 中的 id，
+    successors[node] = [(event_id, next_node), ...]，按节点 id 下标存放。
+    """
+    __slots__ = ('table', 'initial', 'successors', 'n_transitions')
+
+    def __init__(self, table, initial):
+        self.table = table
+        self.initial = initial
+        self.successors = []
+        self.n_transitions = 0
+
+    def add_transition(self, node, event_id, next_node):
+        while len(self.successors) <= node:
+            self.successors.append(None)
+        edges = self.successors[node]
+        if edges is None:
+            edges = self.successors[node] = []
+        edges.append((event_id, next_node))
+        self.n_transitions += 1
+
+    def enabled(self, node):
+        if node < len(self.successors):
+            return self.successors[node] or ()
+        return ()
+
+    def transitions(self):
+        """
+        按插入顺序依次产生 (node, event_id, next_node)
+        """
+        for node, edges in enumerate(self.successors):
+            if edges:
+                for event_id, next_node in edges:
+                    yield node, event_id, next_node
+
+    def decode(self):
+        """
+        还原为 generate_ACAG_transition 的字典格式 {(state, event): next_state}
+        """
+        table = self.table
+        decoded = {}
+        states = {}
+
+        def state_of(node):
+            state = states.get(node)
+            if state is None:
+                state = states[node] = table.decode_state(node)
+            return state
+
+        for node, event_id, next_node in self.transitions():
+            decoded[(state_of(node), table.events.lookup(event_id))] = state_of(next_node)
+        return decoded
+
+    def decode_initial(self):
+        return self.table.decode_state(self.initial)
+
+    def __len__(self):
+        return self.n_transitions
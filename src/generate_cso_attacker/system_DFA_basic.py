@@ -1,6 +1,8 @@
 from typing import Set, Dict, Any, List, Tuple
 from collections import deque
 from graphviz import Digraph
+from .transition_index import TransitionIndex
+from .closed_loop_automaton import ClosedLoopAutomaton
 
 """
 给定初始所有的系统假设
@@ -22,6 +24,8 @@ class SystemAssumptions:
         event_alterable:Set[str],
         transition_origin_system:Dict[Any,Any],
         transition_supervisor:Dict[Any,Any],
+        index_origin_system:TransitionIndex=None,
+        index_supervisor:TransitionIndex=None,
         ):
         self.state_oringin_system = state_oringin_system
         self.state_supervisor = state_supervisor
@@ -36,6 +40,59 @@ class SystemAssumptions:
         self.event_alterable = event_alterable
         self.transition_origin_system = transition_origin_system
         self.transition_supervisor = transition_supervisor
+        # 邻接索引在首次访问时构建，之后整个流水线复用同一份；
+        # 流式加载模型时直接传入加载过程中建好的索引（其 transition 即上面的转移字典）
+        self._index_origin_system = index_origin_system
+        self._index_supervisor = index_supervisor
+
+    # 物理系统转移的按状态邻接索引
+    @property
+    def index_origin_system(self):
+        if self._index_origin_system is None:
+            self._index_origin_system = TransitionIndex(self.transition_origin_system)
+        return self._index_origin_system
+
+    # 监督器转移的按状态邻接索引
+    @property
+    def index_supervisor(self):
+        if self._index_supervisor is None:
+            self._index_supervisor = TransitionIndex(self.transition_supervisor)
+        return self._index_supervisor
+
+    # 可序列化字段：集合字段与转移字段，顺序同构造参数
+    SET_FIELDS = (
+        'state_oringin_system', 'state_supervisor', 'state_initial_origin_ststem',
+        'state_initial_supervisor', 'state_system_secret', 'event_system',
+        'event_attacker_observable', 'event_supervisor_observable',
+        'event_supervisor_controllable', 'event_vulnerable', 'event_alterable',
+    )
+    TRANSITION_FIELDS = ('transition_origin_system', 'transition_supervisor')
+
+    def to_dict(self):
+        """
+        转为只含 list / str / int 的字典，可直接 json.dump，跨进程传递时也比整个对象轻
+        - 集合按 repr 排序成列表
+        - 转移展开为 [state, event, next_state] 列表，保持原插入顺序
+        """
+        data = {name: sorted(getattr(self, name), key=repr) for name in self.SET_FIELDS}
+        for name in self.TRANSITION_FIELDS:
+            data[name] = [[state, event, next_state]
+                          for (state, event), next_state in getattr(self, name).items()]
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        to_dict 的逆过程；JSON 中的列表型状态还原为元组，多余的键（如 name）忽略
+        """
+        def hashable(value):
+            return tuple(hashable(v) for v in value) if isinstance(value, list) else value
+
+        kwargs = {name: {hashable(v) for v in data[name]} for name in cls.SET_FIELDS}
+        for name in cls.TRANSITION_FIELDS:
+            kwargs[name] = {(hashable(state), event): hashable(next_state)
+                            for state, event, next_state in data[name]}
+        return cls(**kwargs)
 
 # 闭环系统
 class ClosedLoopSystem:
@@ -49,56 +106,98 @@ class ClosedLoopSystem:
         return event_ubobservable_supervisor
     
     @staticmethod
-    # 生成闭环系统的状态集合
-    def generate_states_closed_loop_system(
-        state_oringin_system,
-        state_initial_origin_ststem, 
+    def explore_closed_loop_system(
+        state_initial_origin_ststem,
         state_initial_supervisor,
         event_system,
         transition_origin_system,
-        transition_supervisor,
-        max_depth=15 # 增加默认深度以覆盖更完整的状态空间
+        transition_supervisor
         ):
         """
-        通过可达性搜索生成闭环系统的所有状态集合。
-        :return: 闭环系统状态集合，元素格式为 (supervisor_state, origin_system_state)
+        对闭环系统做一次完整的 BFS，同时记录每个状态的最短深度与全部转移。
+        状态集合与转移关系出自同一前沿；需要两者的调用方把返回值通过 exploration 参数显式传给
+        generate_states_closed_loop_system / generate_transition_closed_loop_system，不再重复搜索。
+        :return: (depths, transitions)
+                 depths: {(supervisor_state, origin_system_state): BFS 深度}，按发现顺序
+                 transitions: {((s_curr, o_curr), event): (s_next, o_next)}
         """
-        states_closed_loop_system = list()
-        
-        # 1. 确定初始状态对并加入队列
-        # 初始状态对集合由监督器初始状态和系统初始状态的笛卡尔积构成
+        depths = {}
+        transitions = {}
         queue = deque()
         for s_init in state_initial_supervisor:
             for o_init in state_initial_origin_ststem:
                 initial_pair = (s_init, o_init)
-                if initial_pair not in states_closed_loop_system:
-                    states_closed_loop_system.append(initial_pair)
-                    queue.append((initial_pair, 0)) # 存储 (状态对, 当前深度)
+                if initial_pair not in depths:
+                    depths[initial_pair] = 0
+                    queue.append(initial_pair)
 
-        # 2. 广度优先搜索 (BFS) 遍历可达状态
         while queue:
-            (curr_s, curr_o), depth = queue.popleft()
-            
-            # 超过最大深度限制则停止扩展该分支
-            if depth >= max_depth:
-                continue
-                
-            # 遍历系统中可能发生的所有事件
+            curr_pair = queue.popleft()
+            curr_s, curr_o = curr_pair
+            depth = depths[curr_pair]
             for event in event_system:
                 o_key = (curr_o, event)
                 s_key = (curr_s, event)
-                
-                # 只有当原系统和监督器在当前状态下都定义了该事件时，转移才有效
                 if o_key in transition_origin_system and s_key in transition_supervisor:
-                    next_o = transition_origin_system[o_key]
-                    next_s = transition_supervisor[s_key]
-                    next_pair = (next_s, next_o)
-                    
-                    # 如果是新发现的状态，记录并加入搜索队列
-                    if next_pair not in states_closed_loop_system:
-                        states_closed_loop_system.append(next_pair)
-                        queue.append((next_pair, depth + 1))
-                states_closed_loop_system.sort()   
+                    next_pair = (transition_supervisor[s_key], transition_origin_system[o_key])
+                    transitions[(curr_pair, event)] = next_pair
+                    if next_pair not in depths:
+                        depths[next_pair] = depth + 1
+                        queue.append(next_pair)
+        return depths, transitions
+
+    # 一次构建闭环系统的状态、初始状态与转移关系
+    @staticmethod
+    def build_closed_loop_automaton(
+        state_initial_origin_ststem,
+        state_initial_supervisor,
+        event_system,
+        transition_origin_system,
+        transition_supervisor
+        ):
+        """
+        单次 BFS（不设深度上限）构建闭环系统。
+        :return: ClosedLoopAutomaton，states / initial_states / transitions 出自同一次搜索
+        """
+        depths, transitions = ClosedLoopSystem.explore_closed_loop_system(
+            state_initial_origin_ststem,
+            state_initial_supervisor,
+            event_system,
+            transition_origin_system,
+            transition_supervisor)
+        initial_states = [(s_init, o_init)
+                          for s_init in state_initial_supervisor
+                          for o_init in state_initial_origin_ststem]
+        return ClosedLoopAutomaton(depths.keys(), dict.fromkeys(initial_states), transitions)
+
+    @staticmethod
+    # 生成闭环系统的状态集合
+    def generate_states_closed_loop_system(
+        state_oringin_system,
+        state_initial_origin_ststem, 
+        state_initial_supervisor,
+        event_system,
+        transition_origin_system,
+        transition_supervisor,
+        max_depth=15, # 增加默认深度以覆盖更完整的状态空间
+        exploration=None
+        ):
+        """
+        通过可达性搜索生成闭环系统的所有状态集合。
+        BFS 深度即最短路径长度，保留深度不超过 max_depth 的状态，最后统一排序一次。
+        exploration: explore_closed_loop_system 对同一闭环系统的返回值，为 None 时重新搜索
+        :return: 闭环系统状态集合，元素格式为 (supervisor_state, origin_system_state)
+        """
+        if exploration is None:
+            exploration = ClosedLoopSystem.explore_closed_loop_system(
+                state_initial_origin_ststem,
+                state_initial_supervisor,
+                event_system,
+                transition_origin_system,
+                transition_supervisor)
+        depths, _ = exploration
+        states_closed_loop_system = [pair for pair, depth in depths.items() if depth <= max_depth]
+        states_closed_loop_system.sort()
         return states_closed_loop_system
     
     #闭环系统初始状态
@@ -126,53 +225,46 @@ class ClosedLoopSystem:
         event_system,
         transition_origin_system,
         transition_supervisor,
-        max_depth=8
+        max_depth=8,
+        backend='python',
+        exploration=None
         ):
         """
         生成闭环系统的状态转移图。
         采用可达性搜索算法（BFS）构建受控系统的状态转移。
+        backend='numpy' 时使用向量化后端（需要 numpy），按层批量扩展前沿，结果相同。
+        exploration: explore_closed_loop_system 对同一闭环系统的返回值（仅 python 后端），为 None 时重新搜索
         """
-        closed_loop_transitions = {}
-        
-        # 初始状态对集合（通常为单元素，但根据输入定义为 Set）
-        # 我们需要处理所有可能的初始状态组合
-        initial_states = []
-        for s_init in state_initial_supervisor:
-            for o_init in state_initial_origin_ststem:
-                initial_states.append((s_init, o_init))
-        
-        # 使用队列进行可达性搜索
-        queue = initial_states.copy()
-        visited_states = set(initial_states)
-        
-        while queue:
-            curr_s_state, curr_o_state = queue.pop(0)
-            
-            # 遍历系统中可能发生的所有事件
-            for event in event_system:
-                # 定义查找键
-                o_key = (curr_o_state, event)
-                s_key = (curr_s_state, event)
-                
-                # 只有当原系统和监控器都定义了该事件的转移时，闭环系统才发生转移
-                # 在监督控制理论中，监控器通过不定义某些可控事件来达到“禁止”的效果
-                if o_key in transition_origin_system and s_key in transition_supervisor:
-                    next_o_state = transition_origin_system[o_key]
-                    next_s_state = transition_supervisor[s_key]
-                    
-                    next_combined_state = (next_s_state, next_o_state)
-                    
-                    # 记录闭环转移关系：((s_curr, o_curr), event) -> (s_next, o_next)
-                    closed_loop_transitions[((curr_s_state, curr_o_state), event)] = next_combined_state
-                    
-                    # 如果到达了新状态，加入队列继续搜索
-                    if next_combined_state not in visited_states:
-                        visited_states.add(next_combined_state)
-                        queue.append(next_combined_state)
-                        
-        return closed_loop_transitions
+        if backend == 'numpy':
+            from .closed_loop_vectorized import VectorizedClosedLoopBuilder
+            builder = VectorizedClosedLoopBuilder(transition_origin_system, transition_supervisor, event_system)
+            return builder.build(state_initial_supervisor, state_initial_origin_ststem)
+        if backend != 'python':
+            raise ValueError(f"未知的闭环构建后端: {backend}")
+
+        if exploration is None:
+            exploration = ClosedLoopSystem.explore_closed_loop_system(
+                state_initial_origin_ststem,
+                state_initial_supervisor,
+                event_system,
+                transition_origin_system,
+                transition_supervisor)
+        # 返回副本，调用方修改不会影响传入的 exploration
+        return dict(exploration[1])
     
 
+    # 将闭环转移关系编码为整数 id
+    @staticmethod
+    def encode_transition_closed_loop_system(transition_closed_loop_system, state_table):
+        """
+        输出格式: {(闭环状态 id, 事件 id): 闭环状态 id}，id 来自 state_table (ACAGStateTable)
+        """
+        states, events = state_table.closed_loop_states, state_table.events
+        return {
+            (states.intern(curr), events.intern(event)): states.intern(nxt)
+            for (curr, event), nxt in transition_closed_loop_system.items()
+        }
+
     # 生成闭环系统图
     @staticmethod
     def generate_closed_loop_system_graph(transition_closed_loop_system, 
@@ -183,7 +275,8 @@ class ClosedLoopSystem:
                                         event_supervisor_observable,
                                         event_supervisor_controllable,
                                         state_system_secret,
-                                        file_name): # 增加秘密状态参数
+                                        file_name, # 增加秘密状态参数
+                                        render=True):
         
         dot = Digraph(comment='Closed Loop System', format='svg')
         dot.attr(rankdir='LR', size='10')
@@ -241,7 +334,8 @@ class ClosedLoopSystem:
                 
                 if target not in visited:
                     queue.append((target, depth + 1))
-        dot.render(file_name, view=False, cleanup=True)
+        if render:
+            dot.render(file_name, view=False, cleanup=True)
         
         return dot
     
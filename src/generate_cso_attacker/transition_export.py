@@ -0,0 +1,182 @@
+import json
+import struct
+from pathlib import Path
+from .state_interning import Interner
+
+"""
+转移关系的流式导出（ACAG / AO-ACAG / pruned AO-ACAG）：
+转移 {(src, label): dst} 逐条写出，节点与事件标签各自驻留为整数 id，
+每个节点 / 标签只在首次出现时写出一次取值，转移本身只写三个整数。
+- jsonl:  首行为文件头，之后每行一条记录
+          {"n": id, "v": 节点取值} / {"l": id, "v": 标签} / {"e": [src_id, label_id, dst_id]}
+- binary: MAGIC 之后为定长 / 变长记录
+          b'N' + <I 长度> + JSON 字节 / b'L' + <I 长度> + JSON 字节 / b'E' + <III src, label, dst>
+节点与标签 id 按写出顺序从 0 分配；集合按元素排序后写成列表，元组写成列表。
+"""
+
+FORMAT_VERSION = 1
+BINARY_MAGIC = b'CSOX\x01'
+_LENGTH = struct.Struct('<I')
+_EDGE = struct.Struct('<III')
+
+
+def to_jsonable(obj):
+    """
+    将 ACAG 节点（嵌套的元组 / frozenset）转为 JSON 可表示的值，集合元素按规范顺序排列
+    """
+    if isinstance(obj, (set, frozenset)):
+        items = [to_jsonable(e) for e in obj]
+        return sorted(items, key=lambda e: json.dumps(e, ensure_ascii=False))
+    if isinstance(obj, (tuple, list)):
+        return [to_jsonable(e) for e in obj]
+    if obj is None or isinstance(obj, (str, int, float, bool)):
+        return obj
+    return str(obj)
+
+
+def _dumps(obj):
+    return json.dumps(to_jsonable(obj), ensure_ascii=False, separators=(',', ':'))
+
+
+class TransitionExporter:
+    """
+    用法：
+        with TransitionExporter('out/ACAG.jsonl', graph='ACAG') as exporter:
+            exporter.export(transition_ACAG_system)
+    fmt 为 None 时按后缀判断：.jsonl 为 jsonl，其余为 binary。
+    写出先进入内存缓冲区，超过 buffer_size 字节再整块写盘。
+    """
+    __slots__ = ('path', 'fmt', 'buffer_size', 'nodes', 'labels', 'n_edges', '_file', '_buffer')
+
+    def __init__(self, path, fmt=None, graph='', buffer_size=1 << 20):
+        self.path = Path(path)
+        self.fmt = fmt or ('jsonl' if self.path.suffix == '.jsonl' else 'binary')
+        if self.fmt not in ('jsonl', 'binary'):
+            raise ValueError(f"未知的导出格式: {self.fmt}")
+        self.buffer_size = buffer_size
+        self.nodes = Interner()
+        self.labels = Interner()
+        self.n_edges = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'wb')
+        self._buffer = bytearray()
+        if self.fmt == 'jsonl':
+            header = {'graph': graph, 'version': FORMAT_VERSION, 'format': 'jsonl'}
+            self._buffer += json.dumps(header, ensure_ascii=False).encode('utf-8') + b'\n'
+        else:
+            self._buffer += BINARY_MAGIC
+            self._write_blob(b'H', json.dumps({'graph': graph, 'version': FORMAT_VERSION}).encode('utf-8'))
+
+    def _write_blob(self, tag, data):
+        self._buffer += tag
+        self._buffer += _LENGTH.pack(len(data))
+        self._buffer += data
+
+    def _intern(self, interner, obj, tag):
+        obj_id = interner.get(obj)
+        if obj_id is None:
+            obj_id = interner.intern(obj)
+            if self.fmt == 'jsonl':
+                key = 'n' if tag == b'N' else 'l'
+                self._buffer += f'{{"{key}":{obj_id},"v":{_dumps(obj)}}}\n'.encode('utf-8')
+            else:
+                self._write_blob(tag, _dumps(obj).encode('utf-8'))
+        return obj_id
+
+    def add(self, src, label, dst):
+        src_id = self._intern(self.nodes, src, b'N')
+        label_id = self._intern(self.labels, label, b'L')
+        dst_id = self._intern(self.nodes, dst, b'N')
+        if self.fmt == 'jsonl':
+            self._buffer += f'{{"e":[{src_id},{label_id},{dst_id}]}}\n'.encode('utf-8')
+        else:
+            self._buffer += b'E'
+            self._buffer += _EDGE.pack(src_id, label_id, dst_id)
+        self.n_edges += 1
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def export(self, transitions):
+        """
+        transitions: {(src, label): dst} 字典，或产生 ((src, label), dst) 的迭代器
+        """
+        items = transitions.items() if isinstance(transitions, dict) else transitions
+        for (src, label), dst in items:
+            self.add(src, label, dst)
+        return self
+
+    def flush(self):
+        if self._buffer:
+            self._file.write(self._buffer)
+            self._buffer = bytearray()
+
+    def close(self):
+        """
+        :return: (节点数, 标签数, 转移数)
+        """
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+        return len(self.nodes), len(self.labels), self.n_edges
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+
+def export_transitions(transitions, path, fmt=None, graph=''):
+    """
+    一次性导出整个转移字典，返回 (节点数, 标签数, 转移数)
+    """
+    with TransitionExporter(path, fmt, graph) as exporter:
+        exporter.export(transitions)
+    return exporter.close()
+
+
+def read_exported(path):
+    """
+    读取导出文件（格式由文件内容判断）
+    :return: (header, nodes, labels, edges)，nodes / labels 为按 id 排列的 JSON 取值，
+             edges 为 [(src_id, label_id, dst_id), ...]
+    """
+    nodes, labels, edges = [], [], []
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    if not data.startswith(BINARY_MAGIC):
+        lines = data.decode('utf-8').splitlines()
+        header = json.loads(lines[0])
+        for line in lines[1:]:
+            record = json.loads(line)
+            if 'e' in record:
+                edges.append(tuple(record['e']))
+            elif 'n' in record:
+                nodes.append(record['v'])
+            else:
+                labels.append(record['v'])
+        return header, nodes, labels, edges
+
+    header = None
+    pos = len(BINARY_MAGIC)
+    while pos < len(data):
+        tag = data[pos:pos + 1]
+        pos += 1
+        if tag == b'E':
+            edges.append(_EDGE.unpack_from(data, pos))
+            pos += _EDGE.size
+            continue
+        (length,) = _LENGTH.unpack_from(data, pos)
+        pos += _LENGTH.size
+        value = json.loads(data[pos:pos + length].decode('utf-8'))
+        pos += length
+        if tag == b'N':
+            nodes.append(value)
+        elif tag == b'L':
+            labels.append(value)
+        else:
+            header = value
+    return header, nodes, labels, edges
@@ -0,0 +1,53 @@
+class TransitionIndex:
+    """
+    转移关系的按状态邻接索引。
+    将 {(state, event): next_state} 形式的转移字典一次性整理为
+    {state: [(event, next_state), ...]}，查询某状态的使能事件只需 O(出度)，
+    不再需要扫描整个转移字典。
+    """
+    __slots__ = ('transition', 'successors')
+
+    def __init__(self, transition=None):
+        self.transition = {} if transition is None else transition
+        self.successors = {}
+        # 保持转移字典的插入顺序，保证下游 BFS 的遍历顺序与全表扫描一致
+        for (state, event), next_state in self.transition.items():
+            self.successors.setdefault(state, []).append((event, next_state))
+
+    def add(self, state, event, next_state):
+        """
+        增量加入一条转移（流式加载模型时使用），同时更新转移字典与邻接表；
+        同一 (state, event) 再次出现时覆盖原转移，与字典赋值的语义一致
+        """
+        key = (state, event)
+        if key in self.transition:
+            successors = self.successors[state]
+            successors[[e for e, _ in successors].index(event)] = (event, next_state)
+        else:
+            self.successors.setdefault(state, []).append((event, next_state))
+        self.transition[key] = next_state
+
+    def enabled(self, state):
+        """
+        返回 state 处所有可发生的转移 [(event, next_state), ...]
+        """
+        return self.successors.get(state, ())
+
+    def enabled_events(self, state):
+        """
+        返回 state 处所有可发生的事件
+        """
+        return [event for event, _ in self.successors.get(state, ())]
+
+    def restrict(self, events):
+        """
+        生成只包含 events 中事件的子索引（例如仅保留不可观事件）
+        """
+        return TransitionIndex({
+            (state, event): next_state
+            for (state, event), next_state in self.transition.items()
+            if event in events
+        })
+
+    def __len__(self):
+        return len(self.transition)
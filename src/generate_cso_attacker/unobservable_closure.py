@@ -0,0 +1,72 @@
+from .transition_index import TransitionIndex
+
+class UnobservableClosureEngine:
+    """
+    不可观测可达闭包计算引擎。
+    - 只在不可观事件构成的邻接索引上搜索，弹出一个状态只看它的不可观出边
+    - 按 (种子集合, 监督器状态) 记忆化，观察器 BFS 中重复出现的种子集直接命中
+    - 搜索到不动点为止，不设深度上限
+    """
+    __slots__ = ('index_unobservable', 'events_unobservable', 'transition_supervisor',
+                 '_allowed_events', '_closures')
+
+    def __init__(self, transition, events_unobservable, transition_supervisor=None):
+        """
+        Args:
+            transition: 转移字典 {(state, event): next_state}
+            events_unobservable: 不可观事件集
+            transition_supervisor: 监督器转移字典；给定时可按监督器状态 z 过滤被禁止的事件
+        """
+        self.events_unobservable = frozenset(events_unobservable)
+        self.index_unobservable = TransitionIndex({
+            (state, event): next_state
+            for (state, event), next_state in transition.items()
+            if event in self.events_unobservable
+        })
+        self.transition_supervisor = transition_supervisor
+        self._allowed_events = {}
+        self._closures = {}
+
+    # 监督器状态 z 下允许发生的不可观事件
+    def allowed_events(self, state_supervisor):
+        allowed = self._allowed_events.get(state_supervisor)
+        if allowed is None:
+            allowed = frozenset(
+                event for event in self.events_unobservable
+                if (state_supervisor, event) in self.transition_supervisor
+            )
+            self._allowed_events[state_supervisor] = allowed
+        return allowed
+
+    def closure(self, states, state_supervisor=None):
+        """
+        计算 states 的不可观测可达闭包。
+        state_supervisor 为 None 时不考虑监督器约束；否则只沿 z 下允许的不可观事件扩展。
+        """
+        seeds = frozenset(states)
+        key = (seeds, state_supervisor)
+        cached = self._closures.get(key)
+        if cached is not None:
+            return cached
+
+        allowed = None
+        if state_supervisor is not None and self.transition_supervisor is not None:
+            allowed = self.allowed_events(state_supervisor)
+
+        reach = set(seeds)
+        stack = list(seeds)
+        while stack:
+            curr = stack.pop()
+            for event, target in self.index_unobservable.enabled(curr):
+                if allowed is not None and event not in allowed:
+                    continue
+                if target not in reach:
+                    reach.add(target)
+                    stack.append(target)
+
+        result = frozenset(reach)
+        self._closures[key] = result
+        return result
+
+    def __len__(self):
+        return len(self._closures)
@@ -1,199 +1,503 @@
+import atexit
 import logging
+import queue
+import threading
+import time
+import weakref
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
+# 后台写线程的控制消息
+_STOP = object()
+
+
+class DeferredFormatQueueHandler(QueueHandler):
+    """
+    QueueHandler 默认的 prepare() 会在调用线程中格式化消息（record.msg % args）；
+    这里把原始记录连同参数直接入队，由 QueueListener 的文件处理器在后台线程中格式化。
+    队列只在进程内使用，记录不需要可 pickle。
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class BatchingLogSink:
+    """
+    批量写盘的后台日志汇（background='batch' 时使用）：
+    - 调用线程只把 (logger 名, 级别, 时间, 消息, 参数) 放入有界队列，格式化与写文件都在后台线程进行
+    - 后台线程按文件攒批，满 batch_size 条或距上次写盘超过 flush_interval 秒时整批写出
+    - 队列满时丢弃新记录并计数，下一次写盘时在 warning 文件中记录丢弃条数，调用线程从不等待磁盘
+    - flush() / close() 会写完已入队的全部记录；进程退出时由 shutdown_loggers 自动 close
+    %-参数在后台线程中才格式化，传入之后会被修改的可变对象时应先自行拷贝。
+    """
+
+    def __init__(self, log_files, formatter, max_queue=100000, batch_size=1000, flush_interval=1.0):
+        """
+        Args:
+            log_files (dict): 级别名称 -> 日志文件路径
+            formatter (logging.Formatter): 行格式
+            max_queue (int): 队列最多容纳的记录数
+            batch_size (int): 每攒够多少条记录写一次盘
+            flush_interval (float): 最长写盘间隔（秒）
+        """
+        self.log_files = log_files
+        self.formatter = formatter
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._queue = queue.Queue(max_queue)
+        self._thread = None
+        self._lock = threading.Lock()
+        # dropped 由调用线程累加、后台线程读取并清零，两边都在该锁下进行
+        self._dropped_lock = threading.Lock()
+
+    def submit(self, name, level_name, level, message, args):
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait((name, level_name, level, time.time(), message, args))
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="log-sink", daemon=True)
+                self._thread.start()
+
+    def _format(self, item):
+        name, _, level, created, message, args = item
+        record = logging.LogRecord(name, level, "", 0, message, args or None, None)
+        record.created = created
+        record.msecs = (created - int(created)) * 1000
+        try:
+            return self.formatter.format(record)
+        except Exception as e:
+            return f"{message!r} {args!r} (日志格式化失败: {e})"
+
+    def _write(self, pending, files):
+        with self._dropped_lock:
+            dropped, self.dropped = self.dropped, 0
+        if dropped:
+            pending.setdefault('warning', []).append(f"日志队列已满，丢弃 {dropped} 条记录")
+        for level_name, lines in pending.items():
+            f = files.get(level_name)
+            if f is None:
+                path = Path(self.log_files[level_name])
+                path.parent.mkdir(parents=True, exist_ok=True)
+                f = files[level_name] = open(path, 'a', encoding='utf-8')
+            f.write('\n'.join(lines) + '\n')
+            f.flush()
+        pending.clear()
+
+    def _run(self):
+        files, pending = {}, {}
+        count = 0
+        last_write = time.monotonic()
+        try:
+            while True:
+                timeout = max(0.0, self.flush_interval - (time.monotonic() - last_write))
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    item = None
+
+                if item is _STOP:
+                    break
+                if isinstance(item, threading.Event):
+                    # flush 请求：写完之前入队的记录后通知调用方
+                    self._write(pending, files)
+                    count, last_write = 0, time.monotonic()
+                    item.set()
+                    continue
+                if item is not None:
+                    pending.setdefault(item[1], []).append(self._format(item))
+                    count += 1
+                if count >= self.batch_size or (pending and time.monotonic() - last_write >= self.flush_interval):
+                    self._write(pending, files)
+                    count, last_write = 0, time.monotonic()
+        finally:
+            self._write(pending, files)
+            for f in files.values():
+                f.close()
+
+    def flush(self, timeout=None):
+        """
+        等待已入队的记录全部写盘
+        """
+        if self._thread is None or not self._thread.is_alive():
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def close(self, timeout=None):
+        """
+        写完剩余记录并结束后台线程，之后再提交记录会重新启动线程
+        """
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None and thread.is_alive():
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+
 class Logger:
     """
     日志工具类，支持将日志信息记录到不同文件
+    - 每个级别一个日志文件，文件在第一条该级别日志写出时才打开
+    - 低于 level 的日志直接返回，不构造消息；消息可以是 %-格式串加参数，或返回字符串的可调用对象
+    - background 为 True 时日志记录经 DeferredFormatQueueHandler 放入队列，由后台线程（QueueListener）格式化并写文件；
+      为 'batch' 时交给 BatchingLogSink 攒批写盘；为 False 时在调用线程同步写文件
+    - 两种后台模式下 %-参数都在后台线程中才格式化，传入之后会被修改的可变对象时应先自行拷贝
     """
-    
-    def __init__(self, logger_name="default_logger", base_log_dir="logs", level=logging.INFO):
+
+    # 日志级别名称 -> logging 级别
+    LEVELS = {
+        'debug': logging.DEBUG,
+        'info': logging.INFO,
+        'warning': logging.WARNING,
+        'error': logging.ERROR,
+        'critical': logging.CRITICAL,
+    }
+
+    def __init__(self, logger_name="default_logger", base_log_dir="logs", level=logging.INFO, background=True):
         """
-        初始化日志记录器
-        
+        初始化日志记录器（不创建目录、不打开文件）
+
         Args:
             logger_name (str): 日志记录器名称
             base_log_dir (str): 基础日志目录，默认为 'logs'
             level: 日志级别，默认为 INFO
+            background (bool | str): True 为 QueueListener 后台写，'batch' 为攒批后台写，False 为同步写
         """
         self.logger_name = logger_name
         self.level = level
         self.base_log_dir = Path(base_log_dir)
-        self.base_log_dir.mkdir(exist_ok=True)  # 创建基础日志目录
-        
+        self.background = background
+
         # 为不同的日志级别创建不同的文件
         self.log_files = {
-            'info': self.base_log_dir / f"{logger_name}_info.log",
-            'debug': self.base_log_dir / f"{logger_name}_debug.log", 
-            'warning': self.base_log_dir / f"{logger_name}_warning.log",
-            'error': self.base_log_dir / f"{logger_name}_error.log",
-            'critical': self.base_log_dir / f"{logger_name}_critical.log"
+            level_name: self.base_log_dir / f"{logger_name}_{level_name}.log"
+            for level_name in self.LEVELS
         }
-        
-        # 为每个日志级别创建独立的logger
+
+        # 各级别的 logger 与文件处理器在首次使用时创建
         self.loggers = {}
-        for level_name, log_file in self.log_files.items():
-            self.loggers[level_name] = self._create_logger_for_level(level_name, log_file)
-    
-    def _create_logger_for_level(self, level_name, log_file):
-        """为特定日志级别创建logger"""
-        logger = logging.getLogger(f"{self.logger_name}_{level_name}")
-        logger.setLevel(self.level)
-        
-        # 清除已有处理器
-        logger.handlers.clear()
-        
-        # 创建文件处理器
-        file_handler = logging.FileHandler(log_file, mode='a', encoding='utf-8')
+        self._handlers = {}
+        self._queue = None
+        self._listener = None
+        self._sink = None
+        self._lock = threading.RLock()
+        _instances.add(self)
+
+    def _create_file_handler(self, level_name):
+        """为特定日志级别创建文件处理器（delay=True，首次写入时才打开文件）"""
+        self.base_log_dir.mkdir(parents=True, exist_ok=True)  # 创建基础日志目录
+        file_handler = logging.FileHandler(self.log_files[level_name], mode='a', encoding='utf-8', delay=True)
         file_handler.setLevel(self.level)
-        
+
         # 创建格式化器
         formatter = logging.Formatter(
             '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
             datefmt='%Y-%m-%d %H:%M:%S'
         )
-        
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
-        
+        return file_handler
+
+    def _create_logger_for_level(self, level_name):
+        """为特定日志级别创建logger"""
+        logger = logging.getLogger(f"{self.logger_name}_{level_name}")
+        logger.setLevel(self.level)
+
+        # 清除已有处理器
+        logger.handlers.clear()
+
+        file_handler = self._create_file_handler(level_name)
+        self._handlers[level_name] = file_handler
+        if self.background:
+            # 后台模式：记录进入队列，监听线程按 logger 名称分发给对应的文件处理器
+            file_handler.addFilter(logging.Filter(logger.name))
+            logger.addHandler(DeferredFormatQueueHandler(self._get_queue()))
+            if self._listener is not None:
+                self._listener.handlers = tuple(self._handlers.values())
+        else:
+            logger.addHandler(file_handler)
+        return logger
+
+    def _get_queue(self):
+        if self._queue is None:
+            self._queue = queue.SimpleQueue()
+        return self._queue
+
+    def _get_logger(self, level_name):
+        logger = self.loggers.get(level_name)
+        if logger is None:
+            with self._lock:
+                logger = self.loggers.get(level_name)
+                if logger is None:
+                    logger = self._create_logger_for_level(level_name)
+                    self.loggers[level_name] = logger
+        if self.background and self._listener is None:
+            self._start_listener()
         return logger
-    
-    def info(self, message):
+
+    def _start_listener(self):
+        with self._lock:
+            if self._listener is None:
+                self._listener = QueueListener(self._get_queue(), *self._handlers.values(),
+                                               respect_handler_level=True)
+                self._listener.start()
+
+    def _log(self, level_name, message, args):
+        level = self.LEVELS[level_name]
+        if level < self.level:
+            return
+        if callable(message):
+            message = message()
+        if self.background == 'batch':
+            self._get_sink().submit(f"{self.logger_name}_{level_name}", level_name, level, message, args)
+            return
+        self._get_logger(level_name).log(level, message, *args)
+
+    def _get_sink(self):
+        if self._sink is None:
+            with self._lock:
+                if self._sink is None:
+                    formatter = logging.Formatter(
+                        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+                        datefmt='%Y-%m-%d %H:%M:%S'
+                    )
+                    self._sink = BatchingLogSink(self.log_files, formatter)
+        return self._sink
+
+    def info(self, message, *args):
         """
         记录 INFO 级别日志到 info 文件
-        
+
         Args:
-            message (str): 日志消息
+            message (str | callable): 日志消息，可带 %-格式参数，或为返回消息的可调用对象
         """
-        self.loggers['info'].info(message)
-    
-    def debug(self, message):
+        self._log('info', message, args)
+
+    def debug(self, message, *args):
         """
         记录 DEBUG 级别日志到 debug 文件
-        
+
         Args:
-            message (str): 日志消息
+            message (str | callable): 日志消息，可带 %-格式参数，或为返回消息的可调用对象
         """
-        self.loggers['debug'].debug(message)
-    
-    def warning(self, message):
+        self._log('debug', message, args)
+
+    def warning(self, message, *args):
         """
         记录 WARNING 级别日志到 warning 文件
-        
+
         Args:
-            message (str): 日志消息
+            message (str | callable): 日志消息，可带 %-格式参数，或为返回消息的可调用对象
         """
-        self.loggers['warning'].warning(message)
-    
-    def error(self, message):
+        self._log('warning', message, args)
+
+    def error(self, message, *args):
         """
         记录 ERROR 级别日志到 error 文件
-        
+
         Args:
-            message (str): 日志消息
+            message (str | callable): 日志消息，可带 %-格式参数，或为返回消息的可调用对象
         """
-        self.loggers['error'].error(message)
-    
-    def critical(self, message):
+        self._log('error', message, args)
+
+    def critical(self, message, *args):
         """
         记录 CRITICAL 级别日志到 critical 文件
-        
+
+        Args:
+            message (str | callable): 日志消息，可带 %-格式参数，或为返回消息的可调用对象
+        """
+        self._log('critical', message, args)
+
+    def is_enabled_for(self, level):
+        """
+        判断给定级别的日志是否会被记录，用于在构造大段日志消息之前跳过
+
         Args:
-            message (str): 日志消息
+            level: 日志级别，如 logging.DEBUG
+
+        Returns:
+            bool: 是否记录
+        """
+        return level >= self.level
+
+    def set_level(self, level):
+        """
+        修改日志级别，已创建的 logger 与文件处理器同步更新
+
+        Args:
+            level: 日志级别
+        """
+        with self._lock:
+            self.level = level
+            for logger in self.loggers.values():
+                logger.setLevel(level)
+            for handler in self._handlers.values():
+                handler.setLevel(level)
+
+    def flush(self):
+        """
+        等待后台线程写完队列中已有的日志并刷新文件，之后的日志会重新启动后台线程
         """
-        self.loggers['critical'].critical(message)
-    
+        with self._lock:
+            if self._listener is not None:
+                self._listener.stop()
+                self._listener = None
+            for handler in self._handlers.values():
+                handler.flush()
+            if self._sink is not None:
+                self._sink.flush()
+
+    def close(self):
+        """
+        写完剩余日志并关闭所有文件，之后再记录日志会重新创建 logger
+        """
+        with self._lock:
+            self.flush()
+            for level_name, logger in self.loggers.items():
+                logger.handlers.clear()
+                self._handlers[level_name].close()
+            self.loggers.clear()
+            self._handlers.clear()
+            if self._sink is not None:
+                self._sink.close()
+
     def get_log_file_path(self, level_name):
         """
         获取指定级别的日志文件路径
-        
+
         Args:
             level_name (str): 日志级别名称 ('info', 'debug', 'warning', 'error', 'critical')
-        
+
         Returns:
             Path: 日志文件路径
         """
         return self.log_files.get(level_name)
 
 
+# 按名称缓存的日志记录器；_instances 记录所有实例，进程退出时统一写完队列
+_loggers = {}
+_instances = weakref.WeakSet()
+_loggers_lock = threading.Lock()
+
+
 # 创建全局日志实例的便捷函数
-def get_logger(logger_name="app_logger", base_log_dir="logs"):
+def get_logger(logger_name="app_logger", base_log_dir="logs", level=logging.INFO, background=True):
     """
-    获取日志记录器实例
-    
+    获取日志记录器实例，同名记录器只创建一次；
+    目录或后台模式改变时关闭旧文件并重新创建，级别改变时直接更新级别
+
     Args:
         logger_name (str): 日志记录器名称
         base_log_dir (str): 基础日志目录
-    
+        level: 日志级别，默认为 INFO；设为 DEBUG 时才记录逐条转移等大段日志
+        background (bool | str): 后台写模式，见 Logger；'batch' 为攒批写盘的 BatchingLogSink
+
     Returns:
         Logger: 日志记录器实例
     """
-    return Logger(logger_name, base_log_dir)
+    with _loggers_lock:
+        logger = _loggers.get(logger_name)
+        if logger is not None and (logger.base_log_dir != Path(base_log_dir) or logger.background != background):
+            logger.close()
+            logger = None
+        if logger is None:
+            logger = _loggers[logger_name] = Logger(logger_name, base_log_dir, level, background)
+        elif logger.level != level:
+            logger.set_level(level)
+        return logger
+
+
+def flush_loggers():
+    """
+    等待所有日志记录器写完已入队的日志（不关闭文件）
+    """
+    for logger in list(_instances):
+        logger.flush()
+
+
+def shutdown_loggers():
+    """
+    写完所有日志记录器的队列并关闭文件（进程退出时自动调用）
+    """
+    for logger in list(_instances):
+        logger.close()
+
 
+atexit.register(shutdown_loggers)
 
-# 全局默认日志记录器
-_default_logger = Logger()
+
+def __getattr__(name):
+    # 全局默认日志记录器在首次访问时才创建
+    if name == "_default_logger":
+        return get_logger("default_logger")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def log_info(message, logger_name="default", base_log_dir="logs"):
     """
     便捷函数：直接记录 INFO 级别日志到对应文件
-    
+
     Args:
         message (str): 日志消息
         logger_name (str): 日志记录器名称
         base_log_dir (str): 基础日志目录
     """
-    temp_logger = Logger(logger_name=logger_name, base_log_dir=base_log_dir)
-    temp_logger.info(message)
+    get_logger(logger_name, base_log_dir).info(message)
 
 
 def log_error(message, logger_name="default", base_log_dir="logs"):
     """
     便捷函数：直接记录 ERROR 级别日志到对应文件
-    
+
     Args:
         message (str): 日志消息
         logger_name (str): 日志记录器名称
         base_log_dir (str): 基础日志目录
     """
-    temp_logger = Logger(logger_name=logger_name, base_log_dir=base_log_dir)
-    temp_logger.error(message)
+    get_logger(logger_name, base_log_dir).error(message)
 
 
 def log_warning(message, logger_name="default", base_log_dir="logs"):
     """
     便捷函数：直接记录 WARNING 级别日志到对应文件
-    
+
     Args:
         message (str): 日志消息
         logger_name (str): 日志记录器名称
         base_log_dir (str): 基础日志目录
     """
-    temp_logger = Logger(logger_name=logger_name, base_log_dir=base_log_dir)
-    temp_logger.warning(message)
+    get_logger(logger_name, base_log_dir).warning(message)
 
 
 def log_debug(message, logger_name="default", base_log_dir="logs"):
     """
     便捷函数：直接记录 DEBUG 级别日志到对应文件
-    
+
     Args:
         message (str): 日志消息
         logger_name (str): 日志记录器名称
         base_log_dir (str): 基础日志目录
     """
-    temp_logger = Logger(logger_name=logger_name, base_log_dir=base_log_dir)
-    temp_logger.debug(message)
+    get_logger(logger_name, base_log_dir).debug(message)
 
 
 def log_critical(message, logger_name="default", base_log_dir="logs"):
     """
     便捷函数：直接记录 CRITICAL 级别日志到对应文件
-    
+
     Args:
         message (str): 日志消息
         logger_name (str): 日志记录器名称
         base_log_dir (str): 基础日志目录
     """
-    temp_logger = Logger(logger_name=logger_name, base_log_dir=base_log_dir)
-    temp_logger.critical(message)
\ No newline at end of file
+    get_logger(logger_name, base_log_dir).critical(message)